@@ -0,0 +1,120 @@
+"""Helpers shared by the benchmarks to talk MCP to a server."""
+
+import itertools
+import json
+import socket
+import subprocess
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import httpx
+
+MCP_HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 0,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "benchmark", "version": "0"},
+    },
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def open_session(client: httpx.Client, url: str) -> dict:
+    """Initialize a streamable HTTP session and return the headers to send the next requests with."""
+    response = client.post(url, json=INITIALIZE, headers=MCP_HEADERS)
+    response.raise_for_status()
+    headers = {**MCP_HEADERS, "mcp-session-id": response.headers["mcp-session-id"]}
+    client.post(url, json=INITIALIZED, headers=headers)
+    return headers
+
+
+def jsonrpc_result(response: httpx.Response) -> dict:
+    """Return the JSON-RPC message of a response sent either as JSON or as a single server-sent event."""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[len("data:") :])
+        raise ValueError("No data in event stream response")
+    return response.json()
+
+
+class StdioSession:
+    """
+    MCP session with a server running as a subprocess on the stdio transport.
+
+    Requests can be sent from several threads at once; responses are matched to them by their ID.
+    """
+
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        self.request(INITIALIZE["method"], INITIALIZE["params"])
+        self._write(INITIALIZED)
+
+    def request(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        future: Future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        return future.result(timeout)
+
+    def _write(self, message: dict) -> None:
+        with self._lock:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            message = json.loads(line)
+            with self._lock:
+                future = self._pending.pop(message.get("id"), None)
+            if future is not None:
+                future.set_result(message)
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        for future in pending:
+            future.set_exception(RuntimeError("Server closed its output"))
+
+
+class HttpSession:
+    """MCP session with a server on the streamable HTTP transport; safe to use from several threads."""
+
+    def __init__(self, url: str, timeout: float = 300):
+        self.url = url
+        self.client = httpx.Client(timeout=timeout, limits=httpx.Limits(max_connections=None))
+        self.headers = open_session(self.client, url)
+        self._ids = itertools.count(1)
+
+    def request(self, method: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        message = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or {}}
+        return jsonrpc_result(self.client.post(self.url, json=message, headers=self.headers, timeout=timeout))
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def call_tool(session: Any, name: str, arguments: dict, timeout: Optional[float] = None) -> dict:
+    """Call a tool and return its result; raises when the call failed."""
+    message = session.request("tools/call", {"name": name, "arguments": arguments}, timeout=timeout)
+    if "error" in message:
+        raise RuntimeError(message["error"].get("message", message["error"]))
+    if message["result"].get("isError"):
+        content = message["result"].get("content") or [{}]
+        raise RuntimeError(content[0].get("text", "Tool call failed"))
+    return message["result"]
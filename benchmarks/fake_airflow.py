@@ -0,0 +1,1001 @@
+"""
+A fake Airflow REST API (v1) serving a synthetic fleet, for benchmarking the server without an Airflow deployment.
+
+The fleet is derived arithmetically from its size: DAG ``dag_00042`` has ``--runs-per-dag`` daily runs, each with
+``--tasks-per-dag`` task instances, and every request computes the page it returns. A fleet of 10k DAGs with
+1M task instances therefore costs no memory, and the same options always produce the same fleet, so benchmark
+results are comparable across commits. Every endpoint the tools call is served; writes are acknowledged with a
+plausible response but change nothing.
+
+    uv run python -m benchmarks.fake_airflow --port 8080 --dags 10000 --tasks-per-dag 100 --latency-ms 20
+"""
+
+import json
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import click
+
+API_PREFIX = "/api/v1"
+# Not part of the Airflow API: request counters of the fake itself, see FakeAirflowServer.stats
+STATS_PATH = "/_stats"
+# Logical date of the most recent run of every DAG; older runs are one day apart
+BASE_DATE = datetime(2024, 6, 1, tzinfo=timezone.utc)
+DEFAULT_PAGE_LIMIT = 100
+AIRFLOW_VERSION = "2.10.5"
+
+
+@dataclass(frozen=True)
+class Fleet:
+    """Size of the synthetic deployment, and how slowly it answers."""
+
+    dags: int = 1000
+    runs_per_dag: int = 25
+    tasks_per_dag: int = 40
+    log_bytes: int = 256 * 1024
+    connections: int = 200
+    variables: int = 500
+    pools: int = 20
+    datasets: int = 200
+    event_logs: int = 100_000
+    import_errors: int = 10
+    latency_ms: float = 0
+
+    @property
+    def task_instances(self) -> int:
+        return self.dags * self.runs_per_dag * self.tasks_per_dag
+
+
+class NotFound(Exception):
+    pass
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _index(value: str, prefix: str, count: int) -> int:
+    """Index of an entity from its ID, like 42 for ``dag_00042``."""
+    match = re.fullmatch(re.escape(prefix) + r"(\d+)", value)
+    if match is None or int(match.group(1)) >= count:
+        raise NotFound(value)
+    return int(match.group(1))
+
+
+def _page(items: Iterable[Any], offset: int, limit: int) -> Tuple[List[Any], int]:
+    """The items of one page, and how many items there are in total."""
+    page, total = [], 0
+    for item in items:
+        if offset <= total < offset + limit:
+            page.append(item)
+        total += 1
+    return page, total
+
+
+class FleetApi:
+    """Responses of the Airflow REST API for a fleet, as JSON-serializable objects."""
+
+    def __init__(self, fleet: Fleet):
+        self.fleet = fleet
+        line = "[{when}] {{taskinstance.py:1234}} INFO - Processed batch of 1000 rows, 0 rejected\n"
+        body = line.format(when=_iso(BASE_DATE)) * max(1, fleet.log_bytes // len(line))
+        self._log_body = body[: fleet.log_bytes]
+
+    # DAGs
+
+    def dag_id(self, i: int) -> str:
+        return f"dag_{i:05d}"
+
+    def dag_index(self, dag_id: str) -> int:
+        return _index(dag_id, "dag_", self.fleet.dags)
+
+    def dag_tags(self, i: int) -> List[str]:
+        return [f"team_{i % 10}"] + (["finance"] if i % 3 == 0 else [])
+
+    def dag(self, i: int, is_paused: Optional[bool] = None) -> Dict[str, Any]:
+        dag_id = self.dag_id(i)
+        return {
+            "dag_id": dag_id,
+            "dag_display_name": dag_id,
+            "description": f"Synthetic DAG {i}",
+            "fileloc": f"/opt/airflow/dags/{dag_id}.py",
+            "file_token": f"token-{dag_id}",
+            "is_active": True,
+            "is_paused": i % 20 == 19 if is_paused is None else is_paused,
+            "is_subdag": False,
+            "has_import_errors": False,
+            "has_task_concurrency_limits": False,
+            "last_parsed_time": _iso(BASE_DATE + timedelta(days=1)),
+            "max_active_runs": 16,
+            "max_active_tasks": 16,
+            "next_dagrun": _iso(BASE_DATE + timedelta(days=1)),
+            "owners": ["airflow"],
+            "tags": [{"name": tag} for tag in self.dag_tags(i)],
+            "timetable_description": "At 00:00",
+        }
+
+    def dag_details(self, i: int) -> Dict[str, Any]:
+        return {
+            **self.dag(i),
+            "catchup": False,
+            "concurrency": 16.0,
+            "doc_md": None,
+            "is_paused_upon_creation": None,
+            "orientation": "LR",
+            "params": {},
+            "start_date": _iso(BASE_DATE - timedelta(days=self.fleet.runs_per_dag)),
+            "timezone": "UTC",
+        }
+
+    def dag_indices(self, query: Dict[str, List[str]]) -> Iterable[int]:
+        pattern = query.get("dag_id_pattern", [None])[0]
+        tags = set(query.get("tags", []))
+        paused = query.get("paused", [None])[0]
+        indices = range(self.fleet.dags)
+        if query.get("order_by", [""])[0] == "-dag_id":
+            indices = reversed(indices)
+        for i in indices:
+            if pattern and pattern.lower() not in self.dag_id(i):
+                continue
+            if tags and not tags.intersection(self.dag_tags(i)):
+                continue
+            if paused is not None and (i % 20 == 19) != (paused == "true"):
+                continue
+            yield i
+
+    # DAG runs
+
+    def run_state(self, i: int, k: int) -> str:
+        if (i + k) % 10 == 0:
+            return "failed"
+        if k == 0 and i % 4 == 1:
+            return "running"
+        return "success"
+
+    def run_id(self, k: int) -> str:
+        return f"scheduled__{_iso(BASE_DATE - timedelta(days=k))}"
+
+    def run_index(self, dag_run_id: str) -> int:
+        match = re.fullmatch(r"scheduled__(.+)", dag_run_id)
+        try:
+            k = (BASE_DATE - datetime.fromisoformat(match.group(1))).days if match else -1
+        except ValueError:
+            k = -1
+        if not 0 <= k < self.fleet.runs_per_dag or self.run_id(k) != dag_run_id:
+            raise NotFound(dag_run_id)
+        return k
+
+    def run_times(self, i: int, k: int) -> Tuple[datetime, datetime, float]:
+        logical_date = BASE_DATE - timedelta(days=k)
+        start_date = logical_date + timedelta(days=1, seconds=5)
+        duration = 600.0 + (i * 37 + k * 11) % 1800
+        return logical_date, start_date, duration
+
+    def dag_run(self, i: int, k: int, state: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
+        logical_date, start_date, duration = self.run_times(i, k)
+        state = state or self.run_state(i, k)
+        end_date = start_date + timedelta(seconds=duration) if state in ("success", "failed") else None
+        return {
+            "dag_id": self.dag_id(i),
+            "dag_run_id": self.run_id(k),
+            "logical_date": _iso(logical_date),
+            "execution_date": _iso(logical_date),
+            "data_interval_start": _iso(logical_date),
+            "data_interval_end": _iso(logical_date + timedelta(days=1)),
+            "start_date": _iso(start_date),
+            "end_date": _iso(end_date),
+            "last_scheduling_decision": _iso(end_date or start_date),
+            "state": state,
+            "run_type": "scheduled",
+            "external_trigger": False,
+            "conf": {},
+            "note": note,
+        }
+
+    def run_matches(self, i: int, k: int, query: Dict[str, Any]) -> bool:
+        states = query.get("state")
+        if states and self.run_state(i, k) not in states:
+            return False
+        logical_date, start_date, duration = self.run_times(i, k)
+        end_date = start_date + timedelta(seconds=duration) if self.run_state(i, k) != "running" else None
+        for field, value in (("execution_date", logical_date), ("start_date", start_date), ("end_date", end_date)):
+            for suffix, outside in (("_gte", lambda a, b: a < b), ("_lte", lambda a, b: a > b)):
+                bound = query.get(field + suffix)
+                if bound is None:
+                    continue
+                if value is None or outside(value, datetime.fromisoformat(bound)):
+                    return False
+        return True
+
+    def run_keys(self, dag_indices: Iterable[int], order_by: Optional[str]) -> Iterable[Tuple[int, int]]:
+        """(DAG index, run index) pairs, oldest first unless ordered by a descending field."""
+        dag_indices = list(dag_indices)
+        newest_first = bool(order_by) and order_by.startswith("-")
+        runs = range(self.fleet.runs_per_dag) if newest_first else reversed(range(self.fleet.runs_per_dag))
+        for k in runs:
+            for i in dag_indices:
+                yield i, k
+
+    # Task instances
+
+    def task_id(self, t: int) -> str:
+        return f"task_{t:03d}"
+
+    def task_index(self, task_id: str) -> int:
+        return _index(task_id, "task_", self.fleet.tasks_per_dag)
+
+    def task_state(self, i: int, k: int, t: int) -> str:
+        run_state = self.run_state(i, k)
+        last = self.fleet.tasks_per_dag - 1
+        if run_state == "failed":
+            return "failed" if t == last else "success"
+        if run_state == "running":
+            middle = last // 2
+            return "success" if t < middle else "running" if t == middle else "scheduled"
+        return "success"
+
+    def task_instance(self, i: int, k: int, t: int, try_number: Optional[int] = None) -> Dict[str, Any]:
+        logical_date, run_start, run_duration = self.run_times(i, k)
+        state = self.task_state(i, k, t)
+        duration = run_duration / self.fleet.tasks_per_dag
+        start_date = run_start + timedelta(seconds=t * duration) if state != "scheduled" else None
+        end_date = start_date + timedelta(seconds=duration) if state in ("success", "failed") else None
+        tries = 2 if state == "failed" else 1
+        return {
+            "dag_id": self.dag_id(i),
+            "dag_run_id": self.run_id(k),
+            "task_id": self.task_id(t),
+            "task_display_name": self.task_id(t),
+            "execution_date": _iso(logical_date),
+            "start_date": _iso(start_date),
+            "end_date": _iso(end_date),
+            "duration": duration if end_date else None,
+            "state": state,
+            "try_number": try_number or tries,
+            "max_tries": 1,
+            "map_index": -1,
+            "hostname": f"worker-{t % 4}",
+            "unixname": "airflow",
+            "pool": "default_pool",
+            "pool_slots": 1,
+            "queue": "default",
+            "priority_weight": self.fleet.tasks_per_dag - t,
+            "operator": "BashOperator",
+            "queued_when": _iso(start_date),
+            "pid": 1000 + t if start_date else None,
+            "executor_config": "{}",
+            "rendered_fields": {},
+            "note": None,
+        }
+
+    def task_indices(self, i: int, k: int, states: Optional[List[str]]) -> Iterable[int]:
+        for t in range(self.fleet.tasks_per_dag):
+            if not states or self.task_state(i, k, t) in states:
+                yield t
+
+    def task_instance_keys(
+        self, run_keys: Iterable[Tuple[int, int]], task_ids: Optional[List[str]], states: Optional[List[str]]
+    ) -> Iterable[Tuple[int, int, int]]:
+        task_indices = None
+        if task_ids:
+            task_indices = sorted({self.task_index(task_id) for task_id in task_ids if task_id.startswith("task_")})
+        for i, k in run_keys:
+            if task_indices is None:
+                for t in self.task_indices(i, k, states):
+                    yield i, k, t
+            else:
+                for t in task_indices:
+                    if not states or self.task_state(i, k, t) in states:
+                        yield i, k, t
+
+    def task(self, t: int) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id(t),
+            "task_display_name": self.task_id(t),
+            "owner": "airflow",
+            "pool": "default_pool",
+            "pool_slots": 1.0,
+            "priority_weight": float(self.fleet.tasks_per_dag - t),
+            "queue": "default",
+            "retries": 1.0,
+            "depends_on_past": False,
+            "wait_for_downstream": False,
+            "retry_exponential_backoff": False,
+            "is_mapped": False,
+            "template_fields": ["bash_command", "env"],
+            "downstream_task_ids": [self.task_id(t + 1)] if t + 1 < self.fleet.tasks_per_dag else [],
+            "class_ref": {"module_path": "airflow.operators.bash", "class_name": "BashOperator"},
+            "trigger_rule": "all_success",
+        }
+
+    def log(self, i: int, k: int, t: int, try_number: int) -> Dict[str, Any]:
+        header = f"*** Log of {self.dag_id(i)}/{self.run_id(k)}/{self.task_id(t)} try {try_number}\n"
+        content = header + self._log_body
+        if self.task_state(i, k, t) == "failed":
+            content += "ERROR - Task failed with exception\nValueError: Upstream table is empty\n"
+        return {"content": content}
+
+    # Everything else
+
+    def connection(self, n: int) -> Dict[str, Any]:
+        return {
+            "connection_id": f"conn_{n:04d}",
+            "conn_type": "postgres",
+            "description": f"Synthetic connection {n}",
+            "host": f"db-{n % 8}.internal",
+            "login": "airflow",
+            "schema": "public",
+            "port": 5432,
+        }
+
+    def variable(self, n: int) -> Dict[str, Any]:
+        return {"key": f"var_{n:04d}", "value": json.dumps({"threshold": n}), "description": None}
+
+    def pool(self, n: int) -> Dict[str, Any]:
+        name = "default_pool" if n == 0 else f"pool_{n:03d}"
+        return {
+            "name": name,
+            "slots": 128,
+            "occupied_slots": n % 7,
+            "running_slots": n % 5,
+            "queued_slots": n % 3,
+            "scheduled_slots": 0,
+            "deferred_slots": 0,
+            "open_slots": 128 - n % 7,
+            "description": None,
+            "include_deferred": False,
+        }
+
+    def pool_index(self, name: str) -> int:
+        return 0 if name == "default_pool" else _index(name, "pool_", self.fleet.pools)
+
+    def dataset_uri(self, n: int) -> str:
+        return f"s3://fleet/dataset_{n:04d}"
+
+    def dataset(self, n: int) -> Dict[str, Any]:
+        return {
+            "id": n + 1,
+            "uri": self.dataset_uri(n),
+            "extra": {},
+            "created_at": _iso(BASE_DATE - timedelta(days=365)),
+            "updated_at": _iso(BASE_DATE),
+            "consuming_dags": [],
+            "producing_tasks": [],
+        }
+
+    def dataset_event(self, n: int) -> Dict[str, Any]:
+        dataset = n % max(1, self.fleet.datasets)
+        i = n % max(1, self.fleet.dags)
+        return {
+            "dataset_id": dataset + 1,
+            "dataset_uri": self.dataset_uri(dataset),
+            "extra": {},
+            "source_dag_id": self.dag_id(i),
+            "source_task_id": self.task_id(self.fleet.tasks_per_dag - 1),
+            "source_run_id": self.run_id(0),
+            "source_map_index": -1,
+            "created_dagruns": [],
+            "timestamp": _iso(BASE_DATE - timedelta(minutes=n)),
+        }
+
+    def queued_event(self, i: int) -> Dict[str, Any]:
+        return {
+            "uri": self.dataset_uri(i % max(1, self.fleet.datasets)),
+            "dag_id": self.dag_id(i),
+            "created_at": _iso(BASE_DATE),
+        }
+
+    def event_log(self, n: int) -> Dict[str, Any]:
+        i = n % max(1, self.fleet.dags)
+        return {
+            "event_log_id": n,
+            "when": _iso(BASE_DATE + timedelta(seconds=n)),
+            "dag_id": self.dag_id(i),
+            "task_id": self.task_id(n % self.fleet.tasks_per_dag),
+            "run_id": self.run_id(0),
+            "map_index": -1,
+            "try_number": 1,
+            "event": ("running", "success", "failed", "cli_task_run", "trigger")[n % 5],
+            "execution_date": _iso(BASE_DATE),
+            "owner": "airflow",
+            "extra": None,
+        }
+
+    def import_error(self, n: int) -> Dict[str, Any]:
+        return {
+            "import_error_id": n + 1,
+            "filename": f"/opt/airflow/dags/broken_{n:03d}.py",
+            "stack_trace": "Traceback (most recent call last):\nModuleNotFoundError: No module named 'pandas'\n",
+            "timestamp": _iso(BASE_DATE),
+        }
+
+
+def _query_int(query: Dict[str, List[str]], name: str, default: int) -> int:
+    return int(query.get(name, [default])[0])
+
+
+def _collection(name: str, items: Iterable[Any], query: Dict[str, List[str]], render: Callable) -> Dict[str, Any]:
+    page, total = _page(items, _query_int(query, "offset", 0), _query_int(query, "limit", DEFAULT_PAGE_LIMIT))
+    return {name: [render(item) for item in page], "total_entries": total}
+
+
+def routes(api: FleetApi) -> List[Tuple[str, "re.Pattern[str]", Callable[..., Any]]]:
+    """(method, path pattern, handler) of every endpoint; handlers get the path parameters, query and body."""
+    fleet = api.fleet
+    table: List[Tuple[str, str, Callable[..., Any]]] = []
+
+    def route(method: str, path: str):
+        def register(handler):
+            table.append((method, path, handler))
+            return handler
+
+        return register
+
+    def run_filters(source: Dict[str, Any]) -> Dict[str, Any]:
+        filters = {key: value for key, value in source.items() if key.endswith(("_gte", "_lte"))}
+        filters["state"] = source.get("state") or source.get("states")
+        return {
+            key: value[0] if isinstance(value, list) and key != "state" else value for key, value in filters.items()
+        }
+
+    # Monitoring and metadata
+
+    @route("GET", "/health")
+    def health(query, body):
+        heartbeat = _iso(datetime.now(timezone.utc))
+        return {
+            "metadatabase": {"status": "healthy"},
+            "scheduler": {"status": "healthy", "latest_scheduler_heartbeat": heartbeat},
+        }
+
+    @route("GET", "/version")
+    def version(query, body):
+        return {"version": AIRFLOW_VERSION, "git_version": None}
+
+    @route("GET", "/config")
+    def config(query, body):
+        options = [{"key": "parallelism", "value": "32"}, {"key": "executor", "value": "CeleryExecutor"}]
+        return {"sections": [{"name": "core", "options": options}]}
+
+    @route("GET", "/config/section/(?P<section>[^/]+)/option/(?P<option>[^/]+)")
+    def config_value(query, body, section, option):
+        return {"sections": [{"name": section, "options": [{"key": option, "value": "32"}]}]}
+
+    @route("GET", "/plugins")
+    def plugins(query, body):
+        return {"plugins": [], "total_entries": 0}
+
+    @route("GET", "/providers")
+    def providers(query, body):
+        packages = ["apache-airflow-providers-postgres", "apache-airflow-providers-http"]
+        items = [{"package_name": name, "description": name, "version": "5.0.0"} for name in packages]
+        return {"providers": items, "total_entries": len(items)}
+
+    # DAGs
+
+    @route("GET", "/dags")
+    def get_dags(query, body):
+        return _collection("dags", api.dag_indices(query), query, api.dag)
+
+    @route("PATCH", "/dags")
+    def patch_dags(query, body):
+        is_paused = (body or {}).get("is_paused")
+        return _collection("dags", api.dag_indices(query), query, lambda i: api.dag(i, is_paused=is_paused))
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)")
+    def get_dag(query, body, dag_id):
+        return api.dag(api.dag_index(dag_id))
+
+    @route("PATCH", "/dags/(?P<dag_id>[^/~]+)")
+    def patch_dag(query, body, dag_id):
+        return api.dag(api.dag_index(dag_id), is_paused=(body or {}).get("is_paused"))
+
+    @route("DELETE", "/dags/(?P<dag_id>[^/~]+)")
+    def delete_dag(query, body, dag_id):
+        api.dag_index(dag_id)
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/details")
+    def get_dag_details(query, body, dag_id):
+        return api.dag_details(api.dag_index(dag_id))
+
+    @route("GET", "/dagSources/(?P<file_token>[^/]+)")
+    def get_dag_source(query, body, file_token):
+        dag_id = file_token.removeprefix("token-")
+        api.dag_index(dag_id)
+        return {"content": f"from airflow import DAG\n\nwith DAG({dag_id!r}, schedule='@daily'):\n    ...\n"}
+
+    @route("PUT", "/parseDagFile/(?P<file_token>[^/]+)")
+    def reparse_dag_file(query, body, file_token):
+        api.dag_index(file_token.removeprefix("token-"))
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/tasks")
+    def get_tasks(query, body, dag_id):
+        api.dag_index(dag_id)
+        tasks = [api.task(t) for t in range(fleet.tasks_per_dag)]
+        return {"tasks": tasks, "total_entries": len(tasks)}
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/tasks/(?P<task_id>[^/]+)")
+    def get_task(query, body, dag_id, task_id):
+        api.dag_index(dag_id)
+        return api.task(api.task_index(task_id))
+
+    @route("POST", "/dags/(?P<dag_id>[^/~]+)/clearTaskInstances")
+    def clear_task_instances(query, body, dag_id):
+        i = api.dag_index(dag_id)
+        keys = api.task_instance_keys([(i, k) for k in range(fleet.runs_per_dag)], None, ["failed"])
+        references = [api.task_instance(*key) for key in keys]
+        return {"task_instances": [_reference(ti) for ti in references]}
+
+    @route("POST", "/dags/(?P<dag_id>[^/~]+)/updateTaskInstancesState")
+    def set_task_instances_state(query, body, dag_id):
+        i = api.dag_index(dag_id)
+        task_id = (body or {}).get("task_id") or api.task_id(0)
+        return {"task_instances": [_reference(api.task_instance(i, 0, api.task_index(task_id)))]}
+
+    @route("GET", "/dagStats")
+    def get_dag_stats(query, body):
+        dag_ids = [dag_id for value in query.get("dag_ids", []) for dag_id in value.split(",") if dag_id]
+        indices = [api.dag_index(dag_id) for dag_id in dag_ids] if dag_ids else range(fleet.dags)
+        items = []
+        for i in indices:
+            counts = {"queued": 0, "running": 0, "success": 0, "failed": 0}
+            for k in range(fleet.runs_per_dag):
+                counts[api.run_state(i, k)] += 1
+            items.append({"dag_id": api.dag_id(i), "stats": [{"state": s, "count": c} for s, c in counts.items()]})
+        return _collection("dags", items, query, lambda item: item)
+
+    # DAG runs
+
+    @route("GET", "/dags/(?P<dag_id>[^/]+)/dagRuns")
+    def get_dag_runs(query, body, dag_id):
+        dag_indices = range(fleet.dags) if dag_id == "~" else [api.dag_index(dag_id)]
+        filters = run_filters(query)
+        keys = (
+            key for key in api.run_keys(dag_indices, query.get("order_by", [None])[0]) if api.run_matches(*key, filters)
+        )
+        return _collection("dag_runs", keys, query, lambda key: api.dag_run(*key))
+
+    @route("POST", "/dags/~/dagRuns/list")
+    def get_dag_runs_batch(query, body):
+        body = body or {}
+        dag_ids = body.get("dag_ids")
+        dag_indices = [api.dag_index(dag_id) for dag_id in dag_ids] if dag_ids else range(fleet.dags)
+        filters = run_filters(body)
+        keys = (key for key in api.run_keys(dag_indices, body.get("order_by")) if api.run_matches(*key, filters))
+        page_query = {"offset": [body.get("page_offset", 0)], "limit": [body.get("page_limit", DEFAULT_PAGE_LIMIT)]}
+        return _collection("dag_runs", keys, page_query, lambda key: api.dag_run(*key))
+
+    @route("POST", "/dags/(?P<dag_id>[^/~]+)/dagRuns")
+    def post_dag_run(query, body, dag_id):
+        i = api.dag_index(dag_id)
+        run = api.dag_run(i, 0, state="queued")
+        run.update(
+            dag_run_id=(body or {}).get("dag_run_id") or f"manual__{_iso(BASE_DATE)}",
+            run_type="manual",
+            external_trigger=True,
+            start_date=None,
+            end_date=None,
+            conf=(body or {}).get("conf") or {},
+        )
+        return run
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)")
+    def get_dag_run(query, body, dag_id, dag_run_id):
+        return api.dag_run(api.dag_index(dag_id), api.run_index(dag_run_id))
+
+    @route("PATCH", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)")
+    def update_dag_run_state(query, body, dag_id, dag_run_id):
+        return api.dag_run(api.dag_index(dag_id), api.run_index(dag_run_id), state=(body or {}).get("state"))
+
+    @route("DELETE", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)")
+    def delete_dag_run(query, body, dag_id, dag_run_id):
+        api.dag_index(dag_id)
+        api.run_index(dag_run_id)
+
+    @route("POST", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)/clear")
+    def clear_dag_run(query, body, dag_id, dag_run_id):
+        i, k = api.dag_index(dag_id), api.run_index(dag_run_id)
+        if (body or {}).get("dry_run", True):
+            keys = api.task_instance_keys([(i, k)], None, None)
+            return {"task_instances": [_reference(api.task_instance(*key)) for key in keys]}
+        return api.dag_run(i, k, state="queued")
+
+    @route("PATCH", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)/setNote")
+    def set_dag_run_note(query, body, dag_id, dag_run_id):
+        return api.dag_run(api.dag_index(dag_id), api.run_index(dag_run_id), note=(body or {}).get("note"))
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)/upstreamDatasetEvents")
+    def get_upstream_dataset_events(query, body, dag_id, dag_run_id):
+        api.dag_index(dag_id)
+        api.run_index(dag_run_id)
+        return {"dataset_events": [], "total_entries": 0}
+
+    # Task instances
+
+    def runs_of(dag_id: str, dag_run_id: str) -> List[Tuple[int, int]]:
+        dag_indices = range(fleet.dags) if dag_id == "~" else [api.dag_index(dag_id)]
+        if dag_run_id == "~":
+            return list(api.run_keys(dag_indices, "-execution_date"))
+        k = api.run_index(dag_run_id)
+        return [(i, k) for i in dag_indices]
+
+    @route("GET", "/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<dag_run_id>[^/]+)/taskInstances")
+    def get_task_instances(query, body, dag_id, dag_run_id):
+        keys = api.task_instance_keys(runs_of(dag_id, dag_run_id), None, query.get("state"))
+        return _collection("task_instances", keys, query, lambda key: api.task_instance(*key))
+
+    @route("POST", "/dags/~/dagRuns/~/taskInstances/list")
+    def get_task_instances_batch(query, body):
+        body = body or {}
+        dag_indices = [api.dag_index(dag_id) for dag_id in body.get("dag_ids") or []] or range(fleet.dags)
+        run_ids = body.get("dag_run_ids")
+        run_indices = sorted({api.run_index(run_id) for run_id in run_ids}) if run_ids else range(fleet.runs_per_dag)
+        run_keys = ((i, k) for k in run_indices for i in dag_indices)
+        keys = api.task_instance_keys(run_keys, body.get("task_ids"), body.get("state"))
+        return _collection("task_instances", keys, {}, lambda key: api.task_instance(*key))
+
+    ti_path = "/dags/(?P<dag_id>[^/~]+)/dagRuns/(?P<dag_run_id>[^/~]+)/taskInstances/(?P<task_id>[^/]+)"
+
+    @route("GET", ti_path)
+    def get_task_instance(query, body, dag_id, dag_run_id, task_id):
+        return api.task_instance(api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+
+    @route("PATCH", ti_path)
+    def patch_task_instance(query, body, dag_id, dag_run_id, task_id):
+        ti = api.task_instance(api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+        return _reference(ti)
+
+    @route("GET", ti_path + "/tries")
+    def get_task_instance_tries(query, body, dag_id, dag_run_id, task_id):
+        key = (api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+        tries = [api.task_instance(*key, try_number=n) for n in range(1, api.task_instance(*key)["try_number"] + 1)]
+        return {"task_instances": tries, "total_entries": len(tries)}
+
+    @route("GET", ti_path + "/logs/(?P<task_try_number>[0-9]+)")
+    def get_log(query, body, dag_id, dag_run_id, task_id, task_try_number):
+        key = (api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+        return api.log(*key, int(task_try_number))
+
+    @route("GET", ti_path + "/xcomEntries")
+    def get_xcom_entries(query, body, dag_id, dag_run_id, task_id):
+        ti = api.task_instance(api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+        return {"xcom_entries": [_xcom(ti)], "total_entries": 1}
+
+    @route("GET", ti_path + "/xcomEntries/(?P<xcom_key>[^/]+)")
+    def get_xcom_entry(query, body, dag_id, dag_run_id, task_id, xcom_key):
+        ti = api.task_instance(api.dag_index(dag_id), api.run_index(dag_run_id), api.task_index(task_id))
+        if xcom_key != "return_value":
+            raise NotFound(xcom_key)
+        return {**_xcom(ti), "value": json.dumps({"rows": 1000})}
+
+    # Connections, variables and pools
+
+    @route("GET", "/connections")
+    def get_connections(query, body):
+        return _collection("connections", range(fleet.connections), query, api.connection)
+
+    @route("POST", "/connections")
+    def post_connection(query, body):
+        return {key: value for key, value in (body or {}).items() if key != "password"}
+
+    @route("POST", "/connections/test")
+    def test_connection(query, body):
+        return {"status": True, "message": "Connection successfully tested"}
+
+    @route("GET", "/connections/(?P<connection_id>[^/]+)")
+    def get_connection(query, body, connection_id):
+        return api.connection(_index(connection_id, "conn_", fleet.connections))
+
+    @route("PATCH", "/connections/(?P<connection_id>[^/]+)")
+    def patch_connection(query, body, connection_id):
+        connection = api.connection(_index(connection_id, "conn_", fleet.connections))
+        connection.update({key: value for key, value in (body or {}).items() if key != "password"})
+        return connection
+
+    @route("DELETE", "/connections/(?P<connection_id>[^/]+)")
+    def delete_connection(query, body, connection_id):
+        _index(connection_id, "conn_", fleet.connections)
+
+    @route("GET", "/variables")
+    def get_variables(query, body):
+        return _collection("variables", range(fleet.variables), query, api.variable)
+
+    @route("POST", "/variables")
+    def post_variables(query, body):
+        return body
+
+    @route("GET", "/variables/(?P<key>[^/]+)")
+    def get_variable(query, body, key):
+        return api.variable(_index(key, "var_", fleet.variables))
+
+    @route("PATCH", "/variables/(?P<key>[^/]+)")
+    def patch_variable(query, body, key):
+        return {**api.variable(_index(key, "var_", fleet.variables)), **(body or {})}
+
+    @route("DELETE", "/variables/(?P<key>[^/]+)")
+    def delete_variable(query, body, key):
+        _index(key, "var_", fleet.variables)
+
+    @route("GET", "/pools")
+    def get_pools(query, body):
+        return _collection("pools", range(fleet.pools), query, api.pool)
+
+    @route("POST", "/pools")
+    def post_pool(query, body):
+        return {**api.pool(0), **(body or {})}
+
+    @route("GET", "/pools/(?P<pool_name>[^/]+)")
+    def get_pool(query, body, pool_name):
+        return api.pool(api.pool_index(pool_name))
+
+    @route("PATCH", "/pools/(?P<pool_name>[^/]+)")
+    def patch_pool(query, body, pool_name):
+        return {**api.pool(api.pool_index(pool_name)), **(body or {})}
+
+    @route("DELETE", "/pools/(?P<pool_name>[^/]+)")
+    def delete_pool(query, body, pool_name):
+        api.pool_index(pool_name)
+
+    # Datasets
+
+    def dataset_index(uri: str) -> int:
+        return _index(uri, "s3://fleet/dataset_", fleet.datasets)
+
+    @route("GET", "/datasets")
+    def get_datasets(query, body):
+        pattern = query.get("uri_pattern", [None])[0]
+        indices = (n for n in range(fleet.datasets) if not pattern or pattern in api.dataset_uri(n))
+        return _collection("datasets", indices, query, api.dataset)
+
+    @route("GET", "/datasets/events")
+    def get_dataset_events(query, body):
+        dataset_id = query.get("dataset_id", [None])[0]
+        events = range(fleet.datasets * 5)
+        if dataset_id is not None:
+            events = (n for n in events if n % max(1, fleet.datasets) + 1 == int(dataset_id))
+        return _collection("dataset_events", events, query, api.dataset_event)
+
+    @route("POST", "/datasets/events")
+    def create_dataset_event(query, body):
+        event = api.dataset_event(dataset_index((body or {}).get("dataset_uri", "")))
+        return {**event, "extra": (body or {}).get("extra") or {}}
+
+    @route("GET", "/datasets/queuedEvent/(?P<uri>.+)")
+    def get_dataset_queued_events(query, body, uri):
+        n = dataset_index(uri)
+        dags = [i for i in range(n, fleet.dags, max(1, fleet.datasets)) if i % 5 == 0]
+        return {"queued_events": [api.queued_event(i) for i in dags], "total_entries": len(dags)}
+
+    @route("DELETE", "/datasets/queuedEvent/(?P<uri>.+)")
+    def delete_dataset_queued_events(query, body, uri):
+        dataset_index(uri)
+
+    @route("GET", "/datasets/(?P<uri>.+)")
+    def get_dataset(query, body, uri):
+        return api.dataset(dataset_index(uri))
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/datasets/queuedEvent")
+    def get_dag_dataset_queued_events(query, body, dag_id):
+        i = api.dag_index(dag_id)
+        events = [api.queued_event(i)] if i % 5 == 0 else []
+        return {"queued_events": events, "total_entries": len(events)}
+
+    @route("DELETE", "/dags/(?P<dag_id>[^/~]+)/datasets/queuedEvent")
+    def delete_dag_dataset_queued_events(query, body, dag_id):
+        api.dag_index(dag_id)
+
+    @route("GET", "/dags/(?P<dag_id>[^/~]+)/datasets/queuedEvent/(?P<uri>.+)")
+    def get_dag_dataset_queued_event(query, body, dag_id, uri):
+        i = api.dag_index(dag_id)
+        if i % 5 != 0 or dataset_index(uri) != i % max(1, fleet.datasets):
+            raise NotFound(uri)
+        return api.queued_event(i)
+
+    @route("DELETE", "/dags/(?P<dag_id>[^/~]+)/datasets/queuedEvent/(?P<uri>.+)")
+    def delete_dag_dataset_queued_event(query, body, dag_id, uri):
+        api.dag_index(dag_id)
+        dataset_index(uri)
+
+    # Event logs and import errors
+
+    @route("GET", "/eventLogs")
+    def get_event_logs(query, body):
+        ids = range(1, fleet.event_logs + 1)
+        after = query.get("after", [None])[0]
+        if after is not None:
+            seconds = int((datetime.fromisoformat(after) - BASE_DATE).total_seconds())
+            ids = range(max(1, seconds + 1), fleet.event_logs + 1)
+        if query.get("order_by", [""])[0].startswith("-"):
+            ids = ids[::-1]
+        dag_id, event = query.get("dag_id", [None])[0], query.get("event", [None])[0]
+        if dag_id is not None or event is not None:
+            ids = (
+                n
+                for n in ids
+                if (dag_id is None or api.event_log(n)["dag_id"] == dag_id)
+                and (event is None or api.event_log(n)["event"] == event)
+            )
+        return _collection("event_logs", ids, query, api.event_log)
+
+    @route("GET", "/eventLogs/(?P<event_log_id>[0-9]+)")
+    def get_event_log(query, body, event_log_id):
+        n = int(event_log_id)
+        if not 1 <= n <= fleet.event_logs:
+            raise NotFound(event_log_id)
+        return api.event_log(n)
+
+    @route("GET", "/importErrors")
+    def get_import_errors(query, body):
+        return _collection("import_errors", range(fleet.import_errors), query, api.import_error)
+
+    @route("GET", "/importErrors/(?P<import_error_id>[0-9]+)")
+    def get_import_error(query, body, import_error_id):
+        n = int(import_error_id) - 1
+        if not 0 <= n < fleet.import_errors:
+            raise NotFound(import_error_id)
+        return api.import_error(n)
+
+    return [(method, re.compile(re.escape(API_PREFIX) + path), handler) for method, path, handler in table]
+
+
+def _reference(task_instance: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: task_instance[key] for key in ("dag_id", "dag_run_id", "task_id", "execution_date")}
+
+
+def _xcom(task_instance: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "key": "return_value",
+        "dag_id": task_instance["dag_id"],
+        "task_id": task_instance["task_id"],
+        "execution_date": task_instance["execution_date"],
+        "timestamp": task_instance["end_date"] or task_instance["execution_date"],
+        "map_index": -1,
+    }
+
+
+class FakeAirflowServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], fleet: Fleet):
+        super().__init__(address, FakeAirflowHandler)
+        self.fleet = fleet
+        self.routes = routes(FleetApi(fleet))
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        """Requests served so far, and how many were and have been in flight at once; ``reset`` restarts the peak."""
+        with self._stats_lock:
+            stats = {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "connections": self.connections,
+            }
+            if reset:
+                self.max_in_flight = self.in_flight
+        return stats
+
+
+class FakeAirflowHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests like a real deployment behind gunicorn does
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall every response by ~40 ms
+    disable_nagle_algorithm = True
+    server: FakeAirflowServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server._stats_lock:
+            self.server.connections += 1
+
+    def finish(self):
+        super().finish()
+        with self.server._stats_lock:
+            self.server.connections -= 1
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        if url.path == STATS_PATH:
+            self._send(200, self.server.stats(reset="reset" in parse_qs(url.query)))
+            return
+        with self.server._stats_lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            self._respond(method, url)
+        finally:
+            with self.server._stats_lock:
+                self.server.in_flight -= 1
+
+    def _respond(self, method: str, url) -> None:
+        if self.server.fleet.latency_ms:
+            time.sleep(self.server.fleet.latency_ms / 1000)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        query = parse_qs(url.query)
+        for route_method, pattern, handler in self.server.routes:
+            match = pattern.fullmatch(url.path)
+            if route_method == method and match:
+                params = {name: unquote(value) for name, value in match.groupdict().items()}
+                try:
+                    result = handler(query, body, **params)
+                except NotFound as e:
+                    self._send(404, {"status": 404, "title": "Not Found", "detail": f"{e} not found"})
+                    return
+                if result is None:
+                    self._send(201 if method == "PUT" else 204, None)
+                else:
+                    self._send(200, result)
+                return
+        self._send(404, {"status": 404, "title": "Not Found", "detail": f"No endpoint {method} {url.path}"})
+
+    def _send(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def fleet_options(command):
+    """Add an option for every field of ``Fleet`` to a click command."""
+    for name, default in reversed(asdict(Fleet()).items()):
+        command = click.option(
+            f"--{name.replace('_', '-')}", name, default=default, show_default=True, type=type(default)
+        )(command)
+    return command
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", default=8080, help="Port to listen on.")
+@fleet_options
+def main(host: str, port: int, **fleet: Any) -> None:
+    server = FakeAirflowServer((host, port), Fleet(**fleet))
+    click.echo(f"Serving a fake Airflow with {server.fleet.task_instances} task instances at {server.url}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark response compression on the HTTP transport with a large get_dags result.
+
+Runs the server in-process with a canned get_dags response, calls the tool over streamable HTTP once per
+content coding (identity is the uncompressed baseline), and reports the bytes on the wire, the latency,
+and the time the transfer would take on a slow link.
+
+    uv run python -m benchmarks.http_compression --dags 2000 --link-mbps 10
+"""
+
+import json
+import statistics
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import click
+import httpx
+import uvicorn
+from fastmcp.tools import Tool
+
+from benchmarks.common import free_port, open_session
+from src.airflow.dag import dag_api, get_dags
+from src.compression import brotli
+from src.server import app, http_middleware
+
+
+def make_dags(count: int) -> dict:
+    return {
+        "dags": [
+            {
+                "dag_id": f"etl_pipeline_{i:05d}",
+                "description": "Loads partner data into the warehouse and refreshes downstream marts",
+                "file_token": f"Ii9vcHQvYWlyZmxvdy9kYWdzL2V0bF97aX0ucHki.{i:08x}",
+                "fileloc": f"/opt/airflow/dags/etl/etl_pipeline_{i:05d}.py",
+                "is_active": True,
+                "is_paused": i % 7 == 0,
+                "is_subdag": False,
+                "owners": ["data-platform"],
+                "root_dag_id": None,
+                "schedule_interval": {"__type": "CronExpression", "value": "0 * * * *"},
+                "tags": [{"name": "etl"}, {"name": f"team-{i % 12}"}],
+                "last_parsed_time": "2024-05-01T12:00:00+00:00",
+                "next_dagrun": "2024-05-01T13:00:00+00:00",
+                "max_active_runs": 16,
+                "max_active_tasks": 16,
+                "has_import_errors": False,
+            }
+            for i in range(count)
+        ],
+        "total_entries": count,
+    }
+
+
+def start_server() -> tuple[uvicorn.Server, str]:
+    port = free_port()
+    http_app = app.http_app(middleware=http_middleware(compression=True))
+    server = uvicorn.Server(uvicorn.Config(http_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}/mcp"
+
+
+def measure(url: str, accept_encoding: str, iterations: int) -> dict:
+    latencies, wire_bytes, decoded_bytes = [], 0, 0
+    with httpx.Client(headers={"Accept-Encoding": accept_encoding}, timeout=60) as client:
+        headers = open_session(client, url)
+        for i in range(iterations):
+            call = {"jsonrpc": "2.0", "id": i + 1, "method": "tools/call", "params": {"name": "get_dags"}}
+            started = time.perf_counter()
+            with client.stream("POST", url, json=call, headers=headers) as response:
+                content = response.read()
+            latencies.append(time.perf_counter() - started)
+            wire_bytes, decoded_bytes = response.num_bytes_downloaded, len(content)
+    return {
+        "accept_encoding": accept_encoding,
+        "wire_bytes": wire_bytes,
+        "decoded_bytes": decoded_bytes,
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 2),
+        "latency_ms_max": round(max(latencies) * 1000, 2),
+    }
+
+
+@click.command()
+@click.option("--dags", default=2000, help="Number of DAGs in the get_dags result.")
+@click.option("--iterations", default=20, help="Tool calls per scenario.")
+@click.option("--link-mbps", default=10.0, help="Link speed used to estimate the transfer time on a slow network.")
+def main(dags: int, iterations: int, link_mbps: float) -> None:
+    app.add_tool(Tool.from_function(get_dags, name="get_dags", description="List DAGs"))
+    response = MagicMock()
+    response.to_dict.return_value = make_dags(dags)
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    results = []
+    with patch.object(dag_api, "get_dags", return_value=response):
+        server, url = start_server()
+        try:
+            for accept_encoding in encodings:
+                result = measure(url, accept_encoding, iterations)
+                result["transfer_ms_at_link"] = round(result["wire_bytes"] * 8 / (link_mbps * 1_000_000) * 1000, 2)
+                results.append(result)
+        finally:
+            server.should_exit = True
+
+    report = {"dags": dags, "iterations": iterations, "link_mbps": link_mbps, "results": results}
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
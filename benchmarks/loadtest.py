@@ -0,0 +1,426 @@
+"""
+Load-test the server on the streamable HTTP transport with many concurrent MCP sessions.
+
+The server is started with ``--transport http`` against a fake Airflow (``benchmarks.fake_airflow``), against
+the Airflow at ``--airflow-url``, or replaying the Airflow traffic recorded in ``--cassette`` (see
+``src.airflow.cassette``; ``--record`` writes one while loading an Airflow). For every step of ``--clients``, that
+many clients each open their own MCP session and call tools in a closed loop for ``--duration`` seconds, picking
+each call from a weighted mix of read-only tools. ``--mix`` replaces the default mix with a JSON object of tool
+name to either a weight or ``{"weight": ..., "arguments": {...}}``, so a recorded production workload can be
+replayed with the arguments it was recorded with. Calls started during the first ``--warmup`` seconds of a step
+are not counted.
+
+Each step reports throughput, latency percentiles and the error rate, along with:
+
+- event-loop lag: how much longer a JSON-RPC ``ping`` takes than when the server is idle. Pings are answered on
+  the event loop without any upstream request, so their delay is time the loop spent on something else;
+- the CPU used by the server (in cores), its thread count and resident memory (Linux only);
+- the most upstream requests in flight at once, counted by the fake Airflow;
+- the CPU used by the load generator itself, since a saturated driver caps throughput too.
+
+The first step where throughput stops growing, or where p99 latency more than doubles, is reported as the
+saturation point, with the resource most likely exhausted: the server's CPU, its event loop, the worker threads
+running blocking upstream calls, the upstream connection pool, or the upstream itself.
+
+    uv run python -m benchmarks.loadtest --clients 1,4,16,64 --duration 10 --latency-ms 20
+    uv run python -m benchmarks.loadtest --mix mix.json --airflow-url https://airflow.example.com --record prod.jsonl.gz
+    uv run python -m benchmarks.loadtest --mix mix.json --cassette prod.jsonl.gz --latency-scale 0.5
+"""
+
+import json
+import os
+import platform
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import click
+import httpx
+from airflow_client.client import Configuration
+
+from benchmarks.common import HttpSession, call_tool, free_port
+from benchmarks.fake_airflow import STATS_PATH, Fleet, fleet_options
+from benchmarks.tools import (
+    CALL_TIMEOUT_SECONDS,
+    git_commit,
+    open_session,
+    percentile,
+    scenarios,
+    start_fake_airflow,
+    start_server,
+    stop,
+)
+
+# Roughly what an agent inspecting a deployment calls: mostly single-entity reads, some listings and logs
+DEFAULT_MIX = {
+    "get_dag": 20,
+    "get_dag_run": 15,
+    "get_dag_runs": 10,
+    "get_task_instance": 10,
+    "list_task_instances": 8,
+    "fetch_dags": 8,
+    "get_log": 5,
+    "get_health": 5,
+    "get_import_errors": 4,
+    "get_dag_runs_batch": 4,
+    "triage_failures": 3,
+    "query": 3,
+    "batch": 2,
+    "get_event_logs": 3,
+}
+PING_INTERVAL_SECONDS = 0.05
+IDLE_PINGS = 50
+# A step saturates the server when adding clients gains less throughput than this, or p99 grows more than this
+MIN_THROUGHPUT_GAIN = 0.1
+MAX_P99_GROWTH = 2.0
+# The GIL keeps a Python process below one core, so most of one is as busy as it gets
+BUSY_CPU_FRACTION = 0.8
+# Event-loop lag above this fraction of the median call latency means the loop, not the upstream, delays calls
+BLOCKED_LOOP_LAG_FRACTION = 0.5
+
+
+def default_thread_pool_size() -> int:
+    """Worker threads of asyncio.to_thread, as sized by the default executor of the server's event loop."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def process_sample(pid: int) -> Optional[Dict[str, float]]:
+    """CPU seconds used so far, thread count and resident memory of a process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, the fields after it may not
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            status = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return {
+        "cpu_seconds": (int(fields[11]) + int(fields[12])) / ticks,
+        "threads": int(status["Threads"]),
+        "rss_bytes": int(status["VmRSS"].split()[0]) * 1024,
+    }
+
+
+def upstream_stats(airflow_url: Optional[str], reset: bool = False) -> Optional[Dict[str, int]]:
+    """Request counters of the fake Airflow, or None when the upstream does not serve them."""
+    if airflow_url is None:
+        return None
+    try:
+        response = httpx.get(f"{airflow_url}{STATS_PATH}", params={"reset": "1"} if reset else None)
+    except httpx.TransportError:
+        return None
+    return response.json() if response.status_code == 200 else None
+
+
+def load_mix(path: Optional[str], available: Dict[str, dict]) -> Dict[str, Dict[str, Any]]:
+    """Tool name to the weight of its calls and their arguments; tools given without arguments use their scenario."""
+    if path is None:
+        return {name: {"weight": weight, "arguments": available[name]} for name, weight in DEFAULT_MIX.items()}
+    with open(path) as f:
+        configured = json.load(f)
+    mix = {}
+    for name, value in configured.items():
+        entry = value if isinstance(value, dict) else {"weight": value}
+        if "arguments" not in entry and name not in available:
+            raise click.BadParameter(f"No scenario for {name}, give its arguments", param_hint="--mix")
+        if entry.get("weight", 1) > 0:
+            mix[name] = {
+                "weight": float(entry.get("weight", 1)),
+                "arguments": entry.get("arguments", available.get(name)),
+            }
+    return mix
+
+
+class LagProbe(threading.Thread):
+    """Pings the server at a steady interval from its own session and records the round-trip times."""
+
+    def __init__(self, url: str):
+        super().__init__(daemon=True)
+        self.session = HttpSession(url, CALL_TIMEOUT_SECONDS)
+        self.samples: List[float] = []
+        self._done = threading.Event()
+
+    def ping(self) -> float:
+        started = time.perf_counter()
+        self.session.request("ping")
+        return time.perf_counter() - started
+
+    def run(self) -> None:
+        while not self._done.wait(PING_INTERVAL_SECONDS):
+            self.samples.append(self.ping())
+
+    def stop(self) -> List[float]:
+        self._done.set()
+        self.join()
+        samples, self.samples = self.samples, []
+        return samples
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def run_client(
+    session: HttpSession,
+    calls: List[tuple],
+    weights: List[float],
+    seed: int,
+    measure_from: float,
+    deadline: float,
+    records: List[tuple],
+) -> None:
+    rng = random.Random(seed)
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        name, arguments = rng.choices(calls, weights)[0]
+        error = None
+        try:
+            call_tool(session, name, arguments, timeout=CALL_TIMEOUT_SECONDS)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)[:200]}"
+        if started >= measure_from:
+            records.append((name, time.perf_counter() - started, error))
+
+
+def run_step(
+    url: str,
+    server_pid: int,
+    airflow_url: Optional[str],
+    clients: int,
+    mix: Dict[str, Dict[str, Any]],
+    options: dict,
+    idle_ping: float,
+) -> Dict[str, Any]:
+    calls = [(name, entry["arguments"]) for name, entry in mix.items()]
+    weights = [entry["weight"] for entry in mix.values()]
+    sessions = [HttpSession(url, CALL_TIMEOUT_SECONDS) for _ in range(clients)]
+    records: List[tuple] = []
+    probe = LagProbe(url)
+    try:
+        started = time.perf_counter()
+        measure_from = started + options["warmup"]
+        deadline = measure_from + options["duration"]
+        threads = [
+            threading.Thread(
+                target=run_client,
+                args=(session, calls, weights, options["seed"] + n, measure_from, deadline, records),
+                daemon=True,
+            )
+            for n, session in enumerate(sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(max(0.0, measure_from - time.perf_counter()))
+
+        upstream_before = upstream_stats(airflow_url, reset=True)
+        server_before = process_sample(server_pid)
+        driver_before = time.process_time()
+        probe.start()
+        measured_at = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        lags = probe.stop()
+        # Calls still running at the deadline end after it; measure until the last of them finished
+        elapsed = time.perf_counter() - measured_at
+        driver_cpu = time.process_time() - driver_before
+        server_after = process_sample(server_pid)
+        upstream_after = upstream_stats(airflow_url)
+    finally:
+        probe.close()
+        for session in sessions:
+            session.close()
+
+    durations = [duration for _, duration, error in records if error is None]
+    errors = [error for _, _, error in records if error is not None]
+    step: Dict[str, Any] = {
+        "clients": clients,
+        "calls": len(records),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(records), 4) if records else None,
+        "calls_per_second": round(len(durations) / elapsed, 1),
+        "p50_ms": round(percentile(durations, 0.5) * 1000, 2) if durations else None,
+        "p90_ms": round(percentile(durations, 0.9) * 1000, 2) if durations else None,
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 2) if durations else None,
+        "event_loop_lag_p50_ms": round(max(0.0, percentile(lags, 0.5) - idle_ping) * 1000, 2) if lags else None,
+        "event_loop_lag_p99_ms": round(max(0.0, percentile(lags, 0.99) - idle_ping) * 1000, 2) if lags else None,
+        "driver_cpu_cores": round(driver_cpu / elapsed, 2),
+        "tools": tool_breakdown(records),
+    }
+    if server_before and server_after:
+        step["server_cpu_cores"] = round((server_after["cpu_seconds"] - server_before["cpu_seconds"]) / elapsed, 2)
+        step["server_threads"] = server_after["threads"]
+        step["server_rss_bytes"] = server_after["rss_bytes"]
+    if upstream_before and upstream_after:
+        requests = upstream_after["requests"] - upstream_before["requests"]
+        step["upstream_requests_per_second"] = round(requests / elapsed, 1)
+        step["upstream_max_in_flight"] = upstream_after["max_in_flight"]
+    if errors:
+        step["last_error"] = errors[-1]
+    return step
+
+
+def tool_breakdown(records: List[tuple]) -> Dict[str, Dict[str, Any]]:
+    by_tool: Dict[str, List[tuple]] = {}
+    for name, duration, error in records:
+        by_tool.setdefault(name, []).append((duration, error))
+    breakdown = {}
+    for name, results in sorted(by_tool.items()):
+        durations = [duration for duration, error in results if error is None]
+        breakdown[name] = {
+            "calls": len(results),
+            "errors": len(results) - len(durations),
+            "p50_ms": round(percentile(durations, 0.5) * 1000, 2) if durations else None,
+            "p99_ms": round(percentile(durations, 0.99) * 1000, 2) if durations else None,
+        }
+    return breakdown
+
+
+def find_saturation(steps: List[Dict[str, Any]], limits: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """Return the first step where more clients stopped paying off, and what most likely limited it."""
+    for previous, step in zip(steps, steps[1:], strict=False):
+        if not previous["calls_per_second"] or not previous["p99_ms"] or not step["p99_ms"]:
+            continue
+        gain = step["calls_per_second"] / previous["calls_per_second"] - 1
+        growth = step["p99_ms"] / previous["p99_ms"]
+        if gain < MIN_THROUGHPUT_GAIN or growth > MAX_P99_GROWTH:
+            return {
+                "clients": step["clients"],
+                "throughput_gain": round(gain, 3),
+                "p99_growth": round(growth, 2),
+                "bottleneck": bottleneck(step, limits),
+            }
+    return None
+
+
+def bottleneck(step: Dict[str, Any], limits: Dict[str, int]) -> str:
+    in_flight = step.get("upstream_max_in_flight")
+    if step["driver_cpu_cores"] >= BUSY_CPU_FRACTION:
+        return "driver: the load generator used a full core; run it with fewer clients or on another machine"
+    if step.get("server_cpu_cores", 0) >= BUSY_CPU_FRACTION:
+        return "cpu: the server used a full core, so its event loop and worker threads compete for the GIL"
+    lag = step["event_loop_lag_p99_ms"]
+    if lag is not None and step["p50_ms"] and lag >= step["p50_ms"] * BLOCKED_LOOP_LAG_FRACTION:
+        if in_flight is not None and in_flight <= 1:
+            return "event loop: upstream requests are made one at a time on the event loop, blocking it"
+        return "event loop: the loop is busy between upstream requests (encoding results, parsing responses)"
+    if in_flight is not None and in_flight >= limits["thread_pool"]:
+        return f"thread pool: {in_flight} upstream requests in flight, the default executor has {limits['thread_pool']}"
+    if in_flight is not None and in_flight >= limits["connection_pool"]:
+        return (
+            f"connection pool: {in_flight} upstream requests in flight, "
+            f"the Airflow client pools {limits['connection_pool']} connections"
+        )
+    return "upstream: the server waits on Airflow, which answers more slowly under load"
+
+
+@click.command()
+@click.option("--clients", default="1,4,16,64", help="Comma-separated numbers of concurrent clients, one step each.")
+@click.option("--duration", default=10.0, help="Seconds measured per step.")
+@click.option("--warmup", default=2.0, help="Seconds each step runs before measuring.")
+@click.option(
+    "--mix",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON object of tool name to relative weight, replacing the default mix.",
+)
+@click.option("--seed", default=0, help="Seed of the tool choices; client n uses seed + n.")
+@click.option("--airflow-url", help="Load an existing Airflow (or fake Airflow) instead of starting a fake one.")
+@click.option(
+    "--cassette",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Replay the Airflow traffic recorded in this cassette instead of contacting an Airflow.",
+)
+@click.option("--latency-scale", default=1.0, help="Multiplier of the latencies replayed from --cassette.")
+@click.option("--record", type=click.Path(dir_okay=False), help="Record the Airflow traffic to this cassette.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the JSON report to this file.")
+@fleet_options
+def main(
+    clients: str,
+    duration: float,
+    warmup: float,
+    mix: Optional[str],
+    seed: int,
+    airflow_url: Optional[str],
+    cassette: Optional[str],
+    latency_scale: float,
+    record: Optional[str],
+    output: Optional[str],
+    **fleet_fields: Any,
+) -> None:
+    if cassette and (record or airflow_url):
+        raise click.UsageError("--cassette replaces the Airflow; it cannot be combined with --airflow-url or --record")
+    fleet = Fleet(**fleet_fields)
+    steps_clients = [int(value) for value in clients.split(",") if value.strip()]
+    tool_mix = load_mix(mix, scenarios(fleet))
+    options = {"duration": duration, "warmup": warmup, "seed": seed}
+    env = {}
+    if cassette:
+        env = {
+            "AIRFLOW_CASSETTE": os.path.abspath(cassette),
+            "AIRFLOW_CASSETTE_MODE": "replay",
+            "AIRFLOW_CASSETTE_LATENCY_SCALE": str(latency_scale),
+        }
+        options["latency_scale"] = latency_scale
+    elif record:
+        env = {"AIRFLOW_CASSETTE": os.path.abspath(record), "AIRFLOW_CASSETTE_MODE": "record"}
+    limits = {
+        "thread_pool": default_thread_pool_size(),
+        "connection_pool": Configuration().connection_pool_maxsize,
+    }
+
+    fake_airflow = None
+    if airflow_url is None and not cassette:
+        fake_port = free_port()
+        fake_airflow = start_fake_airflow(fleet, fake_port)
+        airflow_url = f"http://127.0.0.1:{fake_port}"
+    port = free_port()
+    # A replaying server never contacts AIRFLOW_HOST
+    server = start_server("http", airflow_url or "http://127.0.0.1:9", port, env)
+    try:
+        url = f"http://127.0.0.1:{port}/mcp"
+        open_session("http", server, port).close()
+        probe = LagProbe(url)
+        idle = [probe.ping() for _ in range(IDLE_PINGS)]
+        probe.close()
+        idle_ping = percentile(idle, 0.5)
+
+        steps = []
+        for count in steps_clients:
+            step = run_step(url, server.pid, airflow_url, count, tool_mix, options, idle_ping)
+            click.echo(
+                f"{count:>4} clients: {step['calls_per_second']:>8} calls/s, p99 {step['p99_ms']} ms, "
+                f"errors {step['error_rate']}, loop lag p99 {step['event_loop_lag_p99_ms']} ms",
+                err=True,
+            )
+            steps.append(step)
+    finally:
+        stop(server)
+        if fake_airflow is not None:
+            stop(fake_airflow)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "fleet": vars(fleet) if fake_airflow is not None else None,
+        "airflow_url": None if fake_airflow is not None else airflow_url,
+        "cassette": cassette,
+        "options": options,
+        "mix": {name: entry["weight"] for name, entry in tool_mix.items()},
+        "limits": limits,
+        "idle_ping_ms": round(idle_ping * 1000, 2),
+        "steps": steps,
+        "saturation": find_saturation(steps, limits),
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Benchmark how fast the server starts and how much memory it holds while idle.
+
+Everything runs offline: no Airflow is needed, since listing tools does not call it. Three things are measured,
+each in fresh interpreters:
+
+- import time of ``src.main`` and of every API module, from ``python -X importtime``;
+- time from launching ``src.main:main`` until the first ``tools/list`` answer, for each ``--apis`` selection
+  and transport;
+- resident memory of the server after it has been idle for a moment (Linux only).
+
+Results are printed (or written with ``--output``) as JSON. Given the report of an earlier run with ``--baseline``,
+the benchmark fails when a measurement got worse by more than ``--tolerance``.
+
+    uv run python -m benchmarks.startup --runs 5 --output startup.json
+    uv run python -m benchmarks.startup --transport stdio --apis dag --apis dag,dagrun
+    uv run python -m benchmarks.startup --baseline startup.json --tolerance 0.2
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Optional
+
+import click
+import httpx
+
+from benchmarks.common import INITIALIZE, INITIALIZED, MCP_HEADERS, free_port, jsonrpc_result, open_session
+from src.enums import APIType
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_LIST = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+ALL_APIS = "all"
+READY_TIMEOUT_SECONDS = 60
+
+
+def server_command(transport: str, apis: str, port: Optional[int] = None) -> list[str]:
+    """Command running the ``src.main:main`` entry point in a fresh interpreter."""
+    command = [sys.executable, "-c", "from src.main import main; main()", "--transport", transport]
+    if apis != ALL_APIS:
+        for api in apis.split(","):
+            command += ["--apis", api]
+    if port is not None:
+        command += ["--mcp-host", "127.0.0.1", "--mcp-port", str(port)]
+    return command
+
+
+def idle_rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def measure_import_times() -> dict:
+    """Cumulative import time in microseconds of src.main and of each API module, each in a fresh interpreter."""
+    modules = ["src.main"] + [f"src.airflow.{api.value}" for api in APIType]
+    times = {}
+    for module in modules:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=REPO_ROOT,
+        )
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+                times[module] = int(line.split("|")[1])
+    return times
+
+
+def first_tool_list_stdio(process: subprocess.Popen, port: Optional[int]) -> int:
+    for message in (INITIALIZE, INITIALIZED, TOOLS_LIST):
+        process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+    for line in process.stdout:
+        message = json.loads(line)
+        if message.get("id") == TOOLS_LIST["id"]:
+            return len(message["result"]["tools"])
+    raise RuntimeError(f"Server exited with {process.wait()} before answering tools/list")
+
+
+def first_tool_list_http(process: subprocess.Popen, port: Optional[int]) -> int:
+    url = f"http://127.0.0.1:{port}/mcp"
+    with httpx.Client(timeout=10) as client:
+        headers = _wait_until_ready(lambda: open_session(client, url), process)
+        message = jsonrpc_result(client.post(url, json=TOOLS_LIST, headers=headers))
+    return len(message["result"]["tools"])
+
+
+def first_tool_list_sse(process: subprocess.Popen, port: Optional[int]) -> int:
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10) as client:
+        events = _wait_until_ready(lambda: _EventStream(client.stream("GET", "/sse")), process)
+        try:
+            endpoint = _next_event(events, "endpoint")
+            for message in (INITIALIZE, INITIALIZED, TOOLS_LIST):
+                client.post(endpoint, json=message, headers=MCP_HEADERS).raise_for_status()
+            while True:
+                message = json.loads(_next_event(events, "message"))
+                if message.get("id") == TOOLS_LIST["id"]:
+                    return len(message["result"]["tools"])
+        finally:
+            events.close()
+
+
+FIRST_TOOL_LIST = {"stdio": first_tool_list_stdio, "http": first_tool_list_http, "sse": first_tool_list_sse}
+
+
+class _EventStream:
+    def __init__(self, stream_context):
+        self._context = stream_context
+        self._lines = stream_context.__enter__().iter_lines()
+
+    def __iter__(self):
+        return self._lines
+
+    def close(self):
+        self._context.__exit__(None, None, None)
+
+
+def _next_event(events: _EventStream, name: str) -> str:
+    event = None
+    for line in events:
+        if line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:") and event == name:
+            return line[len("data:") :].strip()
+    raise RuntimeError(f"Event stream ended before a {name} event")
+
+
+def _wait_until_ready(connect, process: subprocess.Popen):
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while True:
+        try:
+            return connect()
+        except httpx.TransportError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with {process.returncode} before accepting connections") from None
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def stop(process: subprocess.Popen) -> None:
+    if process.stdin is not None:
+        process.stdin.close()
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    if process.stdout is not None:
+        process.stdout.close()
+
+
+def start_server(transport: str, apis: str, port: Optional[int]) -> subprocess.Popen:
+    stdio = transport == "stdio"
+    return subprocess.Popen(
+        server_command(transport, apis, port),
+        stdin=subprocess.PIPE if stdio else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if stdio else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        cwd=REPO_ROOT,
+    )
+
+
+def measure_startup(transport: str, apis: str, runs: int, idle_seconds: float) -> dict:
+    durations, rss, tools = [], [], 0
+    for _ in range(runs):
+        port = None if transport == "stdio" else free_port()
+        started = time.perf_counter()
+        process = start_server(transport, apis, port)
+        try:
+            tools = FIRST_TOOL_LIST[transport](process, port)
+            durations.append(time.perf_counter() - started)
+            # Let one-off startup work settle before sampling memory
+            time.sleep(idle_seconds)
+            rss.append(idle_rss_bytes(process.pid))
+        finally:
+            stop(process)
+    return {
+        "transport": transport,
+        "apis": apis,
+        "tools": tools,
+        "first_tool_list_ms_median": round(statistics.median(durations) * 1000, 1),
+        "first_tool_list_ms_min": round(min(durations) * 1000, 1),
+        "idle_rss_bytes_median": int(statistics.median(rss)) if None not in rss else None,
+    }
+
+
+def package_version() -> Optional[str]:
+    try:
+        return version("mcp-server-apache-airflow")
+    except PackageNotFoundError:
+        return None
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe every measurement more than ``tolerance`` (a fraction) worse than in the baseline report."""
+    found = []
+    for module, import_time in report["import_time_us"].items():
+        previous = baseline.get("import_time_us", {}).get(module)
+        if previous and import_time > previous * (1 + tolerance):
+            found.append(f"import {module}: {previous} -> {import_time} us")
+    previous_startup = {(run["transport"], run["apis"]): run for run in baseline.get("startup", [])}
+    for run in report["startup"]:
+        previous = previous_startup.get((run["transport"], run["apis"]))
+        if previous is None:
+            continue
+        for metric in ("first_tool_list_ms_median", "idle_rss_bytes_median"):
+            if previous.get(metric) and run[metric] and run[metric] > previous[metric] * (1 + tolerance):
+                found.append(f"{run['transport']} --apis {run['apis']} {metric}: {previous[metric]} -> {run[metric]}")
+    return found
+
+
+@click.command()
+@click.option(
+    "--transport",
+    "transports",
+    type=click.Choice(list(FIRST_TOOL_LIST)),
+    multiple=True,
+    default=list(FIRST_TOOL_LIST),
+    help="Transports to start the server with, default is all.",
+)
+@click.option(
+    "--apis",
+    "api_selections",
+    multiple=True,
+    help="Comma-separated --apis selection to start the server with, or 'all'. Default is all, then each API alone.",
+)
+@click.option("--runs", default=3, help="Server starts per transport and API selection.")
+@click.option("--idle-seconds", default=1.0, help="How long the server idles before its memory is sampled.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the JSON report to this file.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Report of an earlier run; exit with status 1 if any measurement regressed beyond --tolerance.",
+)
+@click.option("--tolerance", default=0.2, help="Allowed slowdown or growth relative to --baseline, as a fraction.")
+def main(
+    transports: tuple,
+    api_selections: tuple,
+    runs: int,
+    idle_seconds: float,
+    output: Optional[str],
+    baseline: Optional[str],
+    tolerance: float,
+) -> None:
+    api_selections = api_selections or (ALL_APIS, *(api.value for api in APIType))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "package_version": package_version(),
+        "runs": runs,
+        "import_time_us": measure_import_times(),
+        "startup": [
+            measure_startup(transport, apis, runs, idle_seconds) for transport in transports for apis in api_selections
+        ],
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+    if baseline:
+        with open(baseline) as f:
+            found = regressions(report, json.load(f), tolerance)
+        for regression in found:
+            click.echo(f"Regression: {regression}", err=True)
+        if found:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
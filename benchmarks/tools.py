@@ -0,0 +1,442 @@
+"""
+Benchmark the latency and throughput of every tool against a fake Airflow, over the real MCP transports.
+
+A fake Airflow (``benchmarks.fake_airflow``) serving a synthetic fleet is started, then the server is started
+against it for each transport. Every tool is called ``--iterations`` times in a row to measure its latency, after
+``--warmup`` calls; then the read-only tools are called round-robin by ``--concurrency`` clients at once to
+measure throughput. The peak resident memory of the server is sampled at the end (Linux only).
+
+The fleet is the same for the same options, so reports of different commits can be compared: given the report of
+an earlier run with ``--baseline``, the benchmark fails when a measurement got worse by more than ``--tolerance``.
+
+    uv run python -m benchmarks.tools --output tools.json
+    uv run python -m benchmarks.tools --transport http --tool get_dag_runs_batch --tool triage_failures --dags 10000
+    uv run python -m benchmarks.tools --latency-ms 20 --baseline tools.json --tolerance 0.2
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import click
+import httpx
+
+from benchmarks.common import HttpSession, StdioSession, call_tool, free_port
+from benchmarks.fake_airflow import Fleet, fleet_options
+from src.batch import BATCH_TOOL_NAME
+from src.main import APITYPE_TO_FUNCTIONS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSPORTS = ("stdio", "http")
+READY_TIMEOUT_SECONDS = 60
+CALL_TIMEOUT_SECONDS = 300
+
+
+def scenarios(fleet: Fleet) -> Dict[str, dict]:
+    """Arguments to call each tool with, referring to entities of the fleet."""
+    dag_id = f"dag_{min(10, fleet.dags - 1):05d}"
+    failed_run = "scheduled__2024-06-01T00:00:00+00:00"
+    finished_run = "scheduled__2024-05-31T00:00:00+00:00"
+    failed_task = f"task_{fleet.tasks_per_dag - 1:03d}"
+    dataset = f"s3://fleet/dataset_{min(10, fleet.datasets - 1):04d}"
+    run = {"dag_id": dag_id, "dag_run_id": failed_run}
+    task_instance = {**run, "task_id": failed_task}
+    return {
+        # config
+        "get_config": {},
+        "get_value": {"section": "core", "option": "parallelism"},
+        # connection
+        "list_connections": {"limit": 100},
+        "create_connection": {"conn_id": "benchmark", "conn_type": "http", "host": "example.com"},
+        "get_connection": {"conn_id": "conn_0001"},
+        "update_connection": {"conn_id": "conn_0001", "host": "db.internal"},
+        "delete_connection": {"conn_id": "conn_0001"},
+        "test_connection": {"conn_type": "http", "host": "example.com"},
+        # dag
+        "fetch_dags": {"limit": 100},
+        "get_dag": {"dag_id": dag_id},
+        "get_dag_details": {"dag_id": dag_id},
+        "get_dag_source": {"file_token": f"token-{dag_id}"},
+        "pause_dag": {"dag_id": dag_id},
+        "unpause_dag": {"dag_id": dag_id},
+        "get_dag_tasks": {"dag_id": dag_id},
+        "get_task": {"dag_id": dag_id, "task_id": "task_000"},
+        "get_tasks": {"dag_id": dag_id},
+        "patch_dag": {"dag_id": dag_id, "is_paused": False},
+        "patch_dags": {"dag_id_pattern": "dag_0001", "is_paused": False},
+        "delete_dag": {"dag_id": dag_id},
+        "clear_task_instances": {"dag_id": dag_id, "dry_run": True},
+        "set_task_instances_state": {"dag_id": dag_id, "state": "success", "task_ids": [failed_task], "dry_run": True},
+        "reparse_dag_file": {"file_token": f"token-{dag_id}"},
+        # dagrun
+        "post_dag_run": {"dag_id": dag_id},
+        "get_dag_runs": {"dag_id": dag_id, "limit": 25},
+        "get_dag_runs_batch": {"state": ["failed"], "page_limit": 100, "include_dag": True},
+        "get_dag_run": run,
+        "update_dag_run_state": {**run, "state": "success"},
+        "delete_dag_run": run,
+        "clear_dag_run": {**run, "dry_run": True},
+        "set_dag_run_note": {**run, "note": "benchmark"},
+        "get_upstream_dataset_events": run,
+        "wait_for_dag_run": {"dag_id": dag_id, "dag_run_id": finished_run},
+        # dagstats
+        "get_dag_stats": {"dag_ids": [dag_id]},
+        # dataset
+        "get_datasets": {"limit": 100},
+        "get_dataset": {"uri": dataset},
+        "get_dataset_events": {"limit": 100},
+        "create_dataset_event": {"dataset_uri": dataset},
+        "get_dag_dataset_queued_event": {"dag_id": dag_id, "uri": dataset},
+        "get_dag_dataset_queued_events": {"dag_id": dag_id},
+        "delete_dag_dataset_queued_event": {"dag_id": dag_id, "uri": dataset},
+        "delete_dag_dataset_queued_events": {"dag_id": dag_id},
+        "get_dataset_queued_events": {"uri": dataset},
+        "delete_dataset_queued_events": {"uri": dataset},
+        # eventlog
+        "get_event_logs": {"limit": 100},
+        "get_event_log": {"event_log_id": 1},
+        "tail_event_logs": {"limit": 100},
+        # importerror
+        "get_import_errors": {},
+        "get_import_error": {"import_error_id": 1},
+        # monitoring
+        "get_health": {},
+        "get_health_history": {},
+        "get_version": {},
+        "get_upstream_transfer_stats": {},
+        "refresh_metadata_cache": {},
+        # plugin, pool, provider
+        "get_plugins": {},
+        "get_pools": {},
+        "get_pool": {"pool_name": "default_pool"},
+        "delete_pool": {"pool_name": "pool_001"},
+        "post_pool": {"name": "benchmark", "slots": 8},
+        "patch_pool": {"pool_name": "pool_001", "slots": 16},
+        "get_providers": {},
+        # query
+        "query": {
+            "dags": {"tags": ["finance"], "limit": 50},
+            "runs": {"per_dag": 1},
+            "task_instances": {"state": ["failed"]},
+        },
+        # taskinstance
+        "get_task_instance": task_instance,
+        "list_task_instances": run,
+        "update_task_instance": {**task_instance, "state": "success"},
+        "get_log": {**task_instance, "task_try_number": 2},
+        "list_task_instance_tries": task_instance,
+        "get_task_duration_baseline": {"dag_id": dag_id, "task_id": failed_task},
+        "check_task_duration": {"dag_id": dag_id, "task_id": failed_task, "duration": 120.0},
+        "refresh_task_duration_baselines": {"max_pages": 1},
+        "triage_failures": {"max_dag_runs": 20},
+        # variable
+        "list_variables": {"limit": 100},
+        "create_variable": {"key": "benchmark", "value": "1"},
+        "get_variable": {"key": "var_0001"},
+        "update_variable": {"key": "var_0001", "value": "2"},
+        "delete_variable": {"key": "var_0001"},
+        # xcom
+        "get_xcom_entries": task_instance,
+        "get_xcom_entry": {**task_instance, "xcom_key": "return_value"},
+        # batch
+        BATCH_TOOL_NAME: {
+            "calls": [
+                {"tool": "get_dag", "arguments": {"dag_id": dag_id}},
+                {"tool": "get_dag_runs", "arguments": {"dag_id": dag_id, "limit": 25}},
+                {"tool": "list_task_instances", "arguments": run},
+                {"tool": "get_import_errors", "arguments": {}},
+            ]
+        },
+    }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def start_fake_airflow(fleet: Fleet, port: int) -> subprocess.Popen:
+    command = [sys.executable, "-m", "benchmarks.fake_airflow", "--port", str(port)]
+    for name, value in vars(fleet).items():
+        command += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stderr=subprocess.DEVNULL)
+    _wait_until_ready(lambda: httpx.get(f"http://127.0.0.1:{port}/api/v1/version").raise_for_status(), process)
+    return process
+
+
+def start_server(
+    transport: str, airflow_url: str, port: Optional[int], env: Optional[Dict[str, str]] = None
+) -> subprocess.Popen:
+    # The batch tool is opt-in, and both the tools and the load benchmarks call it
+    command = [sys.executable, "-c", "from src.main import main; main()", "--transport", transport, "--batch-tool"]
+    if port is not None:
+        command += ["--mcp-host", "127.0.0.1", "--mcp-port", str(port)]
+    env = {
+        **os.environ,
+        "AIRFLOW_HOST": airflow_url,
+        "AIRFLOW_USERNAME": "benchmark",
+        "AIRFLOW_PASSWORD": "benchmark",
+        **(env or {}),
+    }
+    stdio = transport == "stdio"
+    return subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if stdio else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if stdio else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        cwd=REPO_ROOT,
+        env=env,
+    )
+
+
+def open_session(transport: str, process: subprocess.Popen, port: Optional[int]):
+    if transport == "stdio":
+        return StdioSession(process)
+    return _wait_until_ready(lambda: HttpSession(f"http://127.0.0.1:{port}/mcp", CALL_TIMEOUT_SECONDS), process)
+
+
+def _wait_until_ready(connect, process: subprocess.Popen):
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while True:
+        try:
+            return connect()
+        except httpx.TransportError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process exited with {process.returncode} before accepting connections") from None
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def stop(process: subprocess.Popen) -> None:
+    if process.stdin is not None:
+        process.stdin.close()
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    if process.stdout is not None:
+        process.stdout.close()
+
+
+def measure_latency(session, name: str, arguments: dict, iterations: int, warmup: int) -> dict:
+    durations, errors, last_error = [], 0, None
+    for n in range(warmup + iterations):
+        started = time.perf_counter()
+        try:
+            call_tool(session, name, arguments, timeout=CALL_TIMEOUT_SECONDS)
+        except Exception as e:
+            errors += 1
+            last_error = str(e)[:200]
+        if n >= warmup:
+            durations.append(time.perf_counter() - started)
+    result = {
+        "p50_ms": round(percentile(durations, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(durations) * 1000, 2),
+        "errors": errors,
+    }
+    if last_error:
+        result["last_error"] = last_error
+    return result
+
+
+def measure_throughput(session, calls: List[tuple], requests: int, concurrency: int) -> dict:
+    """Call the given tools round-robin from ``concurrency`` threads and report completed calls per second."""
+    errors = 0
+
+    def call(n: int) -> bool:
+        name, arguments = calls[n % len(calls)]
+        try:
+            call_tool(session, name, arguments, timeout=CALL_TIMEOUT_SECONDS)
+            return True
+        except Exception:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+    errors = results.count(False)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+    }
+
+
+def run_transport(
+    transport: str, airflow_url: str, tools: Optional[tuple], fleet: Fleet, options: dict
+) -> Dict[str, Any]:
+    port = None if transport == "stdio" else free_port()
+    process = start_server(transport, airflow_url, port)
+    try:
+        session = open_session(transport, process, port)
+        listed = session.request("tools/list", timeout=READY_TIMEOUT_SECONDS)["result"]["tools"]
+        available = scenarios(fleet)
+        names = [tool["name"] for tool in listed if not tools or tool["name"] in tools]
+        latency = {}
+        for name in names:
+            if name in available:
+                latency[name] = measure_latency(
+                    session, name, available[name], options["iterations"], options["warmup"]
+                )
+        read_only = read_only_tools()
+        throughput_calls = [(name, available[name]) for name in names if name in available and name in read_only]
+        throughput = (
+            measure_throughput(session, throughput_calls, options["requests"], options["concurrency"])
+            if throughput_calls
+            else None
+        )
+        if isinstance(session, HttpSession):
+            session.close()
+        return {
+            "latency": latency,
+            "throughput": throughput,
+            "peak_rss_bytes": peak_rss_bytes(process.pid),
+            "without_scenario": sorted(name for name in names if name not in available),
+        }
+    finally:
+        stop(process)
+
+
+def read_only_tools() -> set:
+    """Names of the tools registered as read-only, which make up the throughput mix as an agent reading state."""
+    return {
+        name
+        for get_functions in APITYPE_TO_FUNCTIONS.values()
+        for _, name, _, is_read_only in get_functions()
+        if is_read_only
+    } | {BATCH_TOOL_NAME}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=REPO_ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Describe every measurement more than ``tolerance`` (a fraction) worse than in the baseline report."""
+    found = []
+    if baseline.get("fleet") != report["fleet"]:
+        found.append("the baseline was measured with a different fleet; measurements are not comparable")
+        return found
+    for transport, results in report["transports"].items():
+        previous = baseline.get("transports", {}).get(transport)
+        if previous is None:
+            continue
+        for name, latency in results["latency"].items():
+            before = previous["latency"].get(name)
+            if before is None:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if before[metric] and latency[metric] > before[metric] * (1 + tolerance):
+                    found.append(f"{transport} {name} {metric}: {before[metric]} -> {latency[metric]}")
+        before, after = previous.get("throughput"), results.get("throughput")
+        if before and after and after["requests_per_second"] < before["requests_per_second"] * (1 - tolerance):
+            found.append(
+                f"{transport} requests_per_second: {before['requests_per_second']} -> {after['requests_per_second']}"
+            )
+        if previous.get("peak_rss_bytes") and results.get("peak_rss_bytes"):
+            if results["peak_rss_bytes"] > previous["peak_rss_bytes"] * (1 + tolerance):
+                found.append(f"{transport} peak_rss_bytes: {previous['peak_rss_bytes']} -> {results['peak_rss_bytes']}")
+    return found
+
+
+@click.command()
+@click.option(
+    "--transport",
+    "transports",
+    type=click.Choice(TRANSPORTS),
+    multiple=True,
+    default=TRANSPORTS,
+    help="Transports to benchmark, default is all.",
+)
+@click.option("--tool", "tools", multiple=True, help="Tools to benchmark, default is all.")
+@click.option("--iterations", default=20, help="Measured calls of each tool.")
+@click.option("--warmup", default=2, help="Calls of each tool before measuring.")
+@click.option("--requests", default=200, help="Calls made to measure throughput.")
+@click.option("--concurrency", default=8, help="Calls in flight at once while measuring throughput.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the JSON report to this file.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Report of an earlier run; exit with status 1 if any measurement regressed beyond --tolerance.",
+)
+@click.option("--tolerance", default=0.2, help="Allowed slowdown or growth relative to --baseline, as a fraction.")
+@fleet_options
+def main(
+    transports: tuple,
+    tools: tuple,
+    iterations: int,
+    warmup: int,
+    requests: int,
+    concurrency: int,
+    output: Optional[str],
+    baseline: Optional[str],
+    tolerance: float,
+    **fleet_fields: Any,
+) -> None:
+    fleet = Fleet(**fleet_fields)
+    options = {"iterations": iterations, "warmup": warmup, "requests": requests, "concurrency": concurrency}
+    fake_port = free_port()
+    fake_airflow = start_fake_airflow(fleet, fake_port)
+    try:
+        results = {
+            transport: run_transport(transport, f"http://127.0.0.1:{fake_port}", tools, fleet, options)
+            for transport in transports
+        }
+    finally:
+        stop(fake_airflow)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fleet": vars(fleet),
+        "options": options,
+        "transports": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+    if baseline:
+        with open(baseline) as f:
+            found = regressions(report, json.load(f), tolerance)
+        for regression in found:
+            click.echo(f"Regression: {regression}", err=True)
+        if found:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,297 @@
-from urllib.parse import urljoin
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from urllib.parse import urljoin, urlsplit
 
-from airflow_client.client import ApiClient, Configuration
+from airflow_client.client import ApiClient, ApiException, Configuration
+from airflow_client.client.model_utils import ModelComposed, ModelNormal
+from airflow_client.client.rest import RESTClientObject, RESTResponse
+from urllib3 import HTTPHeaderDict
+from urllib3.util.request import ACCEPT_ENCODING
 
+from src.airflow.cassette import Cassette, replay_error, response_data
+from src.airflow.revalidation import CachedResponse, revalidation_cache
+from src.airflow.token_provider import JwtTokenProvider, endpoint_token_source, file_token_source
+from src.caller_credentials import caller_authorization
 from src.envs import (
     AIRFLOW_API_VERSION,
+    AIRFLOW_CALLER_CLIENTS_LIMIT,
+    AIRFLOW_CASSETTE,
+    AIRFLOW_CASSETTE_LATENCY_SCALE,
+    AIRFLOW_CASSETTE_MODE,
     AIRFLOW_HOST,
+    AIRFLOW_JWT_REFRESH_MARGIN,
     AIRFLOW_JWT_TOKEN,
+    AIRFLOW_JWT_TOKEN_FILE,
+    AIRFLOW_JWT_TOKEN_URL,
     AIRFLOW_PASSWORD,
     AIRFLOW_USERNAME,
 )
+from src.metrics import current_call, timed, transfer_metrics
+from src.tracing import KIND_CLIENT, current_span, span, traced
+
+# Compressed bodies are decoded incrementally in chunks of this size as they arrive
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+class AirflowApiClient(ApiClient):
+    """
+    ApiClient that negotiates compressed responses and accounts their size per tool.
+
+    Every request advertises the content codings urllib3 can decode (gzip and deflate, plus br and zstd when
+    their optional packages are installed). Response bodies are decompressed as a stream while being read, and
+    both the bytes received on the wire and the decoded bytes are recorded in ``transfer_metrics``.
+    Rarely changing resources are revalidated through ``revalidation_cache`` with conditional requests.
+
+    When a request is served with caller credentials (see ``caller_credentials``), the caller's Authorization
+    header replaces the server's, and the request goes through a connection pool dedicated to that caller.
+    Pools of the least recently seen callers are closed once more than ``caller_clients_limit`` are open, and the
+    ``caller_eviction_callbacks`` are called with their Authorization header, so per-caller state can go with them.
+
+    Otherwise, with a ``token_provider``, the server's JWT is taken from it on every request, so a refreshed
+    token is used from the next request on, over the same pooled connections. A request rejected with 401 is
+    retried once with a new token.
+
+    With a ``cassette`` (see ``cassette.Cassette``), every exchange is recorded to it, or every request is answered
+    from it without contacting Airflow at all.
+    """
+
+    def __init__(
+        self,
+        *args,
+        caller_clients_limit: int = AIRFLOW_CALLER_CLIENTS_LIMIT,
+        token_provider: Optional[JwtTokenProvider] = None,
+        cassette: Optional[Cassette] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.caller_clients_limit = caller_clients_limit
+        self.token_provider = token_provider
+        self.cassette = cassette
+        self._caller_rest_clients: OrderedDict[str, RESTClientObject] = OrderedDict()
+        self._caller_rest_clients_lock = threading.Lock()
+        self.caller_eviction_callbacks: List[Callable[[str], None]] = []
+
+    def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        post_params=None,
+        body=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        call = current_call.get()
+        started = time.perf_counter()
+        # Named after the method alone, as OpenTelemetry's HTTP conventions do when the route template is unknown:
+        # paths hold IDs, and span names should not
+        attributes = {"http.request.method": method, "url.full": url, "url.path": urlsplit(url).path}
+        with span(method, KIND_CLIENT, **attributes) as s:
+            if s is not None:
+                # Airflow, when traced itself, continues the trace of the tool call
+                headers = {**(headers or {}), "traceparent": s.traceparent}
+            try:
+                response = self._cassette_request(
+                    method, url, query_params, headers, post_params, body, _preload_content, _request_timeout
+                )
+            except ApiException as e:
+                if s is not None and e.status:
+                    s.set_attribute("http.response.status_code", e.status)
+                raise
+            finally:
+                if call is not None:
+                    call.add(upstream_requests=1, upstream_seconds=time.perf_counter() - started)
+            if s is not None:
+                s.set_attribute("http.response.status_code", response.status)
+            return response
+
+    @timed("deserialization")
+    @traced("deserialize")
+    def deserialize(self, response, response_type, _check_type):
+        return super().deserialize(response, response_type, _check_type)
+
+    def _cassette_request(
+        self, method, url, query_params, headers, post_params, body, _preload_content, _request_timeout
+    ):
+        if self.cassette is None or not _preload_content:
+            return self._request(
+                method, url, query_params, headers, post_params, body, _preload_content, _request_timeout
+            )
+        if self.cassette.replaying:
+            return self._replay(method, url, query_params, body)
+
+        started = time.perf_counter()
+        try:
+            response = self._request(method, url, query_params, headers, post_params, body, True, _request_timeout)
+        except ApiException as e:
+            # Status 0 means no response was received, there is nothing to replay
+            if e.status:
+                data = e.body or b""
+                self.cassette.record(
+                    method,
+                    url,
+                    query_params,
+                    body,
+                    e.status,
+                    e.reason,
+                    e.headers,
+                    data,
+                    len(data),
+                    time.perf_counter() - started,
+                )
+            raise
+        # Responses served from the revalidation cache did not come over the wire
+        wire_bytes = response.urllib3_response.tell() if response.urllib3_response is not None else 0
+        self.cassette.record(
+            method,
+            url,
+            query_params,
+            body,
+            response.status,
+            response.reason,
+            response.getheaders(),
+            response.data,
+            wire_bytes,
+            time.perf_counter() - started,
+        )
+        return response
+
+    def _replay(self, method, url, query_params, body) -> RESTResponse:
+        entry = self.cassette.replay(method, url, query_params, body)
+        data = response_data(entry)
+        transfer_metrics.record(wire_bytes=entry["wire_bytes"], decoded_bytes=len(data))
+        response = _DecodedResponse(entry["status"], entry["reason"], HTTPHeaderDict(entry["headers"]), data)
+        error = replay_error(entry, response)
+        if error is not None:
+            raise error
+        return response
+
+    def _request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        post_params=None,
+        body=None,
+        _preload_content=True,
+        _request_timeout=None,
+        _retry_unauthorized=True,
+    ):
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        authorization = caller_authorization.get()
+        rest_client = self.rest_client
+        token_provider = self.token_provider if authorization is None else None
+        if authorization is not None:
+            headers.pop("Authorization", None)
+            if authorization:
+                headers["Authorization"] = authorization
+            rest_client = self._caller_rest_client(authorization)
+        elif token_provider is not None:
+            headers["Authorization"] = self.default_headers["Authorization"] = token_provider.authorization()
+        cache_key = None
+        if _preload_content and revalidation_cache.applies(method, url):
+            cache_key = revalidation_cache.key(url, query_params, headers)
+            cached = revalidation_cache.get(cache_key)
+            if cached is not None:
+                headers.update(cached.conditional_headers())
+
+        try:
+            response = rest_client.request(
+                method,
+                url,
+                query_params=query_params,
+                headers=headers,
+                post_params=post_params,
+                body=body,
+                _preload_content=False,
+                _request_timeout=_request_timeout,
+            )
+        except ApiException as e:
+            if e.status == 304 and cache_key is not None:
+                cached = revalidation_cache.not_modified(cache_key)
+                if cached is not None:
+                    revalidated_span = current_span.get()
+                    if revalidated_span is not None:
+                        revalidated_span.set_attribute("cache.revalidated", True)
+                    transfer_metrics.record(wire_bytes=0, decoded_bytes=len(cached.data))
+                    return _DecodedResponse(cached.status, cached.reason, cached.headers, cached.data)
+            if e.status == 401 and _retry_unauthorized and token_provider is not None and token_provider.refreshable:
+                token_provider.invalidate(headers["Authorization"])
+                return self._request(
+                    method,
+                    url,
+                    query_params=query_params,
+                    headers=headers,
+                    post_params=post_params,
+                    body=body,
+                    _preload_content=_preload_content,
+                    _request_timeout=_request_timeout,
+                    _retry_unauthorized=False,
+                )
+            raise
+        if not _preload_content:
+            return response
+
+        decoded = _read_response(response)
+        if cache_key is not None and decoded.status == 200:
+            revalidation_cache.store(
+                cache_key, CachedResponse(decoded.status, decoded.reason, dict(decoded.getheaders()), decoded.data)
+            )
+        return decoded
+
+    def _caller_rest_client(self, authorization: str) -> RESTClientObject:
+        with self._caller_rest_clients_lock:
+            rest_client = self._caller_rest_clients.get(authorization)
+            if rest_client is not None:
+                self._caller_rest_clients.move_to_end(authorization)
+                return rest_client
+            rest_client = RESTClientObject(self.configuration)
+            self._caller_rest_clients[authorization] = rest_client
+            evicted = []
+            while len(self._caller_rest_clients) > self.caller_clients_limit:
+                evicted.append(self._caller_rest_clients.popitem(last=False))
+        for evicted_authorization, evicted_client in evicted:
+            # Requests still in flight keep their connection; it is closed when returned to the cleared pool
+            evicted_client.pool_manager.clear()
+            for callback in self.caller_eviction_callbacks:
+                callback(evicted_authorization)
+        return rest_client
+
+
+class _DecodedResponse(RESTResponse):
+    def __init__(self, status: int, reason: str, headers, data: bytes, urllib3_response=None):
+        self.urllib3_response = urllib3_response
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+def _read_response(resp) -> RESTResponse:
+    data = b"".join(resp.stream(DECODE_CHUNK_SIZE, decode_content=True))
+    # tell() counts the raw bytes read off the connection, before any content decoding
+    transfer_metrics.record(wire_bytes=resp.tell(), decoded_bytes=len(data))
+    resp.release_conn()
+    return _DecodedResponse(resp.status, resp.reason, resp.headers, data, urllib3_response=resp)
+
+
+# Tools serialize their results by turning the client's models into dicts; account that time to the tool call.
+# The client's models have no hook for it, and this module may be imported again (tests do), so wrap them once.
+for _model_class in (ModelNormal, ModelComposed):
+    if not hasattr(_model_class.to_dict, "__wrapped__"):
+        _model_class.to_dict = timed("serialization")(traced("serialize")(_model_class.to_dict))
 
 # Create a configuration and API client
 configuration = Configuration(
@@ -16,14 +299,30 @@ configuration = Configuration(
 )
 
 # Set up authentication - prefer JWT token if available, fallback to basic auth
+token_provider = None
 if AIRFLOW_JWT_TOKEN:
     configuration.api_key = {"Authorization": f"{AIRFLOW_JWT_TOKEN}"}
     configuration.api_key_prefix = {"Authorization": "Bearer"}
-elif AIRFLOW_USERNAME and AIRFLOW_PASSWORD:
+if AIRFLOW_JWT_TOKEN_FILE or AIRFLOW_JWT_TOKEN_URL:
+    # A token that can be renewed is managed by the provider; the username and password are only used to get it
+    token_provider = JwtTokenProvider(
+        AIRFLOW_JWT_TOKEN,
+        source=file_token_source(AIRFLOW_JWT_TOKEN_FILE)
+        if AIRFLOW_JWT_TOKEN_FILE
+        else endpoint_token_source(AIRFLOW_JWT_TOKEN_URL, AIRFLOW_USERNAME, AIRFLOW_PASSWORD),
+        refresh_margin=AIRFLOW_JWT_REFRESH_MARGIN,
+    )
+elif not AIRFLOW_JWT_TOKEN and AIRFLOW_USERNAME and AIRFLOW_PASSWORD:
     configuration.username = AIRFLOW_USERNAME
     configuration.password = AIRFLOW_PASSWORD
 
-api_client = ApiClient(configuration)
+cassette = None
+if AIRFLOW_CASSETTE:
+    cassette = Cassette(AIRFLOW_CASSETTE, AIRFLOW_CASSETTE_MODE, latency_scale=AIRFLOW_CASSETTE_LATENCY_SCALE)
+    # A gzip-compressed recording is only complete once closed
+    atexit.register(cassette.close)
+
+api_client = AirflowApiClient(configuration, token_provider=token_provider, cassette=cassette)
 
 # JWT/Bearer auth requires manual header setup because auth_settings() in apache-airflow-client 2.x
 # only supports Basic authentication.
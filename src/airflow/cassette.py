@@ -0,0 +1,215 @@
+import base64
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from airflow_client.client.exceptions import (
+    ApiException,
+    ForbiddenException,
+    NotFoundException,
+    ServiceException,
+    UnauthorizedException,
+)
+
+CASSETTE_VERSION = 1
+RECORD = "record"
+REPLAY = "replay"
+REDACTED = "***"
+# Keys whose values are replaced with REDACTED in recorded query parameters, request bodies and JSON responses;
+# the same names Airflow masks by default, plus the extra field of connections. Tokens identifying DAG files
+# and result pages are references rather than credentials and are kept, so recorded follow-up requests match.
+SENSITIVE_KEY_PATTERN = re.compile(
+    r"^(?!(file|continuation)_token$).*(password|passwd|passphrase|secret|token|api_?key|authorization|"
+    r"private_key|keyfile_dict|service_account)|^extra$",
+    re.IGNORECASE,
+)
+# Only response headers that change how a response is handled are recorded, never cookies or server details
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CassetteMiss(LookupError):
+    """A request with no recorded response was made while replaying a cassette."""
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of a JSON-like value with the values of sensitive keys replaced."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if isinstance(key, str) and SENSITIVE_KEY_PATTERN.search(key) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class Cassette:
+    """
+    Records the requests made to Airflow along with their responses and timings, or replays them offline.
+
+    A cassette is a JSON Lines file, gzip-compressed when its name ends with ``.gz``: a header line, then one line
+    per request with its method, path, query, a hash of its body, the response and how long it took. Credentials
+    are never written: request headers are not recorded at all, and sensitive keys (see ``redact``) of query
+    parameters, request bodies and JSON responses are replaced. Entries are written as responses arrive, so the
+    cassette of a server that was killed is readable up to its last complete line.
+
+    When replaying, each request is answered with a recorded response to the same method, path, query and body,
+    after waiting the recorded time multiplied by ``latency_scale`` (0 answers at once). Responses recorded several
+    times for the same request are served in recorded order, starting over once all were served. A request that
+    was never recorded raises ``CassetteMiss``.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Cassette mode must be {RECORD!r} or {REPLAY!r}, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._started = time.monotonic()
+        self._entries: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._next: Dict[Tuple[str, ...], int] = {}
+        if mode == REPLAY:
+            for entry in self._read():
+                self._entries.setdefault(
+                    _key(entry["method"], entry["path"], entry["query"], entry["body"]), []
+                ).append(entry)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        query_params: Any,
+        body: Any,
+        status: int,
+        reason: Optional[str],
+        headers: Any,
+        data: bytes,
+        wire_bytes: int,
+        elapsed: float,
+    ) -> None:
+        """Append an exchange to the cassette."""
+        entry = {
+            "t": round(time.monotonic() - self._started, 6),
+            **_request_fields(method, url, query_params, body),
+            "status": status,
+            "reason": reason,
+            "headers": {name: headers[name] for name in RECORDED_HEADERS if headers and headers.get(name)},
+            **_encode_body(data, (headers or {}).get("Content-Type")),
+            "wire_bytes": wire_bytes,
+            "elapsed": round(elapsed, 6),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = _open(self.path, "wt")
+                self._file.write(json.dumps({"version": CASSETTE_VERSION, "recorded_at": time.time()}) + "\n")
+            self._file.write(line)
+            self._file.flush()
+
+    def replay(self, method: str, url: str, query_params: Any, body: Any) -> Dict[str, Any]:
+        """Return the next recorded exchange for a request, after its recorded latency (scaled)."""
+        request = _request_fields(method, url, query_params, body)
+        key = _key(request["method"], request["path"], request["query"], request["body"])
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No response recorded for {method} {request['path']} {request['query']}")
+            n = self._next.get(key, 0)
+            self._next[key] = (n + 1) % len(entries)
+        entry = entries[n]
+        if self.latency_scale > 0:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _read(self) -> List[Dict[str, Any]]:
+        entries = []
+        with _open(self.path, "rt") as f:
+            try:
+                header = json.loads(next(f))
+                if header.get("version") != CASSETTE_VERSION:
+                    raise ValueError(f"Unsupported cassette version {header.get('version')!r} in {self.path}")
+                for line in f:
+                    if line.endswith("\n"):
+                        entries.append(json.loads(line))
+            except (EOFError, StopIteration):
+                # The recording was cut short; everything read so far is complete
+                pass
+        return entries
+
+
+def response_data(entry: Dict[str, Any]) -> bytes:
+    """The decoded response body of a recorded exchange."""
+    if "body_base64" in entry:
+        return base64.b64decode(entry["body_base64"])
+    return entry["body_text"].encode()
+
+
+def replay_error(entry: Dict[str, Any], response) -> Optional[ApiException]:
+    """The exception the Airflow client raises for a recorded error response, or None for a success."""
+    status = entry["status"]
+    if 200 <= status <= 299:
+        return None
+    if status == 401:
+        return UnauthorizedException(http_resp=response)
+    if status == 403:
+        return ForbiddenException(http_resp=response)
+    if status == 404:
+        return NotFoundException(http_resp=response)
+    if 500 <= status <= 599:
+        return ServiceException(http_resp=response)
+    return ApiException(http_resp=response)
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode[0], encoding="utf-8")
+
+
+def _request_fields(method: str, url: str, query_params: Any, body: Any) -> Dict[str, Any]:
+    # The path starts after the host, so a cassette recorded against one Airflow replays for any AIRFLOW_HOST
+    path = urlsplit(url).path
+    query = [
+        [name, REDACTED if SENSITIVE_KEY_PATTERN.search(name) else str(value)] for name, value in query_params or []
+    ]
+    body_hash = None
+    if body is not None:
+        serialized = json.dumps(redact(body), sort_keys=True, default=str)
+        body_hash = hashlib.sha256(serialized.encode()).hexdigest()[:16]
+    return {"method": method, "path": path, "query": sorted(query), "body": body_hash}
+
+
+def _key(method: str, path: str, query: List[List[str]], body: Optional[str]) -> Tuple[str, ...]:
+    return method, path, json.dumps(query), body or ""
+
+
+def _encode_body(data: bytes, content_type: Optional[str]) -> Dict[str, str]:
+    if content_type and "json" in content_type:
+        try:
+            return {"body_text": json.dumps(redact(json.loads(data)))}
+        except ValueError:
+            pass
+    try:
+        return {"body_text": data.decode()}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(data).decode()}
@@ -1,11 +1,14 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+import asyncio
+from typing import Callable, List, Optional, Union
 
 import mcp.types as types
 from airflow_client.client.api.config_api import ConfigApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.metadata_store import metadata_store
 
 config_api = ConfigApi(api_client)
+metadata_store.register("config", lambda: config_api.get_config().to_dict())
 
 
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
@@ -19,17 +22,20 @@ def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
 async def get_config(
     section: Optional[str] = None,
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    # Build parameters dictionary
-    kwargs: Dict[str, Any] = {}
-    if section is not None:
-        kwargs["section"] = section
-
-    response = config_api.get_config(**kwargs)
+    config = await metadata_store.get("config")
+    if section is None:
+        return [types.TextContent(type="text", text=str(config))]
+
+    sections = [entry for entry in config.get("sections", []) if entry.get("name") == section]
+    if sections:
+        return [types.TextContent(type="text", text=str({**config, "sections": sections}))]
+    # Let the API report an unknown section the way it always has
+    response = await asyncio.to_thread(config_api.get_config, section=section)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_value(
     section: str, option: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = config_api.get_value(section=section, option=option)
+    response = await asyncio.to_thread(config_api.get_value, section=section, option=option)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
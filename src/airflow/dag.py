@@ -1,13 +1,26 @@
+import asyncio
+import math
+import os
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
 from airflow_client.client.api.dag_api import DAGApi
+from airflow_client.client.exceptions import NotFoundException
 from airflow_client.client.model.clear_task_instances import ClearTaskInstances
 from airflow_client.client.model.dag import DAG
 from airflow_client.client.model.update_task_instances_state import UpdateTaskInstancesState
 
 from src.airflow.airflow_client import api_client
+from src.airflow.streaming import encode_pages
 from src.envs import AIRFLOW_HOST
+from src.loaders import BatchLoader, request_loader
+from src.tracing import span
+
+# Page size of the DAG listing, matching the default maximum page size of the Airflow API
+DAG_PAGE_LIMIT = 100
+# DAG IDs sharing a shorter prefix are fetched one by one: dag_id_pattern matches anywhere in the ID, so a short
+# pattern narrows the listing down to little less than the whole fleet
+MIN_PREFIX_LENGTH = 3
 
 dag_api = DAGApi(api_client)
 
@@ -37,6 +50,54 @@ def get_dag_url(dag_id: str) -> str:
     return f"{AIRFLOW_HOST}/dags/{dag_id}/grid"
 
 
+def load_dags(dag_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch several DAGs by ID with as few requests as possible; DAGs that do not exist are left out.
+
+    The API cannot filter DAGs by a list of IDs, so the DAGs are listed instead, narrowed down to those containing
+    the common prefix of the IDs. As soon as fetching the remaining pages would take more requests than fetching
+    the DAGs still missing one by one, those are fetched one by one. IDs without a common prefix of at least
+    ``MIN_PREFIX_LENGTH`` characters are fetched one by one from the start.
+    """
+    missing = set(dag_ids)
+    found: Dict[str, Dict[str, Any]] = {}
+    prefix = os.path.commonprefix(dag_ids)
+    if len(missing) == 1 or len(prefix) < MIN_PREFIX_LENGTH:
+        _fetch_each(missing, found)
+        return found
+
+    kwargs: Dict[str, Any] = {"only_active": False, "order_by": "dag_id", "dag_id_pattern": prefix}
+    offset = 0
+    while missing:
+        with span("page", **{"page.offset": offset, "page.limit": DAG_PAGE_LIMIT}):
+            page = dag_api.get_dags(limit=DAG_PAGE_LIMIT, offset=offset, **kwargs).to_dict()
+        for dag in page.get("dags") or []:
+            if dag["dag_id"] in missing:
+                missing.discard(dag["dag_id"])
+                found[dag["dag_id"]] = dag
+        offset += DAG_PAGE_LIMIT
+        remaining_pages = math.ceil(max(page.get("total_entries", 0) - offset, 0) / DAG_PAGE_LIMIT)
+        if remaining_pages == 0:
+            break
+        if remaining_pages > len(missing):
+            _fetch_each(missing, found)
+            break
+    return found
+
+
+def _fetch_each(dag_ids: set, found: Dict[str, Dict[str, Any]]) -> None:
+    for dag_id in sorted(dag_ids):
+        try:
+            found[dag_id] = dag_api.get_dag(dag_id=dag_id).to_dict()
+        except NotFoundException:
+            pass
+
+
+def dag_loader() -> BatchLoader:
+    """Loader of DAGs by ID, batching and caching lookups for the duration of the tool call."""
+    return request_loader("dags", load_dags)
+
+
 async def get_dags(
     limit: Optional[int] = None,
     offset: Optional[int] = None,
@@ -48,10 +109,6 @@ async def get_dags(
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     # Build parameters dictionary
     kwargs: Dict[str, Any] = {}
-    if limit is not None:
-        kwargs["limit"] = limit
-    if offset is not None:
-        kwargs["offset"] = offset
     if order_by is not None:
         kwargs["order_by"] = order_by
     if tags is not None:
@@ -63,21 +120,25 @@ async def get_dags(
     if dag_id_pattern is not None:
         kwargs["dag_id_pattern"] = dag_id_pattern
 
-    # Use the client to fetch DAGs
-    response = dag_api.get_dags(**kwargs)
-
-    # Convert response to dictionary for easier manipulation
-    response_dict = response.to_dict()
-
-    # Add UI links to each DAG
-    for dag in response_dict.get("dags", []):
-        dag["ui_url"] = get_dag_url(dag["dag_id"])
-
-    return [types.TextContent(type="text", text=str(response_dict))]
+    def add_ui_urls(dags: List[Dict[str, Any]]) -> None:
+        for dag in dags:
+            dag["ui_url"] = get_dag_url(dag["dag_id"])
+
+    # Large limits are fetched and encoded a page at a time
+    text = await asyncio.to_thread(
+        encode_pages,
+        lambda **page: dag_api.get_dags(**kwargs, **page),
+        "dags",
+        limit,
+        offset,
+        add_ui_urls,
+        order_by=None if order_by is not None else "dag_id",
+    )
+    return [types.TextContent(type="text", text=text)]
 
 
 async def get_dag(dag_id: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.get_dag(dag_id=dag_id)
+    response = await asyncio.to_thread(dag_api.get_dag, dag_id=dag_id)
 
     # Convert response to dictionary for easier manipulation
     response_dict = response.to_dict()
@@ -96,29 +157,29 @@ async def get_dag_details(
     if fields is not None:
         kwargs["fields"] = fields
 
-    response = dag_api.get_dag_details(dag_id=dag_id, **kwargs)
+    response = await asyncio.to_thread(dag_api.get_dag_details, dag_id=dag_id, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_dag_source(file_token: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.get_dag_source(file_token=file_token)
+    response = await asyncio.to_thread(dag_api.get_dag_source, file_token=file_token)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def pause_dag(dag_id: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     dag = DAG(is_paused=True)
-    response = dag_api.patch_dag(dag_id=dag_id, dag=dag, update_mask=["is_paused"])
+    response = await asyncio.to_thread(dag_api.patch_dag, dag_id=dag_id, dag=dag, update_mask=["is_paused"])
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def unpause_dag(dag_id: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     dag = DAG(is_paused=False)
-    response = dag_api.patch_dag(dag_id=dag_id, dag=dag, update_mask=["is_paused"])
+    response = await asyncio.to_thread(dag_api.patch_dag, dag_id=dag_id, dag=dag, update_mask=["is_paused"])
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_dag_tasks(dag_id: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.get_tasks(dag_id=dag_id)
+    response = await asyncio.to_thread(dag_api.get_tasks, dag_id=dag_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -137,7 +198,7 @@ async def patch_dag(
 
     dag = DAG(**update_request)
 
-    response = dag_api.patch_dag(dag_id=dag_id, dag=dag, update_mask=update_mask)
+    response = await asyncio.to_thread(dag_api.patch_dag, dag_id=dag_id, dag=dag, update_mask=update_mask)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -162,19 +223,21 @@ async def patch_dags(
     if dag_id_pattern is not None:
         kwargs["dag_id_pattern"] = dag_id_pattern
 
-    response = dag_api.patch_dags(dag_id_pattern=dag_id_pattern, dag=dag, update_mask=update_mask, **kwargs)
+    response = await asyncio.to_thread(
+        dag_api.patch_dags, dag_id_pattern=dag_id_pattern, dag=dag, update_mask=update_mask, **kwargs
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def delete_dag(dag_id: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.delete_dag(dag_id=dag_id)
+    response = await asyncio.to_thread(dag_api.delete_dag, dag_id=dag_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_task(
     dag_id: str, task_id: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.get_task(dag_id=dag_id, task_id=task_id)
+    response = await asyncio.to_thread(dag_api.get_task, dag_id=dag_id, task_id=task_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -185,7 +248,7 @@ async def get_tasks(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = dag_api.get_tasks(dag_id=dag_id, **kwargs)
+    response = await asyncio.to_thread(dag_api.get_tasks, dag_id=dag_id, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -229,7 +292,9 @@ async def clear_task_instances(
 
     clear_task_instances = ClearTaskInstances(**clear_request)
 
-    response = dag_api.post_clear_task_instances(dag_id=dag_id, clear_task_instances=clear_task_instances)
+    response = await asyncio.to_thread(
+        dag_api.post_clear_task_instances, dag_id=dag_id, clear_task_instances=clear_task_instances
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -262,7 +327,8 @@ async def set_task_instances_state(
 
     update_task_instances_state = UpdateTaskInstancesState(**state_request)
 
-    response = dag_api.post_set_task_instances_state(
+    response = await asyncio.to_thread(
+        dag_api.post_set_task_instances_state,
         dag_id=dag_id,
         update_task_instances_state=update_task_instances_state,
     )
@@ -272,5 +338,5 @@ async def set_task_instances_state(
 async def reparse_dag_file(
     file_token: str,
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_api.reparse_dag_file(file_token=file_token)
+    response = await asyncio.to_thread(dag_api.reparse_dag_file, file_token=file_token)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
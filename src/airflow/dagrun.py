@@ -1,17 +1,31 @@
-from datetime import datetime
+import asyncio
+import statistics
+from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
 from airflow_client.client.api.dag_run_api import DAGRunApi
+from airflow_client.client.api.task_instance_api import TaskInstanceApi
 from airflow_client.client.model.clear_dag_run import ClearDagRun
 from airflow_client.client.model.dag_run import DAGRun
 from airflow_client.client.model.set_dag_run_note import SetDagRunNote
 from airflow_client.client.model.update_dag_run_state import UpdateDagRunState
+from fastmcp import Context
 
 from src.airflow.airflow_client import api_client
+from src.airflow.dag import dag_loader
 from src.envs import AIRFLOW_HOST
 
+TERMINAL_DAG_RUN_STATES = {"success", "failed"}
+FINISHED_TASK_STATES = {"success", "failed", "skipped", "upstream_failed", "removed"}
+# How many recent successful runs the expected duration of a DAG is derived from
+DURATION_HISTORY_SIZE = 10
+TASK_INSTANCE_PAGE_LIMIT = 1000
+# DAG attributes attached to DAG runs on request
+DAG_SUMMARY_FIELDS = ("is_paused", "owners", "tags")
+
 dag_run_api = DAGRunApi(api_client)
+task_instance_api = TaskInstanceApi(api_client)
 
 
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
@@ -26,6 +40,7 @@ def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
         (clear_dag_run, "clear_dag_run", "Clear a DAG run", False),
         (set_dag_run_note, "set_dag_run_note", "Update the DagRun note", False),
         (get_upstream_dataset_events, "get_upstream_dataset_events", "Get dataset events for a DAG run", True),
+        (wait_for_dag_run, "wait_for_dag_run", "Wait until a DAG run finishes or a timeout expires", True),
     ]
 
 
@@ -63,7 +78,7 @@ async def post_dag_run(
     # Create DAGRun without read-only fields
     dag_run = DAGRun(**kwargs)
 
-    response = dag_run_api.post_dag_run(dag_id=dag_id, dag_run=dag_run)
+    response = await asyncio.to_thread(dag_run_api.post_dag_run, dag_id=dag_id, dag_run=dag_run)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -109,7 +124,7 @@ async def get_dag_runs(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = dag_run_api.get_dag_runs(dag_id=dag_id, **kwargs)
+    response = await asyncio.to_thread(dag_run_api.get_dag_runs, dag_id=dag_id, **kwargs)
 
     # Convert response to dictionary for easier manipulation
     response_dict = response.to_dict()
@@ -133,7 +148,14 @@ async def get_dag_runs_batch(
     order_by: Optional[str] = None,
     page_offset: Optional[int] = None,
     page_limit: Optional[int] = None,
+    include_dag: bool = False,
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    List DAG runs across DAGs.
+
+    Args:
+        include_dag: Attach whether the DAG is paused, its owners and tags to each DAG run.
+    """
     # Build request dictionary
     request: Dict[str, Any] = {}
     if dag_ids is not None:
@@ -159,7 +181,7 @@ async def get_dag_runs_batch(
     if page_limit is not None:
         request["page_limit"] = page_limit
 
-    response = dag_run_api.get_dag_runs_batch(list_dag_runs_form=request)
+    response = await asyncio.to_thread(dag_run_api.get_dag_runs_batch, list_dag_runs_form=request)
 
     # Convert response to dictionary for easier manipulation
     response_dict = response.to_dict()
@@ -168,13 +190,27 @@ async def get_dag_runs_batch(
     for dag_run in response_dict.get("dag_runs", []):
         dag_run["ui_url"] = get_dag_run_url(dag_run["dag_id"], dag_run["dag_run_id"])
 
+    if include_dag:
+        await _attach_dags(response_dict.get("dag_runs", []))
+
     return [types.TextContent(type="text", text=str(response_dict))]
 
 
+async def _attach_dags(dag_runs: List[Dict[str, Any]]) -> None:
+    # Lookups of all runs go out together, so the DAGs are fetched in one batch rather than once per run
+    loader = dag_loader()
+    dags = await asyncio.gather(*(loader.load(dag_run["dag_id"]) for dag_run in dag_runs), return_exceptions=True)
+    for dag_run, dag in zip(dag_runs, dags, strict=True):
+        if isinstance(dag, Exception):
+            dag_run["dag"] = None
+        else:
+            dag_run["dag"] = {field: dag.get(field) for field in DAG_SUMMARY_FIELDS}
+
+
 async def get_dag_run(
     dag_id: str, dag_run_id: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_run_api.get_dag_run(dag_id=dag_id, dag_run_id=dag_run_id)
+    response = await asyncio.to_thread(dag_run_api.get_dag_run, dag_id=dag_id, dag_run_id=dag_run_id)
 
     # Convert response to dictionary for easier manipulation
     response_dict = response.to_dict()
@@ -189,7 +225,8 @@ async def update_dag_run_state(
     dag_id: str, dag_run_id: str, state: Optional[str] = None
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     update_dag_run_state = UpdateDagRunState(state=state)
-    response = dag_run_api.update_dag_run_state(
+    response = await asyncio.to_thread(
+        dag_run_api.update_dag_run_state,
         dag_id=dag_id,
         dag_run_id=dag_run_id,
         update_dag_run_state=update_dag_run_state,
@@ -200,7 +237,7 @@ async def update_dag_run_state(
 async def delete_dag_run(
     dag_id: str, dag_run_id: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_run_api.delete_dag_run(dag_id=dag_id, dag_run_id=dag_run_id)
+    response = await asyncio.to_thread(dag_run_api.delete_dag_run, dag_id=dag_id, dag_run_id=dag_run_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -208,7 +245,9 @@ async def clear_dag_run(
     dag_id: str, dag_run_id: str, dry_run: Optional[bool] = None
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     clear_dag_run = ClearDagRun(dry_run=dry_run)
-    response = dag_run_api.clear_dag_run(dag_id=dag_id, dag_run_id=dag_run_id, clear_dag_run=clear_dag_run)
+    response = await asyncio.to_thread(
+        dag_run_api.clear_dag_run, dag_id=dag_id, dag_run_id=dag_run_id, clear_dag_run=clear_dag_run
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -216,12 +255,143 @@ async def set_dag_run_note(
     dag_id: str, dag_run_id: str, note: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     set_dag_run_note = SetDagRunNote(note=note)
-    response = dag_run_api.set_dag_run_note(dag_id=dag_id, dag_run_id=dag_run_id, set_dag_run_note=set_dag_run_note)
+    response = await asyncio.to_thread(
+        dag_run_api.set_dag_run_note, dag_id=dag_id, dag_run_id=dag_run_id, set_dag_run_note=set_dag_run_note
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_upstream_dataset_events(
     dag_id: str, dag_run_id: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = dag_run_api.get_upstream_dataset_events(dag_id=dag_id, dag_run_id=dag_run_id)
+    response = await asyncio.to_thread(dag_run_api.get_upstream_dataset_events, dag_id=dag_id, dag_run_id=dag_run_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
+
+
+async def wait_for_dag_run(
+    dag_id: str,
+    dag_run_id: str,
+    timeout_seconds: float = 3600,
+    min_poll_interval_seconds: float = 5,
+    max_poll_interval_seconds: float = 60,
+    ctx: Optional[Context] = None,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Block until a DAG run reaches a terminal state (success or failed) or the timeout expires.
+
+    The polling interval adapts to the DAG's historical duration: it is short around the expected completion
+    time and long early in the run or once the run is well past it. Progress notifications report how many
+    task instances of the run have finished.
+
+    Args:
+        dag_id: The DAG ID.
+        dag_run_id: The DAG run ID.
+        timeout_seconds: The maximum time to wait.
+        min_poll_interval_seconds: The shortest time between two polls.
+        max_poll_interval_seconds: The longest time between two polls.
+    """
+    loop = asyncio.get_running_loop()
+    started_waiting_at = loop.time()
+    deadline = started_waiting_at + timeout_seconds
+    expected_duration = await asyncio.to_thread(_expected_duration, dag_id)
+    wants_progress = ctx is not None and _has_progress_token(ctx)
+
+    polls = 0
+    while True:
+        response = await asyncio.to_thread(dag_run_api.get_dag_run, dag_id=dag_id, dag_run_id=dag_run_id)
+        dag_run = response.to_dict()
+        polls += 1
+        if wants_progress:
+            await _report_task_progress(ctx, dag_id, dag_run_id)
+
+        is_terminal = str(dag_run.get("state")) in TERMINAL_DAG_RUN_STATES
+        remaining = deadline - loop.time()
+        if is_terminal or remaining <= 0:
+            break
+
+        interval = _poll_interval(
+            _elapsed_seconds(dag_run),
+            loop.time() - started_waiting_at,
+            expected_duration,
+            min_poll_interval_seconds,
+            max_poll_interval_seconds,
+        )
+        await asyncio.sleep(min(interval, remaining))
+
+    dag_run["ui_url"] = get_dag_run_url(dag_id, dag_run_id)
+    result = {
+        "dag_run": dag_run,
+        "timed_out": not is_terminal,
+        "waited_seconds": round(loop.time() - started_waiting_at, 3),
+        "polls": polls,
+        "expected_duration_seconds": expected_duration,
+    }
+    return [types.TextContent(type="text", text=str(result))]
+
+
+def _expected_duration(dag_id: str) -> Optional[float]:
+    response = dag_run_api.get_dag_runs(
+        dag_id=dag_id, state=["success"], order_by="-end_date", limit=DURATION_HISTORY_SIZE
+    )
+    durations = [
+        (_parse_datetime(dag_run["end_date"]) - _parse_datetime(dag_run["start_date"])).total_seconds()
+        for dag_run in response.to_dict().get("dag_runs", [])
+        if dag_run.get("start_date") and dag_run.get("end_date")
+    ]
+    return statistics.median(durations) if durations else None
+
+
+def _poll_interval(
+    elapsed: Optional[float],
+    waited: float,
+    expected_duration: Optional[float],
+    min_interval: float,
+    max_interval: float,
+) -> float:
+    if elapsed is None:
+        # Queued runs have not started yet: back off as the wait grows
+        interval = waited / 10
+    elif expected_duration is None:
+        # DAGs without history: back off as the run grows
+        interval = elapsed / 10
+    elif elapsed < expected_duration:
+        # Halve the distance to the expected completion on every poll
+        interval = (expected_duration - elapsed) / 2
+    else:
+        # Overdue runs get polled less and less often the longer they overrun
+        interval = (elapsed - expected_duration) / 4
+    return min(max(interval, min_interval), max_interval)
+
+
+def _elapsed_seconds(dag_run: Dict[str, Any]) -> Optional[float]:
+    if not dag_run.get("start_date"):
+        return None
+    return (datetime.now(timezone.utc) - _parse_datetime(dag_run["start_date"])).total_seconds()
+
+
+def _parse_datetime(value: Union[datetime, str]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _has_progress_token(ctx: Context) -> bool:
+    try:
+        meta = ctx.request_context.meta
+    except (LookupError, ValueError):
+        return False
+    return meta is not None and meta.progressToken is not None
+
+
+async def _report_task_progress(ctx: Context, dag_id: str, dag_run_id: str) -> None:
+    response = await asyncio.to_thread(
+        task_instance_api.get_task_instances, dag_id=dag_id, dag_run_id=dag_run_id, limit=TASK_INSTANCE_PAGE_LIMIT
+    )
+    task_instances = response.to_dict().get("task_instances", [])
+    state_counts: Dict[str, int] = {}
+    for task_instance in task_instances:
+        state = str(task_instance.get("state") or "none")
+        state_counts[state] = state_counts.get(state, 0) + 1
+    finished = sum(count for state, count in state_counts.items() if state in FINISHED_TASK_STATES)
+    message = ", ".join(f"{state}: {count}" for state, count in sorted(state_counts.items()))
+    await ctx.report_progress(progress=finished, total=len(task_instances), message=message)
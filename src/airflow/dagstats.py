@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
@@ -23,5 +24,5 @@ async def get_dag_stats(
     if dag_ids is not None:
         kwargs["dag_ids"] = dag_ids
 
-    response = dag_stats_api.get_dag_stats(**kwargs)
+    response = await asyncio.to_thread(dag_stats_api.get_dag_stats, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
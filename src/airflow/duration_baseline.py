@@ -0,0 +1,167 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.airflow.airflow_client import api_client
+from src.envs import AIRFLOW_CALLER_CLIENTS_LIMIT, AIRFLOW_MCP_STATE_DIR
+from src.tdigest import TDigest
+
+BASELINES_FILE_NAME = "task_duration_baselines.json"
+# Only successful tries feed the baseline; failed tries tend to stop early and would drag the quantiles down
+BASELINE_STATES = {"success"}
+# How many recently observed tries are remembered per task so re-listed instances are not counted twice
+RECENT_KEYS_LIMIT = 64
+SUMMARY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Observations are written to disk at most this often; pending ones are written on exit
+SAVE_INTERVAL_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class DurationBaselines:
+    """
+    Per dag_id/task_id duration digests, updated incrementally from finished task instances.
+
+    Observations are saved at most every ``save_interval`` seconds, since listings feed them a page at a time and
+    every save rewrites the whole file; ``flush`` saves the pending ones.
+    """
+
+    def __init__(self, path: Optional[Path] = None, save_interval: float = SAVE_INTERVAL_SECONDS):
+        self.path = path
+        self.save_interval = save_interval
+        self.poll_cursor: Optional[str] = None
+        self._digests: Dict[Tuple[str, str], TDigest] = {}
+        self._recent_keys: Dict[Tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+        self._unsaved = False
+        self._saved_at: Optional[float] = None
+        if path is not None:
+            self.load()
+
+    def observe(self, task_instances: Iterable[Dict[str, Any]]) -> int:
+        """Feed finished task instances (as returned by ``to_dict()``) into the digests."""
+        added = 0
+        with self._lock:
+            for task_instance in task_instances:
+                if task_instance.get("state") not in BASELINE_STATES or task_instance.get("duration") is None:
+                    continue
+                task_key = (task_instance.get("dag_id"), task_instance.get("task_id"))
+                if None in task_key:
+                    continue
+                try_key = "{}/{}/{}".format(
+                    task_instance.get("dag_run_id"), task_instance.get("map_index", -1), task_instance.get("try_number")
+                )
+                recent_keys = self._recent_keys.setdefault(task_key, deque(maxlen=RECENT_KEYS_LIMIT))
+                if try_key in recent_keys:
+                    continue
+                recent_keys.append(try_key)
+                self._digests.setdefault(task_key, TDigest()).add(float(task_instance["duration"]))
+                added += 1
+            if added:
+                self._unsaved = True
+            due = self._saved_at is None or time.monotonic() - self._saved_at >= self.save_interval
+        if added and due:
+            self.save()
+        return added
+
+    def flush(self) -> None:
+        """Save the observations not saved yet, if any."""
+        if self._unsaved:
+            self.save()
+
+    def get(self, dag_id: str, task_id: str) -> Optional[TDigest]:
+        return self._digests.get((dag_id, task_id))
+
+    def summary(self, dag_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return count, min, max and the common quantiles for a task, or None if nothing was observed."""
+        digest = self.get(dag_id, task_id)
+        if digest is None:
+            return None
+        with self._lock:
+            summary = {"dag_id": dag_id, "task_id": task_id, "count": int(digest.count)}
+            summary["min"] = digest.min
+            summary["max"] = digest.max
+            for q in SUMMARY_QUANTILES:
+                summary[f"p{round(q * 100)}"] = digest.quantile(q)
+        return summary
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable duration baselines at {self.path}: {e}")
+            return
+        self.poll_cursor = data.get("poll_cursor")
+        for entry in data.get("tasks", []):
+            task_key = (entry["dag_id"], entry["task_id"])
+            self._digests[task_key] = TDigest.from_dict(entry["digest"])
+            self._recent_keys[task_key] = deque(entry.get("recent_keys", []), maxlen=RECENT_KEYS_LIMIT)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._unsaved = False
+            self._saved_at = time.monotonic()
+            data = {
+                "poll_cursor": self.poll_cursor,
+                "tasks": [
+                    {
+                        "dag_id": dag_id,
+                        "task_id": task_id,
+                        "digest": digest.to_dict(),
+                        "recent_keys": list(self._recent_keys.get((dag_id, task_id), [])),
+                    }
+                    for (dag_id, task_id), digest in self._digests.items()
+                ],
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a crash mid-write never leaves a truncated baseline file behind
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, self.path)
+
+
+class CallerBaselines:
+    """
+    In-memory duration baselines of each caller calling Airflow with its own credentials.
+
+    What a caller may see in Airflow is not what the server or other callers may see, so callers neither read nor
+    feed the server's baselines. Like the callers' connection pools, only the baselines of the ``callers_limit``
+    most recently seen callers are kept. They are not persisted: callers' credentials are secrets, and they expire.
+    """
+
+    def __init__(self, callers_limit: int = AIRFLOW_CALLER_CLIENTS_LIMIT):
+        self.callers_limit = callers_limit
+        self._baselines: OrderedDict[str, DurationBaselines] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, authorization: str) -> DurationBaselines:
+        with self._lock:
+            baselines = self._baselines.get(authorization)
+            if baselines is None:
+                baselines = self._baselines[authorization] = DurationBaselines()
+            self._baselines.move_to_end(authorization)
+            while len(self._baselines) > self.callers_limit:
+                self._baselines.popitem(last=False)
+        return baselines
+
+    def forget_caller(self, authorization: str) -> None:
+        with self._lock:
+            self._baselines.pop(authorization, None)
+
+
+duration_baselines = DurationBaselines(
+    Path(AIRFLOW_MCP_STATE_DIR) / BASELINES_FILE_NAME if AIRFLOW_MCP_STATE_DIR else None
+)
+atexit.register(duration_baselines.flush)
+caller_baselines = CallerBaselines()
+api_client.caller_eviction_callbacks.append(caller_baselines.forget_caller)
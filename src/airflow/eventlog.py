@@ -1,10 +1,15 @@
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Union
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import mcp.types as types
 from airflow_client.client.api.event_log_api import EventLogApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.streaming import encode_pages
+
+# `after` only matches entries strictly later than it, so the cursor's own timestamp is reached from just before it
+CURSOR_EPSILON = timedelta(microseconds=1)
 
 event_log_api = EventLogApi(api_client)
 
@@ -14,6 +19,12 @@ def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
     return [
         (get_event_logs, "get_event_logs", "List log entries from event log", True),
         (get_event_log, "get_event_log", "Get a specific log entry by ID", True),
+        (
+            tail_event_logs,
+            "tail_event_logs",
+            "Get event log entries newer than a cursor returned by a previous call, optionally waiting for them",
+            True,
+        ),
     ]
 
 
@@ -35,10 +46,6 @@ async def get_event_logs(
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     # Build parameters dictionary
     kwargs: Dict[str, Any] = {}
-    if limit is not None:
-        kwargs["limit"] = limit
-    if offset is not None:
-        kwargs["offset"] = offset
     if order_by is not None:
         kwargs["order_by"] = order_by
     if dag_id is not None:
@@ -64,12 +71,115 @@ async def get_event_logs(
     if excluded_events is not None:
         kwargs["excluded_events"] = excluded_events
 
-    response = event_log_api.get_event_logs(**kwargs)
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    # Large limits are fetched and encoded a page at a time
+    text = await asyncio.to_thread(
+        encode_pages,
+        lambda **page: event_log_api.get_event_logs(**kwargs, **page),
+        "event_logs",
+        limit,
+        offset,
+        order_by=None if order_by is not None else "event_log_id",
+    )
+    return [types.TextContent(type="text", text=text)]
 
 
 async def get_event_log(
     event_log_id: int,
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = event_log_api.get_event_log(event_log_id=event_log_id)
+    response = await asyncio.to_thread(event_log_api.get_event_log, event_log_id=event_log_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
+
+
+async def tail_event_logs(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    timeout_seconds: float = 0,
+    poll_interval_seconds: float = 2,
+    dag_id: Optional[str] = None,
+    task_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    event: Optional[str] = None,
+    owner: Optional[str] = None,
+    included_events: Optional[str] = None,
+    excluded_events: Optional[str] = None,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Follow the event log without re-listing it.
+
+    The first call (without a cursor) returns the most recent entries. Every call returns a cursor;
+    passing it to the next call only fetches entries that were added since.
+
+    Args:
+        cursor: The cursor returned by the previous call.
+        limit: The maximum number of entries to return.
+        timeout_seconds: How long to wait for new entries when there are none yet. 0 returns immediately.
+        poll_interval_seconds: How often to check for new entries while waiting.
+    """
+    kwargs: Dict[str, Any] = {"limit": limit}
+    if dag_id is not None:
+        kwargs["dag_id"] = dag_id
+    if task_id is not None:
+        kwargs["task_id"] = task_id
+    if run_id is not None:
+        kwargs["run_id"] = run_id
+    if event is not None:
+        kwargs["event"] = event
+    if owner is not None:
+        kwargs["owner"] = owner
+    if included_events is not None:
+        kwargs["included_events"] = included_events
+    if excluded_events is not None:
+        kwargs["excluded_events"] = excluded_events
+
+    if cursor is None:
+        response = await asyncio.to_thread(event_log_api.get_event_logs, order_by="-event_log_id", **kwargs)
+        event_logs = list(reversed(response.to_dict().get("event_logs", [])))
+        return _tail_result(event_logs, cursor, has_more=False)
+
+    last_event_log_id, last_when = _parse_cursor(cursor)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    offset = 0
+    while True:
+        # Entries sharing the cursor's timestamp may be new, so they are listed too and those already returned are
+        # filtered out by ID
+        response = await asyncio.to_thread(
+            event_log_api.get_event_logs,
+            order_by="event_log_id",
+            after=last_when - CURSOR_EPSILON,
+            offset=offset,
+            **kwargs,
+        )
+        fetched = response.to_dict().get("event_logs", [])
+        event_logs = [event_log for event_log in fetched if event_log["event_log_id"] > last_event_log_id]
+        if fetched and not event_logs and len(fetched) >= limit:
+            # A full page of entries already returned: the new ones, if any, come after them
+            offset += len(fetched)
+            continue
+        if event_logs or loop.time() >= deadline:
+            return _tail_result(event_logs, cursor, has_more=len(fetched) >= limit)
+        await asyncio.sleep(min(poll_interval_seconds, max(deadline - loop.time(), 0)))
+
+
+def _tail_result(
+    event_logs: List[Dict[str, Any]], cursor: Optional[str], has_more: bool
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    if event_logs:
+        last_event_log = event_logs[-1]
+        cursor = _format_cursor(last_event_log["event_log_id"], last_event_log["when"])
+    result = {"event_logs": event_logs, "cursor": cursor, "has_more": has_more}
+    return [types.TextContent(type="text", text=str(result))]
+
+
+def _format_cursor(event_log_id: int, when: Union[datetime, str]) -> str:
+    if isinstance(when, datetime):
+        when = when.isoformat()
+    return f"{event_log_id}@{when}"
+
+
+def _parse_cursor(cursor: str) -> Tuple[int, datetime]:
+    event_log_id, _, when = cursor.partition("@")
+    try:
+        return int(event_log_id), datetime.fromisoformat(when)
+    except ValueError as e:
+        raise ValueError(f"Invalid event log cursor: {cursor!r}") from e
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src.caller_credentials import use_server_credentials
+from src.envs import AIRFLOW_HEALTH_HISTORY_SIZE, AIRFLOW_HEALTH_PROBE_INTERVAL
+
+# Components reported by the health endpoint, with the field holding each one's latest heartbeat
+COMPONENT_HEARTBEATS = {
+    "metadatabase": None,
+    "scheduler": "latest_scheduler_heartbeat",
+    "triggerer": "latest_triggerer_heartbeat",
+    "dag_processor": "latest_dag_processor_heartbeat",
+}
+# Upper bounds (in milliseconds) of the health call latency histogram buckets
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+logger = logging.getLogger(__name__)
+
+
+class HealthSample:
+    def __init__(self, health: Optional[Dict[str, Any]], latency_ms: float, error: Optional[str] = None):
+        self.health = health
+        self.latency_ms = latency_ms
+        self.error = error
+        self.sampled_at = datetime.now(timezone.utc)
+        self._sampled_monotonic = time.monotonic()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self._sampled_monotonic
+
+    def status(self, component: str) -> Optional[str]:
+        if self.health is None:
+            return None
+        return (self.health.get(component) or {}).get("status")
+
+    def heartbeat_lag_seconds(self, component: str) -> Optional[float]:
+        field = COMPONENT_HEARTBEATS.get(component)
+        if field is None or self.health is None:
+            return None
+        heartbeat = _parse_datetime((self.health.get(component) or {}).get(field))
+        if heartbeat is None:
+            return None
+        return round((self.sampled_at - heartbeat).total_seconds(), 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        sample = {
+            "sampled_at": self.sampled_at.isoformat(),
+            "latency_ms": round(self.latency_ms, 1),
+            # The webserver is healthy when it answers the health call at all
+            "webserver": "unhealthy" if self.error else "healthy",
+        }
+        for component in COMPONENT_HEARTBEATS:
+            sample[component] = self.status(component)
+            lag = self.heartbeat_lag_seconds(component)
+            if lag is not None:
+                sample[f"{component}_heartbeat_lag_seconds"] = lag
+        if self.error:
+            sample["error"] = self.error
+        return sample
+
+
+class HealthMonitor:
+    """
+    Samples Airflow's health endpoint in the background and keeps a rolling window of the results.
+
+    ``get_health`` is served from the latest sample, so agents checking health before every operation do not
+    add a round trip each time, and trend questions are answered from the window without any upstream call.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Dict[str, Any]],
+        interval: float = AIRFLOW_HEALTH_PROBE_INTERVAL,
+        history_size: int = AIRFLOW_HEALTH_HISTORY_SIZE,
+    ):
+        self.probe = probe
+        self.interval = interval
+        self.samples: deque = deque(maxlen=history_size)
+        self._prober: Optional[asyncio.Task] = None
+
+    async def sample(self) -> HealthSample:
+        """Call the health endpoint once and record the result."""
+        started = time.perf_counter()
+        try:
+            health = await asyncio.to_thread(self.probe)
+            sample = HealthSample(health, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            sample = HealthSample(None, (time.perf_counter() - started) * 1000, error=str(e))
+        self.samples.append(sample)
+        return sample
+
+    async def latest(self, max_age_seconds: Optional[float] = None) -> HealthSample:
+        """Return the latest sample, probing now if there is none younger than ``max_age_seconds``."""
+        self._ensure_prober()
+        max_age_seconds = 2 * self.interval if max_age_seconds is None else max_age_seconds
+        if self.samples and self.samples[-1].age_seconds <= max_age_seconds:
+            return self.samples[-1]
+        return await self.sample()
+
+    def history(self, window_minutes: Optional[float] = None, timeline_limit: int = 20) -> Dict[str, Any]:
+        """Summarize the samples of the last ``window_minutes`` (all kept samples by default)."""
+        # Clients may ask for the history before ever asking for the health
+        self._ensure_prober()
+        samples = list(self.samples)
+        if window_minutes is not None:
+            samples = [sample for sample in samples if sample.age_seconds <= window_minutes * 60]
+        if not samples:
+            return {"samples": 0}
+
+        latencies = sorted(sample.latency_ms for sample in samples)
+        components = {"webserver": _status_summary(["unhealthy" if s.error else "healthy" for s in samples])}
+        for component in COMPONENT_HEARTBEATS:
+            summary = _status_summary([sample.status(component) for sample in samples])
+            lags = [lag for lag in (sample.heartbeat_lag_seconds(component) for sample in samples) if lag is not None]
+            if lags:
+                summary["heartbeat_lag_seconds"] = {
+                    "last": lags[-1],
+                    "avg": round(sum(lags) / len(lags), 1),
+                    "max": max(lags),
+                }
+            components[component] = summary
+
+        return {
+            "samples": len(samples),
+            "from": samples[0].sampled_at.isoformat(),
+            "to": samples[-1].sampled_at.isoformat(),
+            "interval_seconds": self.interval,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 0.5), 1),
+                "p95": round(_percentile(latencies, 0.95), 1),
+                "max": round(latencies[-1], 1),
+                "histogram": _histogram(latencies),
+            },
+            "components": components,
+            "status_changes": _status_changes(samples),
+            "timeline": [sample.to_dict() for sample in samples[-timeline_limit:]] if timeline_limit > 0 else [],
+        }
+
+    def stop(self) -> None:
+        if self._prober is not None:
+            self._prober.cancel()
+            self._prober = None
+
+    def _ensure_prober(self) -> None:
+        if self._prober is None or self._prober.done():
+            self._prober = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        use_server_credentials()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.warning(f"Health probe failed: {e}")
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    # Airflow stores timestamps in UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _histogram(latencies: List[float]) -> Dict[str, int]:
+    histogram = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    histogram["le_inf"] = 0
+    for latency in latencies:
+        bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if latency <= bound), "le_inf")
+        histogram[bucket] += 1
+    return histogram
+
+
+def _status_summary(statuses: List[Optional[str]]) -> Dict[str, Any]:
+    known = [status for status in statuses if status is not None]
+    summary: Dict[str, Any] = {"last": statuses[-1]}
+    if known:
+        summary["healthy_ratio"] = round(sum(status == "healthy" for status in known) / len(known), 3)
+    return summary
+
+
+def _status_changes(samples: List[HealthSample]) -> List[Dict[str, Any]]:
+    changes = []
+    previous = None
+    for sample in samples:
+        current = sample.to_dict()
+        statuses = {key: current[key] for key in ["webserver", *COMPONENT_HEARTBEATS]}
+        if previous is not None:
+            for component, status in statuses.items():
+                if status != previous[component]:
+                    changes.append(
+                        {"at": current["sampled_at"], "component": component, "from": previous[component], "to": status}
+                    )
+        previous = statuses
+    return changes
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
@@ -30,12 +31,12 @@ async def get_import_errors(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = import_error_api.get_import_errors(**kwargs)
+    response = await asyncio.to_thread(import_error_api.get_import_errors, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_import_error(
     import_error_id: int,
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = import_error_api.get_import_error(import_error_id=import_error_id)
+    response = await asyncio.to_thread(import_error_api.get_import_error, import_error_id=import_error_id)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from airflow_client.client.api.monitoring_api import MonitoringApi
+
+from src.airflow.airflow_client import api_client
+from src.caller_credentials import call_with_authorization, caller_authorization, use_server_credentials
+from src.envs import (
+    AIRFLOW_CALLER_CLIENTS_LIMIT,
+    AIRFLOW_METADATA_REFRESH_INTERVAL,
+    AIRFLOW_METADATA_VERSION_CHECK_INTERVAL,
+)
+from src.tracing import span
+
+# Page size used both to load full collections upstream and as the default page served from memory,
+# matching the default of the Airflow API
+PAGE_LIMIT = 100
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataEntry:
+    def __init__(self, value: Dict[str, Any]):
+        self.value = value
+        self.loaded_at = datetime.now(timezone.utc)
+        self._loaded_monotonic = time.monotonic()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self._loaded_monotonic
+
+
+class MetadataStore:
+    """
+    Process-lifetime cache of metadata that only changes on deploy: version, providers, plugins and config.
+
+    Each entry is loaded on first use and then served from memory. A background task checks the Airflow
+    version every ``version_check_interval`` seconds and reloads everything when it changes (a deploy),
+    and reloads all entries every ``refresh_interval`` seconds regardless.
+
+    With per-caller credentials, entries are kept per caller, since what Airflow returns may depend on who asks.
+    Like the callers' connection pools, only the entries of the ``callers_limit`` most recently seen callers are
+    kept, and those of a caller whose pool is closed are dropped along with it. Reloading everything drops the
+    callers' entries instead of reloading them: their credentials are only used while their requests last, and
+    the entries are loaded again on next use.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = AIRFLOW_METADATA_REFRESH_INTERVAL,
+        version_check_interval: float = AIRFLOW_METADATA_VERSION_CHECK_INTERVAL,
+        callers_limit: int = AIRFLOW_CALLER_CLIENTS_LIMIT,
+    ):
+        self.refresh_interval = refresh_interval
+        self.version_check_interval = version_check_interval
+        self.callers_limit = callers_limit
+        monitoring_api = MonitoringApi(api_client)
+        self._loaders: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "version": lambda: monitoring_api.get_version().to_dict()
+        }
+        self._entries: Dict[Tuple[Optional[str], str], MetadataEntry] = {}
+        self._locks: Dict[Tuple[Optional[str], str], asyncio.Lock] = {}
+        self._callers: OrderedDict[str, None] = OrderedDict()
+        self._last_full_refresh = time.monotonic()
+        self._refresher: Optional[asyncio.Task] = None
+
+    def register(self, key: str, loader: Callable[[], Dict[str, Any]]) -> None:
+        """Register how to load an entry; API modules register the metadata they serve when imported."""
+        self._loaders[key] = loader
+
+    async def get(self, key: str) -> Dict[str, Any]:
+        self._ensure_refresher()
+        authorization = caller_authorization.get()
+        self._seen(authorization)
+        with span("metadata cache", **{"cache.key": key}) as cache_span:
+            entry = self._entries.get((authorization, key))
+            if cache_span is not None:
+                cache_span.set_attribute("cache.hit", entry is not None)
+            if entry is None:
+                async with self._locks.setdefault((authorization, key), asyncio.Lock()):
+                    # Concurrent first calls share a single upstream load
+                    entry = self._entries.get((authorization, key))
+                    if entry is None:
+                        entry = await self._load(key, authorization)
+        return entry.value
+
+    async def refresh(self, keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Reload the given entries (all registered ones by default) and return the outcome for each."""
+        authorization = caller_authorization.get()
+        self._seen(authorization)
+        results = {}
+        for key in list(self._loaders) if keys is None else keys:
+            if key not in self._loaders:
+                results[key] = "unknown"
+                continue
+            try:
+                await self._load(key, authorization)
+                results[key] = "refreshed"
+            except Exception as e:
+                logger.warning(f"Refreshing {key} metadata failed: {e}")
+                results[key] = f"failed: {e}"
+        return results
+
+    async def check_version(self) -> bool:
+        """Reload the version and, if it changed since it was cached, every other loaded entry."""
+        authorization = caller_authorization.get()
+        previous = self._entries.get((authorization, "version"))
+        current = await self._load("version", authorization)
+        if previous is None or previous.value == current.value:
+            return False
+        logger.info(f"Airflow version changed from {previous.value} to {current.value}, reloading metadata")
+        await self._reload_all(skip=(authorization, "version"))
+        return True
+
+    def info(self) -> Dict[str, Any]:
+        authorization = caller_authorization.get()
+        return {
+            key: {"loaded_at": entry.loaded_at.isoformat(), "age_seconds": round(entry.age_seconds, 1)}
+            for (entry_authorization, key), entry in self._entries.items()
+            if entry_authorization == authorization
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def forget_caller(self, authorization: str) -> None:
+        """Drop the entries of a caller, e.g. once its connection pool was closed."""
+        self._callers.pop(authorization, None)
+        for entry_key in [entry_key for entry_key in list(self._entries) if entry_key[0] == authorization]:
+            self._entries.pop(entry_key, None)
+        for lock_key in [lock_key for lock_key in list(self._locks) if lock_key[0] == authorization]:
+            self._locks.pop(lock_key, None)
+
+    def _seen(self, authorization: Optional[str]) -> None:
+        if authorization is None:
+            return
+        self._callers[authorization] = None
+        self._callers.move_to_end(authorization)
+        while len(self._callers) > self.callers_limit:
+            self.forget_caller(next(iter(self._callers)))
+
+    def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    async def _load(self, key: str, authorization: Optional[str]) -> MetadataEntry:
+        value = await asyncio.to_thread(call_with_authorization, authorization, self._loaders[key])
+        entry = MetadataEntry(value)
+        self._entries[(authorization, key)] = entry
+        return entry
+
+    async def _reload_all(self, skip: Optional[Tuple[Optional[str], str]] = None) -> None:
+        for authorization, key in list(self._entries):
+            if (authorization, key) == skip:
+                continue
+            if authorization is not None:
+                self._entries.pop((authorization, key), None)
+                self._locks.pop((authorization, key), None)
+                continue
+            try:
+                await self._load(key, authorization)
+            except Exception as e:
+                logger.warning(f"Reloading {key} metadata failed: {e}")
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        use_server_credentials()
+        while True:
+            await asyncio.sleep(self.version_check_interval)
+            try:
+                if time.monotonic() - self._last_full_refresh >= self.refresh_interval:
+                    self._last_full_refresh = time.monotonic()
+                    await self._reload_all()
+                else:
+                    await self.check_version()
+            except Exception as e:
+                logger.warning(f"Background metadata refresh failed: {e}")
+
+
+def collect_pages(fetch: Callable[..., Any], items_key: str) -> Dict[str, Any]:
+    """Load every page of a collection endpoint into a single ``{items_key: [...], "total_entries": n}``."""
+    items: List[Dict[str, Any]] = []
+    while True:
+        with span("page", **{"page.offset": len(items), "page.limit": PAGE_LIMIT}):
+            page = fetch(limit=PAGE_LIMIT, offset=len(items)).to_dict()
+        batch = page.get(items_key) or []
+        items.extend(batch)
+        if not batch or len(items) >= (page.get("total_entries") or 0):
+            return {items_key: items, "total_entries": len(items)}
+
+
+def paginate(
+    collection: Dict[str, Any], items_key: str, limit: Optional[int] = None, offset: Optional[int] = None
+) -> Dict[str, Any]:
+    """Serve one page of a fully loaded collection, the way the API would."""
+    items = collection.get(items_key) or []
+    start = offset or 0
+    end = start + (limit if limit is not None else PAGE_LIMIT)
+    return {items_key: items[start:end], "total_entries": collection.get("total_entries", len(items))}
+
+
+metadata_store = MetadataStore()
+api_client.caller_eviction_callbacks.append(metadata_store.forget_caller)
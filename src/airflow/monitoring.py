@@ -1,33 +1,140 @@
-from typing import Callable, List, Union
+import asyncio
+from typing import Callable, List, Optional, Union
 
 import mcp.types as types
 from airflow_client.client.api.monitoring_api import MonitoringApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.health_monitor import HealthMonitor
+from src.airflow.metadata_store import metadata_store
+from src.airflow.revalidation import revalidation_cache
+from src.metrics import tool_metrics, transfer_metrics
 
 monitoring_api = MonitoringApi(api_client)
+health_monitor = HealthMonitor(lambda: monitoring_api.get_health().to_dict())
 
 
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
     """Return list of (function, name, description, is_read_only) tuples for registration."""
     return [
         (get_health, "get_health", "Get instance status", True),
+        (
+            get_health_history,
+            "get_health_history",
+            "Get health trends: latency histogram, component status changes and heartbeat lag",
+            True,
+        ),
         (get_version, "get_version", "Get version information", True),
+        (
+            get_upstream_transfer_stats,
+            "get_upstream_transfer_stats",
+            "Get bytes received from the Airflow API per tool, on the wire and decompressed",
+            True,
+        ),
+        (
+            get_server_metrics,
+            "get_server_metrics",
+            "Get call counts, errors, latency percentiles and upstream time of every tool",
+            True,
+        ),
+        (
+            refresh_metadata_cache,
+            "refresh_metadata_cache",
+            "Reload cached version, providers, plugins and config from Airflow",
+            True,
+        ),
     ]
 
 
-async def get_health() -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+async def get_health(
+    max_age_seconds: Optional[float] = None,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     """
     Get the status of Airflow's metadatabase, triggerer and scheduler.
     It includes info about metadatabase and last heartbeat of scheduler and triggerer.
+    The status comes from a background probe; sample_age_seconds tells how old it is.
+
+    Args:
+        max_age_seconds: Probe Airflow right now if the latest sample is older than this.
+            Defaults to twice the probe interval.
+    """
+    sample = await health_monitor.latest(max_age_seconds)
+    if sample.error:
+        # Surface an unreachable Airflow the same way a direct call would
+        response = await asyncio.to_thread(monitoring_api.get_health)
+        return [types.TextContent(type="text", text=str(response.to_dict()))]
+    health = {**sample.health, "sampled_at": sample.sampled_at.isoformat()}
+    health["sample_age_seconds"] = round(sample.age_seconds, 1)
+    return [types.TextContent(type="text", text=str(health))]
+
+
+async def get_health_history(
+    window_minutes: Optional[float] = None,
+    timeline_limit: int = 20,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Get how Airflow's health evolved, from the background probe samples, without calling Airflow.
+    Includes the health call latency (p50, p95, max and a histogram), the share of healthy samples
+    and the heartbeat lag of each component, every status change, and the most recent samples.
+
+    Args:
+        window_minutes: Only consider samples from the last this many minutes. All kept samples by default.
+        timeline_limit: How many of the most recent samples to include.
     """
-    response = monitoring_api.get_health()
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    return [types.TextContent(type="text", text=str(health_monitor.history(window_minutes, timeline_limit)))]
 
 
 async def get_version() -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
     """
     Get version information about Airflow.
     """
-    response = monitoring_api.get_version()
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    version = await metadata_store.get("version")
+    return [types.TextContent(type="text", text=str(version))]
+
+
+async def get_upstream_transfer_stats() -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Get how many bytes of Airflow API responses each tool has received since the server started.
+    wire_bytes is what travelled over the network (compressed when the API supports it),
+    decoded_bytes is the size after decompression.
+    revalidation counts conditional requests answered with 304 Not Modified and the bytes they saved.
+    """
+    stats = transfer_metrics.snapshot()
+    stats["revalidation"] = revalidation_cache.stats()
+    return [types.TextContent(type="text", text=str(stats))]
+
+
+async def get_server_metrics(
+    reset: bool = False,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Get how each tool performed since the server started (or the metrics were last reset): calls and errors,
+    latency (mean, and p50/p90/p99 estimated from a histogram), requests made to Airflow and the time spent waiting
+    on them, bytes received from Airflow and sent back, and the time spent deserializing Airflow responses
+    and turning them into dicts. On the SSE and HTTP transports, the same metrics are served on /metrics
+    for Prometheus.
+
+    Args:
+        reset: Start counting from zero again after returning the metrics.
+    """
+    metrics = tool_metrics.snapshot()
+    if reset:
+        tool_metrics.reset()
+    return [types.TextContent(type="text", text=str(metrics))]
+
+
+async def refresh_metadata_cache(
+    keys: Optional[List[str]] = None,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Reload the metadata served from memory (version, providers, plugins, config) from Airflow.
+    Use it after a deploy when the change should be visible before the next background refresh.
+
+    Args:
+        keys: Entries to reload, e.g. ["providers"]. All of them by default.
+
+    Returns:
+        The outcome per entry and when each entry was loaded.
+    """
+    results = await metadata_store.refresh(keys)
+    return [types.TextContent(type="text", text=str({"results": results, "entries": metadata_store.info()}))]
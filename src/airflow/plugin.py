@@ -1,11 +1,13 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Callable, List, Optional, Union
 
 import mcp.types as types
 from airflow_client.client.api.plugin_api import PluginApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.metadata_store import collect_pages, metadata_store, paginate
 
 plugin_api = PluginApi(api_client)
+metadata_store.register("plugins", lambda: collect_pages(plugin_api.get_plugins, "plugins"))
 
 
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
@@ -29,12 +31,5 @@ async def get_plugins(
     Returns:
         A list of loaded plugins.
     """
-    # Build parameters dictionary
-    kwargs: Dict[str, Any] = {}
-    if limit is not None:
-        kwargs["limit"] = limit
-    if offset is not None:
-        kwargs["offset"] = offset
-
-    response = plugin_api.get_plugins(**kwargs)
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    plugins = await metadata_store.get("plugins")
+    return [types.TextContent(type="text", text=str(paginate(plugins, "plugins", limit, offset)))]
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
@@ -45,7 +46,7 @@ async def get_pools(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = pool_api.get_pools(**kwargs)
+    response = await asyncio.to_thread(pool_api.get_pools, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -61,7 +62,7 @@ async def get_pool(
     Returns:
         The pool details.
     """
-    response = pool_api.get_pool(pool_name=pool_name)
+    response = await asyncio.to_thread(pool_api.get_pool, pool_name=pool_name)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -77,7 +78,7 @@ async def delete_pool(
     Returns:
         A confirmation message.
     """
-    pool_api.delete_pool(pool_name=pool_name)
+    await asyncio.to_thread(pool_api.delete_pool, pool_name=pool_name)
     return [types.TextContent(type="text", text=f"Pool '{pool_name}' deleted successfully.")]
 
 
@@ -110,7 +111,7 @@ async def post_pool(
     if include_deferred is not None:
         pool.include_deferred = include_deferred
 
-    response = pool_api.post_pool(pool=pool)
+    response = await asyncio.to_thread(pool_api.post_pool, pool=pool)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -143,5 +144,5 @@ async def patch_pool(
     if include_deferred is not None:
         pool.include_deferred = include_deferred
 
-    response = pool_api.patch_pool(pool_name=pool_name, pool=pool)
+    response = await asyncio.to_thread(pool_api.patch_pool, pool_name=pool_name, pool=pool)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
@@ -4,10 +4,20 @@ import mcp.types as types
 from airflow_client.client.api.provider_api import ProviderApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.metadata_store import metadata_store, paginate
 
 provider_api = ProviderApi(api_client)
 
 
+def load_providers() -> Dict[str, Any]:
+    # The providers endpoint is not paginated, it always returns every provider. Its response has no model in the
+    # Airflow client, so it already is a plain dict
+    return provider_api.get_providers()
+
+
+metadata_store.register("providers", load_providers)
+
+
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
     """Return list of (function, name, description, is_read_only) tuples for registration."""
     return [
@@ -29,12 +39,5 @@ async def get_providers(
     Returns:
         A list of providers with their details.
     """
-    # Build parameters dictionary
-    kwargs: Dict[str, Any] = {}
-    if limit is not None:
-        kwargs["limit"] = limit
-    if offset is not None:
-        kwargs["offset"] = offset
-
-    response = provider_api.get_providers(**kwargs)
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    providers = await metadata_store.get("providers")
+    return [types.TextContent(type="text", text=str(paginate(providers, "providers", limit, offset)))]
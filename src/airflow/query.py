@@ -0,0 +1,309 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import mcp.types as types
+from airflow_client.client.api.dag_api import DAGApi
+from airflow_client.client.api.dag_run_api import DAGRunApi
+from airflow_client.client.api.task_instance_api import TaskInstanceApi
+from pydantic import BaseModel, Field
+
+from src.airflow.airflow_client import api_client
+from src.airflow.dag import get_dag_url
+from src.airflow.dagrun import get_dag_run_url
+from src.tracing import span
+
+# Page sizes of the list endpoints, matching the default maximum page size of the Airflow API
+DAG_PAGE_LIMIT = 100
+DAG_RUN_PAGE_LIMIT = 100
+# How many DAG runs a single task instance batch request covers
+TASK_INSTANCE_RUNS_PER_REQUEST = 100
+
+dag_api = DAGApi(api_client)
+dag_run_api = DAGRunApi(api_client)
+task_instance_api = TaskInstanceApi(api_client)
+
+
+def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
+    """Return list of (function, name, description, is_read_only) tuples for registration."""
+    return [
+        (
+            query,
+            "query",
+            "Fetch DAGs, their DAG runs and the runs' task instances in one call, joined into a single result",
+            True,
+        ),
+    ]
+
+
+class DagSelection(BaseModel):
+    dag_ids: Optional[List[str]] = Field(None, description="Only these DAGs.")
+    tags: Optional[List[str]] = Field(None, description="Only DAGs with any of these tags.")
+    dag_id_pattern: Optional[str] = Field(None, description="Only DAGs whose ID contains this text.")
+    paused: Optional[bool] = Field(None, description="Only paused (true) or unpaused (false) DAGs.")
+    only_active: bool = Field(True, description="Only DAGs whose file still exists.")
+    limit: int = Field(100, description="The maximum number of DAGs.")
+    fields: Optional[List[str]] = Field(None, description="DAG fields to return, all by default.")
+
+
+class RunSelection(BaseModel):
+    state: Optional[List[str]] = Field(None, description="Only DAG runs in these states.")
+    per_dag: Optional[int] = Field(
+        1, description="How many DAG runs to keep per DAG, in order_by order; null keeps every matching run."
+    )
+    order_by: str = Field("-execution_date", description="The DAG run field to sort by, '-' for descending.")
+    execution_date_gte: Optional[str] = None
+    execution_date_lte: Optional[str] = None
+    start_date_gte: Optional[str] = None
+    start_date_lte: Optional[str] = None
+    end_date_gte: Optional[str] = None
+    end_date_lte: Optional[str] = None
+    limit: int = Field(1000, description="The maximum number of DAG runs over all DAGs.")
+    fields: Optional[List[str]] = Field(None, description="DAG run fields to return, all by default.")
+
+    def window(self) -> Dict[str, str]:
+        return {
+            name: getattr(self, name)
+            for name in (
+                "execution_date_gte",
+                "execution_date_lte",
+                "start_date_gte",
+                "start_date_lte",
+                "end_date_gte",
+                "end_date_lte",
+            )
+            if getattr(self, name) is not None
+        }
+
+
+class TaskInstanceSelection(BaseModel):
+    state: Optional[List[str]] = Field(None, description="Only task instances in these states.")
+    task_ids: Optional[List[str]] = Field(None, description="Only these tasks.")
+    fields: Optional[List[str]] = Field(None, description="Task instance fields to return, all by default.")
+
+
+class QueryPlan:
+    """Records the API calls a query was answered with, returned alongside the result."""
+
+    def __init__(self):
+        self.steps: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+
+    def step(self, level: str, endpoint: str, calls: int, **details: Any) -> None:
+        self.steps.append({"level": level, "endpoint": endpoint, "calls": calls, **details})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"steps": self.steps, "api_calls": sum(step["calls"] for step in self.steps)}
+
+
+async def query(
+    dags: Optional[DagSelection] = None,
+    runs: Optional[RunSelection] = None,
+    task_instances: Optional[TaskInstanceSelection] = None,
+    max_concurrency: int = 8,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Answer a nested request for DAGs -> DAG runs -> task instances with as few API calls as possible.
+
+    DAGs are listed page by page (or fetched by ID). DAG runs are fetched with one batch request when a date
+    window or no per-DAG limit is given, and otherwise with one request per DAG, concurrently. Task instances
+    of all selected runs are fetched with batch requests. Each DAG run is nested under its DAG and each task
+    instance under its DAG run. The calls made are reported under "plan".
+
+    Args:
+        dags: Which DAGs to return. All active DAGs by default.
+        runs: Which DAG runs to return for each DAG. No DAG runs when omitted.
+        task_instances: Which task instances to return for each DAG run. None when omitted, requires runs.
+        max_concurrency: The maximum number of API requests in flight at the same time.
+    """
+    dags = dags or DagSelection()
+    plan = QueryPlan()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    selected_dags = await _select_dags(dags, plan, semaphore)
+    runs_by_dag: Dict[str, List[Dict[str, Any]]] = {}
+    instances_by_run: Dict[tuple, List[Dict[str, Any]]] = {}
+    if runs is not None and selected_dags:
+        runs_by_dag = await _select_runs([dag["dag_id"] for dag in selected_dags], runs, plan, semaphore)
+        selected_runs = [dag_run for dag_runs in runs_by_dag.values() for dag_run in dag_runs]
+        if task_instances is not None and selected_runs:
+            instances_by_run = await _select_task_instances(selected_runs, task_instances, plan, semaphore)
+
+    result_dags = []
+    for dag in selected_dags:
+        item = _project(dag, dags.fields, "dag_id")
+        item["ui_url"] = get_dag_url(dag["dag_id"])
+        if runs is not None:
+            item["dag_runs"] = []
+            for dag_run in runs_by_dag.get(dag["dag_id"], []):
+                run_item = _project(dag_run, runs.fields, "dag_run_id")
+                run_item["ui_url"] = get_dag_run_url(dag_run["dag_id"], dag_run["dag_run_id"])
+                if task_instances is not None:
+                    run_item["task_instances"] = [
+                        _project(task_instance, task_instances.fields, "task_id")
+                        for task_instance in instances_by_run.get((dag_run["dag_id"], dag_run["dag_run_id"]), [])
+                    ]
+                item["dag_runs"].append(run_item)
+        result_dags.append(item)
+
+    result: Dict[str, Any] = {"dags": result_dags, "total_dags": len(result_dags), "plan": plan.to_dict()}
+    if plan.errors:
+        result["errors"] = plan.errors
+    return [types.TextContent(type="text", text=str(result))]
+
+
+async def _select_dags(selection: DagSelection, plan: QueryPlan, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+    if selection.dag_ids is not None:
+        dag_ids = selection.dag_ids[: selection.limit]
+        responses = await _gather(semaphore, [(dag_api.get_dag, {"dag_id": dag_id}) for dag_id in dag_ids])
+        plan.step("dags", "get_dag", len(dag_ids))
+        dags = []
+        for dag_id, response in zip(dag_ids, responses, strict=False):
+            if isinstance(response, Exception):
+                plan.errors.append({"level": "dags", "dag_id": dag_id, "error": str(response)})
+            else:
+                dags.append(response.to_dict())
+        # The other filters apply to DAGs fetched by ID the way the list endpoint would apply them
+        return [dag for dag in dags if _dag_matches(dag, selection)]
+
+    kwargs: Dict[str, Any] = {"only_active": selection.only_active}
+    if selection.tags is not None:
+        kwargs["tags"] = selection.tags
+    if selection.dag_id_pattern is not None:
+        kwargs["dag_id_pattern"] = selection.dag_id_pattern
+    if selection.paused is not None:
+        kwargs["paused"] = selection.paused
+
+    dags: List[Dict[str, Any]] = []
+    calls = 0
+    while len(dags) < selection.limit:
+        page_limit = min(DAG_PAGE_LIMIT, selection.limit - len(dags))
+        with span("page", **{"page.offset": len(dags), "page.limit": page_limit}):
+            async with semaphore:
+                response = await asyncio.to_thread(dag_api.get_dags, limit=page_limit, offset=len(dags), **kwargs)
+            page = response.to_dict()
+        calls += 1
+        batch = page.get("dags") or []
+        dags.extend(batch)
+        if len(batch) < page_limit or len(dags) >= (page.get("total_entries") or 0):
+            break
+    plan.step("dags", "get_dags", calls)
+    return dags
+
+
+def _dag_matches(dag: Dict[str, Any], selection: DagSelection) -> bool:
+    if selection.tags is not None and not {tag.get("name") for tag in dag.get("tags") or []} & set(selection.tags):
+        return False
+    if selection.dag_id_pattern is not None and selection.dag_id_pattern.lower() not in dag["dag_id"].lower():
+        return False
+    if selection.paused is not None and dag.get("is_paused") != selection.paused:
+        return False
+    if selection.only_active and dag.get("is_active") is False:
+        return False
+    return True
+
+
+async def _select_runs(
+    dag_ids: List[str], selection: RunSelection, plan: QueryPlan, semaphore: asyncio.Semaphore
+) -> Dict[str, List[Dict[str, Any]]]:
+    window = selection.window()
+    runs_by_dag: Dict[str, List[Dict[str, Any]]] = {dag_id: [] for dag_id in dag_ids}
+
+    if selection.per_dag is not None and not window:
+        # Without a window, "the latest N runs of each DAG" can only be asked DAG by DAG
+        kwargs: Dict[str, Any] = {"limit": selection.per_dag, "order_by": selection.order_by}
+        if selection.state is not None:
+            kwargs["state"] = selection.state
+        calls = [(dag_run_api.get_dag_runs, {"dag_id": dag_id, **kwargs}) for dag_id in dag_ids]
+        responses = await _gather(semaphore, calls)
+        remaining = selection.limit
+        for dag_id, response in zip(dag_ids, responses, strict=False):
+            if isinstance(response, Exception):
+                plan.errors.append({"level": "dag_runs", "dag_id": dag_id, "error": str(response)})
+                continue
+            dag_runs = response.to_dict().get("dag_runs") or []
+            runs_by_dag[dag_id] = dag_runs[: max(remaining, 0)]
+            remaining -= len(dag_runs)
+        plan.step("dag_runs", "get_dag_runs", len(calls), strategy="per_dag", truncated=remaining < 0)
+        return runs_by_dag
+
+    form: Dict[str, Any] = {"dag_ids": dag_ids, "order_by": selection.order_by, **window}
+    if selection.state is not None:
+        form["states"] = selection.state
+    fetched = 0
+    calls = 0
+    truncated = False
+    while True:
+        if fetched >= selection.limit:
+            truncated = True
+            break
+        page_limit = min(DAG_RUN_PAGE_LIMIT, selection.limit - fetched)
+        with span("page", **{"page.offset": fetched, "page.limit": page_limit}):
+            async with semaphore:
+                response = await asyncio.to_thread(
+                    dag_run_api.get_dag_runs_batch,
+                    list_dag_runs_form={**form, "page_limit": page_limit, "page_offset": fetched},
+                )
+            page = response.to_dict()
+        calls += 1
+        batch = page.get("dag_runs") or []
+        for dag_run in batch:
+            dag_runs = runs_by_dag.setdefault(dag_run["dag_id"], [])
+            if selection.per_dag is None or len(dag_runs) < selection.per_dag:
+                dag_runs.append(dag_run)
+        fetched += len(batch)
+        if len(batch) < page_limit or fetched >= (page.get("total_entries") or 0):
+            break
+    plan.step("dag_runs", "get_dag_runs_batch", calls, strategy="batch", truncated=truncated)
+    return runs_by_dag
+
+
+async def _select_task_instances(
+    dag_runs: List[Dict[str, Any]], selection: TaskInstanceSelection, plan: QueryPlan, semaphore: asyncio.Semaphore
+) -> Dict[tuple, List[Dict[str, Any]]]:
+    chunks = [
+        dag_runs[start : start + TASK_INSTANCE_RUNS_PER_REQUEST]
+        for start in range(0, len(dag_runs), TASK_INSTANCE_RUNS_PER_REQUEST)
+    ]
+    calls = []
+    for chunk in chunks:
+        form: Dict[str, Any] = {
+            "dag_ids": sorted({dag_run["dag_id"] for dag_run in chunk}),
+            "dag_run_ids": sorted({dag_run["dag_run_id"] for dag_run in chunk}),
+        }
+        if selection.state is not None:
+            form["state"] = selection.state
+        if selection.task_ids is not None:
+            form["task_ids"] = selection.task_ids
+        calls.append((task_instance_api.get_task_instances_batch, {"list_task_instance_form": form}))
+    responses = await _gather(semaphore, calls)
+    plan.step("task_instances", "get_task_instances_batch", len(calls))
+
+    selected_runs = {(dag_run["dag_id"], dag_run["dag_run_id"]) for dag_run in dag_runs}
+    instances_by_run: Dict[tuple, List[Dict[str, Any]]] = {}
+    for chunk, response in zip(chunks, responses, strict=False):
+        if isinstance(response, Exception):
+            plan.errors.append({"level": "task_instances", "dag_runs": len(chunk), "error": str(response)})
+            continue
+        for task_instance in response.to_dict().get("task_instances") or []:
+            # The batch endpoint filters dag_ids and dag_run_ids independently, so drop cross-matched pairs
+            key = (task_instance["dag_id"], task_instance["dag_run_id"])
+            if key in selected_runs:
+                instances_by_run.setdefault(key, []).append(task_instance)
+    return instances_by_run
+
+
+async def _gather(semaphore: asyncio.Semaphore, calls: List[tuple]) -> List[Any]:
+    """Run blocking API calls concurrently, at most as many at a time as the semaphore allows."""
+
+    async def run(func: Callable, kwargs: Dict[str, Any]) -> Any:
+        async with semaphore:
+            return await asyncio.to_thread(func, **kwargs)
+
+    return await asyncio.gather(*(run(func, kwargs) for func, kwargs in calls), return_exceptions=True)
+
+
+def _project(item: Dict[str, Any], fields: Optional[List[str]], key: str) -> Dict[str, Any]:
+    if fields is None:
+        return dict(item)
+    # The identifying field is always kept so nested results stay attributable
+    return {field: item.get(field) for field in dict.fromkeys([key, *fields])}
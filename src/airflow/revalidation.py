@@ -0,0 +1,95 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Endpoints whose responses rarely change between calls: config, plugins, providers, DAG details and pools
+REVALIDATED_PATH_PATTERN = re.compile(r"/(config|plugins|providers|pools(/[^/]+)?|dags/[^/]+/details)$")
+MAX_ENTRIES = 256
+
+
+class CachedResponse:
+    """A response body kept for revalidation, with the validators the server sent along with it."""
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], data: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        # Servers that send neither validator still let us tell an unchanged body from a changed one
+        self.content_hash = hashlib.sha256(data).hexdigest()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class RevalidationCache:
+    """
+    Bounded LRU of GET responses that are revalidated with conditional requests instead of refetched.
+
+    When a cached response carried an ETag or Last-Modified, the next request for it is sent with
+    If-None-Match / If-Modified-Since, and a 304 answer is served from the cache.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[Any, ...], CachedResponse] = OrderedDict()
+        self._stats = {"not_modified": 0, "modified": 0, "unchanged_content": 0, "bytes_saved": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def applies(method: str, url: str) -> bool:
+        return method == "GET" and REVALIDATED_PATH_PATTERN.search(urlparse(url).path) is not None
+
+    @staticmethod
+    def key(url: str, query_params: Any, headers: Dict[str, str]) -> Tuple[Any, ...]:
+        # Credentials are part of the key, responses may differ between users
+        return url, str(query_params or []), headers.get("Authorization")
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def not_modified(self, key: Tuple[Any, ...]) -> Optional[CachedResponse]:
+        """Return the cached response confirmed by a 304, counting the body that did not need to be sent."""
+        entry = self.get(key)
+        if entry is not None:
+            with self._lock:
+                self._stats["not_modified"] += 1
+                self._stats["bytes_saved"] += len(entry.data)
+        return entry
+
+    def store(self, key: Tuple[Any, ...], entry: CachedResponse) -> None:
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._stats["modified"] += 1
+                if previous.content_hash == entry.content_hash:
+                    self._stats["unchanged_content"] += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+revalidation_cache = RevalidationCache()
@@ -0,0 +1,146 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.envs import MCP_MAX_RESPONSE_BYTES
+from src.tracing import span
+
+# Page size of streamed listings, matching the default maximum page size of the Airflow API
+STREAM_PAGE_LIMIT = 100
+# Room kept for the truncation marker, whose offset has at most 20 digits
+TRUNCATION_MARKER_SIZE = len(", 'truncated': True, 'next_offset': ") + 20
+
+
+class ResponseEncoder:
+    """
+    Encodes a listing response page by page into the text ``str()`` gives for the whole response.
+
+    Every page's items are turned into text as the page arrives, so only one page of models and dicts is alive at a
+    time, instead of every model, the dict of every model and the text at once. The other fields of the response,
+    e.g. ``total_entries``, are taken from the first page. Items that would take the text past ``max_bytes`` are
+    left out, and a ``'truncated': True`` field is added along with the ``next_offset`` to continue from.
+    """
+
+    def __init__(self, items_key: str, offset: int = 0, max_bytes: int = MCP_MAX_RESPONSE_BYTES):
+        self.items_key = items_key
+        self.offset = offset
+        self.max_bytes = max_bytes
+        self.returned = 0
+        self.truncated = False
+        self._keys: Optional[List[str]] = None
+        self._fields: Dict[str, str] = {}
+        self._chunks: List[str] = []
+        self._size = 0
+
+    def add_page(self, page: Dict[str, Any]) -> bool:
+        """Encode a page of the response; returns False once the size cap was reached and no more pages fit."""
+        if self._keys is None:
+            self._keys = list(page)
+            self._fields = {key: repr(value) for key, value in page.items() if not self._is_items(key, value)}
+            self._size = len(str(dict.fromkeys(self._keys, []))) + TRUNCATION_MARKER_SIZE
+            self._size += sum(_size(field) for field in self._fields.values())
+        if self.truncated:
+            return False
+        items = page.get(self.items_key)
+        if not isinstance(items, list):
+            return True
+        encoded = []
+        for item in items:
+            text = repr(item)
+            # Items are separated by ", "
+            size = _size(text) + (2 if self.returned else 0)
+            if self._size + size > self.max_bytes:
+                self.truncated = True
+                break
+            encoded.append(text)
+            self._size += size
+            self.returned += 1
+        if encoded:
+            self._chunks.append(", ".join(encoded))
+        return not self.truncated
+
+    def text(self) -> str:
+        # Joined once, so that the text is never copied: it can be most of the response's memory
+        parts = ["{"]
+        for key in self._keys or []:
+            if len(parts) > 1:
+                parts.append(", ")
+            parts.append(f"{key!r}: ")
+            if key in self._fields:
+                parts.append(self._fields[key])
+                continue
+            parts.append("[")
+            for i, chunk in enumerate(self._chunks):
+                if i:
+                    parts.append(", ")
+                parts.append(chunk)
+            parts.append("]")
+        if self.truncated:
+            parts.append(
+                f"{', ' if len(parts) > 1 else ''}'truncated': True, 'next_offset': {self.offset + self.returned}"
+            )
+        parts.append("}")
+        return "".join(parts)
+
+    def _is_items(self, key: str, value: Any) -> bool:
+        return key == self.items_key and isinstance(value, list)
+
+
+def _size(text: str) -> int:
+    # Bytes of the text once sent as UTF-8
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def encode_pages(
+    fetch: Callable[..., Any],
+    items_key: str,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    prepare: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    max_bytes: int = MCP_MAX_RESPONSE_BYTES,
+    order_by: Optional[str] = None,
+) -> str:
+    """
+    Fetch up to ``limit`` items of a collection endpoint from ``offset`` on and return the response as text.
+
+    A limit beyond a page is fetched a page at a time, each page being encoded and released before the next is
+    fetched, so memory scales with the page size rather than with the limit; fetching stops at the size cap.
+    ``prepare`` can amend the items of each page before they are encoded. Pages are only consistent with each
+    other in a stable order, so ``order_by``, e.g. the primary key, is requested for every page when there are
+    several; leave it out when the caller already asked for an order.
+    """
+    encoder = ResponseEncoder(items_key, offset or 0, max_bytes)
+    if limit is None or limit <= STREAM_PAGE_LIMIT:
+        # A single page, requested exactly as asked
+        kwargs = {name: value for name, value in (("limit", limit), ("offset", offset)) if value is not None}
+        _encode_page(fetch, kwargs, encoder, prepare)
+        return encoder.text()
+
+    start = offset or 0
+    fetched = 0
+    while fetched < limit:
+        page = {"limit": min(STREAM_PAGE_LIMIT, limit - fetched), "offset": start + fetched}
+        if order_by is not None:
+            page["order_by"] = order_by
+        count, total_entries, fits = _encode_page(fetch, page, encoder, prepare)
+        fetched += count
+        # A short page is not the end: the server may cap pages below STREAM_PAGE_LIMIT
+        if not fits or not count or (total_entries is not None and start + fetched >= total_entries):
+            break
+    return encoder.text()
+
+
+def _encode_page(
+    fetch: Callable[..., Any],
+    kwargs: Dict[str, Any],
+    encoder: ResponseEncoder,
+    prepare: Optional[Callable[[List[Dict[str, Any]]], None]],
+) -> Tuple[int, Optional[int], bool]:
+    """Fetch and encode a page; returns its number of items, the total number of entries and whether it fit."""
+    with span("page", **{"page.offset": kwargs.get("offset", 0), "page.limit": kwargs.get("limit", 0)}):
+        page = fetch(**kwargs).to_dict()
+    items = page.get(encoder.items_key)
+    if not isinstance(items, list):
+        items = []
+    if prepare is not None:
+        prepare(items)
+    fits = encoder.add_page(page)
+    return len(items), page.get("total_entries"), fits
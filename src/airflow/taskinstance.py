@@ -1,11 +1,28 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+import ast
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import mcp.types as types
+from airflow_client.client.api.dag_run_api import DAGRunApi
 from airflow_client.client.api.task_instance_api import TaskInstanceApi
 
 from src.airflow.airflow_client import api_client
+from src.airflow.duration_baseline import BASELINE_STATES, DurationBaselines, caller_baselines, duration_baselines
+from src.airflow.streaming import encode_pages
+from src.caller_credentials import caller_authorization
+
+# Lines that most likely carry the reason a try failed, searched from the end of the log tail
+ERROR_LINE_PATTERN = re.compile(r"(Error|Exception|Traceback|FAILED|Failed|Killed|Timeout)")
+# Parts of an error line that vary between otherwise identical failures
+LOG_PREFIX_PATTERN = re.compile(r"^\[[^\]]*\]\s*(\{[^}]*\}\s*)?([A-Z]+\s*-\s*)?")
+VOLATILE_TOKEN_PATTERN = re.compile(r"0x[0-9a-fA-F]+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|\d+")
+# Pages of failed task instances fetched at most per triage; the rest is reported as truncated
+TRIAGE_MAX_PAGES = 10
 
 task_instance_api = TaskInstanceApi(api_client)
+dag_run_api = DAGRunApi(api_client)
 
 
 def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
@@ -31,13 +48,39 @@ def get_all_functions() -> list[tuple[Callable, str, str, bool]]:
             "List task instance tries by DAG ID, DAG run ID, and task ID",
             True,
         ),
+        (
+            get_task_duration_baseline,
+            "get_task_duration_baseline",
+            "Get duration quantiles of a task from its incrementally maintained baseline",
+            True,
+        ),
+        (
+            check_task_duration,
+            "check_task_duration",
+            "Check whether a task duration is above a quantile of its baseline",
+            True,
+        ),
+        (
+            refresh_task_duration_baselines,
+            "refresh_task_duration_baselines",
+            "Update task duration baselines from task instances finished since the last refresh",
+            False,
+        ),
+        (
+            triage_failures,
+            "triage_failures",
+            "Summarize failed task instances in a time window, grouped by the error found in their log tails",
+            True,
+        ),
     ]
 
 
 async def get_task_instance(
     dag_id: str, task_id: str, dag_run_id: str
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = task_instance_api.get_task_instance(dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id)
+    response = await asyncio.to_thread(
+        task_instance_api.get_task_instance, dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -88,13 +131,18 @@ async def list_task_instances(
         kwargs["pool"] = pool
     if queue is not None:
         kwargs["queue"] = queue
-    if limit is not None:
-        kwargs["limit"] = limit
-    if offset is not None:
-        kwargs["offset"] = offset
 
-    response = task_instance_api.get_task_instances(dag_id=dag_id, dag_run_id=dag_run_id, **kwargs)
-    return [types.TextContent(type="text", text=str(response.to_dict()))]
+    # Large limits are fetched and encoded a page at a time; every page doubles as a free sample for the duration
+    # baselines
+    text = await asyncio.to_thread(
+        encode_pages,
+        lambda **page: task_instance_api.get_task_instances(dag_id=dag_id, dag_run_id=dag_run_id, **kwargs, **page),
+        "task_instances",
+        limit,
+        offset,
+        _current_baselines().observe,
+    )
+    return [types.TextContent(type="text", text=text)]
 
 
 async def update_task_instance(
@@ -104,7 +152,8 @@ async def update_task_instance(
     if state is not None:
         update_request["state"] = state
 
-    response = task_instance_api.patch_task_instance(
+    response = await asyncio.to_thread(
+        task_instance_api.patch_task_instance,
         dag_id=dag_id,
         dag_run_id=dag_run_id,
         task_id=task_id,
@@ -117,7 +166,8 @@ async def update_task_instance(
 async def get_log(
     dag_id: str, task_id: str, dag_run_id: str, task_try_number: int
 ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = task_instance_api.get_log(
+    response = await asyncio.to_thread(
+        task_instance_api.get_log,
         dag_id=dag_id,
         dag_run_id=dag_run_id,
         task_id=task_id,
@@ -143,7 +193,265 @@ async def list_task_instance_tries(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = task_instance_api.get_task_instance_tries(
-        dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, **kwargs
+    response = await asyncio.to_thread(
+        task_instance_api.get_task_instance_tries, dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, **kwargs
     )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
+
+
+async def get_task_duration_baseline(
+    dag_id: str, task_id: str
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Get the duration baseline of a task without fetching its history.
+
+    Baselines are fed by list_task_instances and refresh_task_duration_baselines.
+    """
+    summary = _current_baselines().summary(dag_id, task_id)
+    if summary is None:
+        summary = {"dag_id": dag_id, "task_id": task_id, "count": 0}
+    return [types.TextContent(type="text", text=str(summary))]
+
+
+async def check_task_duration(
+    dag_id: str,
+    task_id: str,
+    duration: float,
+    quantile: float = 0.99,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Check a task duration (in seconds) against its baseline.
+
+    Args:
+        dag_id: The DAG ID.
+        task_id: The task ID.
+        duration: The duration to check, in seconds.
+        quantile: The baseline quantile used as the anomaly threshold, e.g. 0.99 for p99.
+    """
+    digest = _current_baselines().get(dag_id, task_id)
+    result: Dict[str, Any] = {"dag_id": dag_id, "task_id": task_id, "duration": duration, "quantile": quantile}
+    if digest is None:
+        result["count"] = 0
+        result["is_anomalous"] = None
+        return [types.TextContent(type="text", text=str(result))]
+
+    threshold = digest.quantile(quantile)
+    result["count"] = int(digest.count)
+    result["threshold"] = threshold
+    result["percentile_rank"] = digest.cdf(duration)
+    result["is_anomalous"] = duration > threshold
+    return [types.TextContent(type="text", text=str(result))]
+
+
+async def refresh_task_duration_baselines(
+    page_size: int = 100,
+    max_pages: int = 10,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Update duration baselines with task instances updated since the previous refresh.
+
+    Args:
+        page_size: The number of task instances to fetch per request.
+        max_pages: The maximum number of pages to fetch; the cursor only advances once all pages are read.
+    """
+    baselines = _current_baselines()
+    poll_started_at = datetime.now(timezone.utc).isoformat()
+    # The task instance listing takes no order_by, so offsets are only kept consistent by paging through a fixed
+    # set: instances updated meanwhile are left to the next refresh, which starts from poll_started_at
+    kwargs: Dict[str, Any] = {"state": sorted(BASELINE_STATES), "limit": page_size, "updated_at_lte": poll_started_at}
+    if baselines.poll_cursor is not None:
+        kwargs["updated_at_gte"] = baselines.poll_cursor
+
+    fetched = 0
+    observed = 0
+    seen = set()
+    is_complete = False
+    for _ in range(max_pages):
+        response = await asyncio.to_thread(
+            task_instance_api.get_task_instances, dag_id="~", dag_run_id="~", offset=fetched, **kwargs
+        )
+        page = response.to_dict()
+        task_instances = page.get("task_instances") or []
+        total_entries = page.get("total_entries")
+        fetched += len(task_instances)
+        seen.update(_try_key(task_instance) for task_instance in task_instances)
+        observed += await asyncio.to_thread(baselines.observe, task_instances)
+        if total_entries is not None:
+            if not task_instances or fetched >= total_entries:
+                # Without an order, pages may still repeat some instances and skip others; the skipped ones are
+                # only read again if the cursor stays put
+                is_complete = len(seen) >= total_entries
+                break
+        elif len(task_instances) < page_size:
+            is_complete = True
+            break
+
+    if is_complete:
+        baselines.poll_cursor = poll_started_at
+        await asyncio.to_thread(baselines.save)
+
+    result = {
+        "fetched": fetched,
+        "observed": observed,
+        "is_complete": is_complete,
+        "poll_cursor": baselines.poll_cursor,
+    }
+    return [types.TextContent(type="text", text=str(result))]
+
+
+async def triage_failures(
+    end_date_gte: Optional[str] = None,
+    end_date_lte: Optional[str] = None,
+    dag_ids: Optional[List[str]] = None,
+    max_dag_runs: int = 50,
+    tail_lines: int = 20,
+    max_concurrency: int = 8,
+    latency_budget_seconds: float = 30.0,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Find failed DAG runs in a time window, collect their failed task instances and fetch the tail of each
+    failing try's log concurrently. Failures with the same error signature are grouped together.
+
+    Args:
+        end_date_gte: Only consider DAG runs that ended at or after this time.
+        end_date_lte: Only consider DAG runs that ended at or before this time.
+        dag_ids: Only consider DAG runs of these DAGs.
+        max_dag_runs: The maximum number of failed DAG runs to triage, most recent first.
+        tail_lines: The number of log lines to keep from the end of each failing try's log.
+        max_concurrency: The maximum number of logs fetched at the same time.
+        latency_budget_seconds: Logs not fetched within this budget are reported as timed out.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + latency_budget_seconds
+
+    dag_runs_form: Dict[str, Any] = {"states": ["failed"], "order_by": "-end_date", "page_limit": max_dag_runs}
+    if end_date_gte is not None:
+        dag_runs_form["end_date_gte"] = end_date_gte
+    if end_date_lte is not None:
+        dag_runs_form["end_date_lte"] = end_date_lte
+    if dag_ids is not None:
+        dag_runs_form["dag_ids"] = dag_ids
+    dag_runs_response = await asyncio.to_thread(dag_run_api.get_dag_runs_batch, list_dag_runs_form=dag_runs_form)
+    dag_runs = dag_runs_response.to_dict().get("dag_runs", [])
+
+    result: Dict[str, Any] = {"failed_dag_runs": len(dag_runs), "failed_task_instances": 0, "groups": []}
+    if not dag_runs:
+        return [types.TextContent(type="text", text=str(result))]
+
+    failed_runs = {(dag_run["dag_id"], dag_run["dag_run_id"]) for dag_run in dag_runs}
+    task_instances_form = {
+        "dag_ids": sorted({dag_id for dag_id, _ in failed_runs}),
+        "dag_run_ids": sorted({dag_run_id for _, dag_run_id in failed_runs}),
+        "state": ["failed"],
+    }
+    fetched, is_complete = await _fetch_task_instances_batch(task_instances_form)
+    # The batch endpoint filters dag_ids and dag_run_ids independently, so drop cross-matched pairs
+    task_instances = [
+        task_instance
+        for task_instance in fetched
+        if (task_instance["dag_id"], task_instance["dag_run_id"]) in failed_runs
+    ]
+    result["failed_task_instances"] = len(task_instances)
+    if not is_complete:
+        result["task_instances_truncated"] = True
+    if not task_instances:
+        return [types.TextContent(type="text", text=str(result))]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_tail(task_instance: Dict[str, Any]) -> List[str]:
+        async with semaphore:
+            response = await asyncio.to_thread(
+                task_instance_api.get_log,
+                dag_id=task_instance["dag_id"],
+                dag_run_id=task_instance["dag_run_id"],
+                task_id=task_instance["task_id"],
+                task_try_number=task_instance["try_number"],
+            )
+        return _tail_lines(response.to_dict().get("content", ""), tail_lines)
+
+    fetches = {asyncio.ensure_future(fetch_tail(task_instance)): task_instance for task_instance in task_instances}
+    done, pending = await asyncio.wait(fetches, timeout=max(deadline - loop.time(), 0))
+    # Stragglers are abandoned so the summary is returned within the budget
+    for fetch in pending:
+        fetch.cancel()
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    timed_out = []
+    errors = []
+    for fetch, task_instance in fetches.items():
+        reference = {
+            "dag_id": task_instance["dag_id"],
+            "dag_run_id": task_instance["dag_run_id"],
+            "task_id": task_instance["task_id"],
+            "try_number": task_instance["try_number"],
+        }
+        if fetch in pending:
+            timed_out.append(reference)
+            continue
+        if fetch.exception() is not None:
+            errors.append({**reference, "error": str(fetch.exception())})
+            continue
+        tail = fetch.result()
+        signature = _error_signature(tail)
+        group = groups.setdefault(signature, {"signature": signature, "count": 0, "sample_tail": tail, "tries": []})
+        group["count"] += 1
+        group["tries"].append(reference)
+
+    result["groups"] = sorted(groups.values(), key=lambda group: group["count"], reverse=True)
+    if timed_out:
+        result["timed_out"] = timed_out
+    if errors:
+        result["errors"] = errors
+    return [types.TextContent(type="text", text=str(result))]
+
+
+async def _fetch_task_instances_batch(form: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+    """Page through a task instance batch listing; returns the task instances and whether all were fetched."""
+    task_instances: List[Dict[str, Any]] = []
+    page_form = form
+    for _ in range(TRIAGE_MAX_PAGES):
+        response = await asyncio.to_thread(
+            task_instance_api.get_task_instances_batch, list_task_instance_form=page_form
+        )
+        page = response.to_dict()
+        items = page.get("task_instances") or []
+        task_instances.extend(items)
+        total_entries = page.get("total_entries")
+        if not items or total_entries is None or len(task_instances) >= total_entries:
+            return task_instances, True
+        # The server cut the listing at its page size: continue with pages of that size
+        page_form = {**form, "page_offset": len(task_instances), "page_limit": len(items)}
+    return task_instances, False
+
+
+def _current_baselines() -> DurationBaselines:
+    # Callers using their own credentials get their own baselines, so nobody reads or feeds durations of task
+    # instances they may not see
+    authorization = caller_authorization.get()
+    if authorization is None:
+        return duration_baselines
+    return caller_baselines.get(authorization)
+
+
+def _try_key(task_instance: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(task_instance.get(key) for key in ("dag_id", "dag_run_id", "task_id", "map_index", "try_number"))
+
+
+def _tail_lines(content: str, count: int) -> List[str]:
+    # Some log handlers return the repr of a list of (host, log) tuples instead of plain text
+    if content.startswith("[("):
+        try:
+            content = "\n".join(log for _, log in ast.literal_eval(content))
+        except (ValueError, SyntaxError, TypeError):
+            pass
+    lines = [line for line in content.splitlines() if line.strip()]
+    return lines[-count:] if count > 0 else []
+
+
+def _error_signature(lines: List[str]) -> str:
+    error_line = next((line for line in reversed(lines) if ERROR_LINE_PATTERN.search(line)), None)
+    if error_line is None:
+        error_line = lines[-1] if lines else "<empty log>"
+    error_line = LOG_PREFIX_PATTERN.sub("", error_line.strip())
+    return VOLATILE_TOKEN_PATTERN.sub("<n>", error_line)
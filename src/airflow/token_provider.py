@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JwtTokenProvider:
+    """
+    Keeps the JWT sent to Airflow valid by fetching a new one from ``source`` before the current one expires.
+
+    The expiry is read from the token's ``exp`` claim (the signature is not verified, only Airflow can do that).
+    Once less than ``refresh_margin`` seconds are left, the next request fetches a new token; if that fails
+    the current token keeps being used until it actually expires. Tokens without a readable ``exp`` are only
+    replaced when Airflow rejects them.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        source: Optional[Callable[[], str]] = None,
+        refresh_margin: float = 60,
+    ):
+        self.source = source
+        self.refresh_margin = refresh_margin
+        self._token = token
+        self._expires_at = _expiry(token) if token else None
+        self._lock = threading.Lock()
+
+    @property
+    def refreshable(self) -> bool:
+        return self.source is not None
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        return self._expires_at
+
+    def authorization(self) -> str:
+        """Return the ``Authorization`` header value, refreshing the token first when it is about to expire."""
+        if self._needs_refresh():
+            with self._lock:
+                # Only the first of concurrent requests fetches the new token
+                if self._needs_refresh():
+                    self._refresh()
+        return f"Bearer {self._token}"
+
+    def invalidate(self, rejected_authorization: str) -> None:
+        """Drop the token Airflow rejected, so the next request fetches a new one."""
+        with self._lock:
+            if self.refreshable and rejected_authorization == f"Bearer {self._token}":
+                self._expires_at = 0
+
+    def _needs_refresh(self) -> bool:
+        if not self.refreshable:
+            return False
+        if self._token is None:
+            return True
+        return self._expires_at is not None and self._expires_at - time.time() <= self.refresh_margin
+
+    def _refresh(self) -> None:
+        try:
+            token = self.source()
+        except Exception as e:
+            if self._token is None or self._expires_at is None or self._expires_at <= time.time():
+                raise
+            logger.warning(f"Refreshing the Airflow JWT failed, using the current one until it expires: {e}")
+            return
+        # Assigned together under the lock; readers see either the old token or the new one
+        self._token, self._expires_at = token, _expiry(token)
+        logger.info("Refreshed the Airflow JWT")
+
+
+def _expiry(token: str) -> Optional[float]:
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+    return float(exp) if exp is not None else None
+
+
+def file_token_source(path: str) -> Callable[[], str]:
+    """Read the token from a file, e.g. one kept up to date by a sidecar or a projected volume."""
+
+    def read() -> str:
+        with open(path) as f:
+            return f.read().strip()
+
+    return read
+
+
+def endpoint_token_source(
+    url: str, username: Optional[str] = None, password: Optional[str] = None, timeout: float = 30
+) -> Callable[[], str]:
+    """Request the token from an endpoint answering ``{"access_token": ...}``, like Airflow's ``/auth/token``."""
+
+    def fetch() -> str:
+        credentials = {"username": username, "password": password} if username and password else {}
+        response = httpx.post(url, json=credentials, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    return fetch
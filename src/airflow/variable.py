@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
@@ -33,7 +34,7 @@ async def list_variables(
     if order_by is not None:
         kwargs["order_by"] = order_by
 
-    response = variable_api.get_variables(**kwargs)
+    response = await asyncio.to_thread(variable_api.get_variables, **kwargs)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -47,12 +48,12 @@ async def create_variable(
     if description is not None:
         variable_request["description"] = description
 
-    response = variable_api.post_variables(variable_request=variable_request)
+    response = await asyncio.to_thread(variable_api.post_variables, variable_request=variable_request)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def get_variable(key: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = variable_api.get_variable(variable_key=key)
+    response = await asyncio.to_thread(variable_api.get_variable, variable_key=key)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -65,12 +66,15 @@ async def update_variable(
     if description is not None:
         update_request["description"] = description
 
-    response = variable_api.patch_variable(
-        variable_key=key, update_mask=list(update_request.keys()), variable_request=update_request
+    response = await asyncio.to_thread(
+        variable_api.patch_variable,
+        variable_key=key,
+        update_mask=list(update_request.keys()),
+        variable_request=update_request,
     )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
 async def delete_variable(key: str) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
-    response = variable_api.delete_variable(variable_key=key)
+    response = await asyncio.to_thread(variable_api.delete_variable, variable_key=key)
     return [types.TextContent(type="text", text=str(response.to_dict()))]
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Callable, Dict, List, Optional, Union
 
 import mcp.types as types
@@ -36,7 +37,9 @@ async def get_xcom_entries(
     if offset is not None:
         kwargs["offset"] = offset
 
-    response = xcom_api.get_xcom_entries(dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, **kwargs)
+    response = await asyncio.to_thread(
+        xcom_api.get_xcom_entries, dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, **kwargs
+    )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
 
 
@@ -58,7 +61,7 @@ async def get_xcom_entry(
     if stringify is not None:
         kwargs["stringify"] = stringify
 
-    response = xcom_api.get_xcom_entry(
-        dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, xcom_key=xcom_key, **kwargs
+    response = await asyncio.to_thread(
+        xcom_api.get_xcom_entry, dag_id=dag_id, dag_run_id=dag_run_id, task_id=task_id, xcom_key=xcom_key, **kwargs
     )
     return [types.TextContent(type="text", text=str(response.to_dict()))]
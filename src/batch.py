@@ -0,0 +1,106 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+import mcp.types as types
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools import Tool
+from pydantic import BaseModel, Field
+
+from src.metrics import current_tool
+
+BATCH_TOOL_NAME = "batch"
+BATCH_TOOL_DESCRIPTION = "Call several tools concurrently in one request"
+
+
+class BatchCall(BaseModel):
+    """One tool call of a batch."""
+
+    tool: str = Field(description="Name of the tool to call.")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the tool call.")
+
+
+def make_batch_tool(tools: Dict[str, Tool], middleware: Sequence[Middleware] = ()) -> Callable[..., Any]:
+    """
+    Return the ``batch`` tool function, able to call the given tools.
+
+    ``tools`` are the tools registered with the server, so anything left out of it, like the tools excluded in
+    read-only mode, cannot be called through the batch either. Every call goes through ``middleware`` as if it had
+    been made on its own, so that it is measured and traced under the called tool's name.
+    """
+
+    async def batch(
+        calls: List[BatchCall],
+        max_concurrency: int = 8,
+        timeout: float = 60,
+    ) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+        """
+        Call several tools concurrently and return the result or error of each call, in the order given.
+
+        Calls still running when the timeout expires are cancelled and reported as timed out; the results of the
+        calls that finished are returned either way.
+
+        Args:
+            calls: The tool calls to make, each naming a tool and its arguments.
+            max_concurrency: The maximum number of calls running at the same time.
+            timeout: Seconds after which calls still running are cancelled.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(_call(tools, middleware, call, semaphore)) for call in calls]
+        try:
+            if tasks:
+                await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            # Also when the batch itself is cancelled, none of its calls may outlive it
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for call, task in zip(calls, tasks, strict=True):
+            if task.cancelled():
+                results.append({"tool": call.tool, "error": f"Timed out after {timeout} seconds"})
+            else:
+                results.append({"tool": call.tool, **task.result()})
+        failed = sum(1 for result in results if "error" in result)
+        response = {
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "duration_seconds": round(time.monotonic() - started, 3),
+        }
+        return [types.TextContent(type="text", text=str(response))]
+
+    return batch
+
+
+async def _call(
+    tools: Dict[str, Tool], middleware: Sequence[Middleware], call: BatchCall, semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    tool = tools.get(call.tool)
+    if tool is None:
+        return {"error": f"Unknown tool {call.tool!r}"}
+
+    async def run(context: MiddlewareContext) -> Any:
+        # Upstream requests of this call are accounted to the called tool rather than to the batch
+        current_tool.set(call.tool)
+        return await tool.run(call.arguments)
+
+    chain = run
+    for layer in reversed(middleware):
+        chain = partial(layer, call_next=chain)
+    context = MiddlewareContext(
+        message=types.CallToolRequestParams(name=call.tool, arguments=call.arguments),
+        source="client",
+        type="request",
+        method="tools/call",
+    )
+    async with semaphore:
+        try:
+            result = await chain(context)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+    return {"result": "\n".join(content.text for content in result.content if isinstance(content, types.TextContent))}
@@ -0,0 +1,41 @@
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Authorization header of the MCP request being served, forwarded to Airflow instead of the server's own
+# credentials. None means the server's credentials are used; an empty string means the caller sent none.
+caller_authorization: ContextVar[Optional[str]] = ContextVar("caller_authorization", default=None)
+
+
+class CallerCredentialsMiddleware(Middleware):
+    """Makes every MCP request talk to Airflow with the credentials its HTTP Authorization header carries."""
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        authorization = get_http_headers(include_all=True).get("authorization", "")
+        token = caller_authorization.set(authorization)
+        try:
+            return await call_next(context)
+        finally:
+            caller_authorization.reset(token)
+
+
+def call_with_authorization(authorization: Optional[str], func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call ``func`` with the given caller credentials.
+
+    Meant to run in a worker thread through ``asyncio.to_thread``, whose copied context keeps the change local.
+    """
+    caller_authorization.set(authorization)
+    return func(*args, **kwargs)
+
+
+def use_server_credentials() -> None:
+    """
+    Make the current task use the server's own credentials.
+
+    Background tasks inherit the context of the request that started them, and must not keep acting with
+    that caller's credentials after the request is done.
+    """
+    caller_authorization.set(None)
@@ -0,0 +1,140 @@
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the optional brotli package is installed
+    brotli = None
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+DEFAULT_MINIMUM_SIZE = 1024
+# Large bodies are compressed and sent in pieces of this size, so the client starts receiving before the end
+DEFAULT_CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP responses with br or gzip, whichever the client prefers and we support.
+
+    Unlike starlette's GZipMiddleware it also compresses streamed responses such as the SSE streams MCP uses:
+    the compressor is flushed after every message, so events still reach the client as soon as they are sent.
+    Large single-message bodies are split into chunks and streamed with chunked transfer encoding.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.chunk_size = chunk_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if scope["type"] == "http":
+            encoding = select_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, encoding, self.minimum_size, self.chunk_size)
+        await self.app(scope, receive, responder.send)
+
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the content coding to respond with from an Accept-Encoding header, or None to send identity."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [coding for coding in supported if accepted.get(coding, accepted.get("*", 0.0)) > 0]
+    if not candidates:
+        return None
+    # Prefer the client's highest quality; on ties keep our order, which puts br first
+    return max(candidates, key=lambda coding: accepted.get(coding, accepted.get("*", 0.0)))
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, chunk_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.chunk_size = chunk_size
+        self._start_message: Optional[Message] = None
+        self._compressor: Optional[_Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message tells us whether the response is worth compressing
+            self._start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start_message is not None:
+            start_message, self._start_message = self._start_message, None
+            headers = MutableHeaders(raw=start_message["headers"])
+            if "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+                self._passthrough = True
+            else:
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                self._compressor = _Compressor(self.encoding)
+            await self._send(start_message)
+
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        for offset in range(0, len(body), self.chunk_size):
+            compressed = self._compressor.compress(body[offset : offset + self.chunk_size])
+            if compressed:
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": True})
+        # Flushing after every streamed message keeps SSE events from sitting in the compressor's buffer
+        tail = self._compressor.flush() if more_body else self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": tail, "more_body": more_body})
@@ -14,6 +14,7 @@ class APIType(str, Enum):
     PLUGIN = "plugin"
     POOL = "pool"
     PROVIDER = "provider"
+    QUERY = "query"
     TASKINSTANCE = "taskinstance"
     VARIABLE = "variable"
     XCOM = "xcom"
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from urllib.parse import urlparse
 
 # Environment variables for Airflow connection
@@ -10,7 +11,56 @@ AIRFLOW_HOST = urlparse(_airflow_host_raw)._replace(path="").geturl().rstrip("/"
 AIRFLOW_USERNAME = os.getenv("AIRFLOW_USERNAME")
 AIRFLOW_PASSWORD = os.getenv("AIRFLOW_PASSWORD")
 AIRFLOW_JWT_TOKEN = os.getenv("AIRFLOW_JWT_TOKEN")
+# Where to get a new JWT before the current one expires: a file, or a token endpoint (posted the username and
+# password above, when set); refreshed AIRFLOW_JWT_REFRESH_MARGIN seconds ahead of the token's expiry
+AIRFLOW_JWT_TOKEN_FILE = os.getenv("AIRFLOW_JWT_TOKEN_FILE")
+AIRFLOW_JWT_TOKEN_URL = os.getenv("AIRFLOW_JWT_TOKEN_URL")
+AIRFLOW_JWT_REFRESH_MARGIN = float(os.getenv("AIRFLOW_JWT_REFRESH_MARGIN", "60"))
 AIRFLOW_API_VERSION = os.getenv("AIRFLOW_API_VERSION", "v1")
 
 # Environment variable for read-only mode
 READ_ONLY = os.getenv("READ_ONLY", "false").lower() in ("true", "1", "yes", "on")
+
+# Directory for state persisted across restarts (e.g. task duration baselines); in-memory only when unset
+AIRFLOW_MCP_STATE_DIR = os.getenv("AIRFLOW_MCP_STATE_DIR")
+
+# Response compression on the SSE and HTTP transports
+MCP_HTTP_COMPRESSION = os.getenv("MCP_HTTP_COMPRESSION", "false").lower() in ("true", "1", "yes", "on")
+MCP_HTTP_COMPRESSION_MIN_SIZE = int(os.getenv("MCP_HTTP_COMPRESSION_MIN_SIZE", "1024"))
+
+# Expose the batch tool, calling several of the other tools concurrently in one request
+MCP_BATCH_TOOL = os.getenv("MCP_BATCH_TOOL", "false").lower() in ("true", "1", "yes", "on")
+
+# Version, providers, plugins and config are served from memory; the version is checked for a deploy every
+# AIRFLOW_METADATA_VERSION_CHECK_INTERVAL seconds and everything is reloaded every AIRFLOW_METADATA_REFRESH_INTERVAL
+AIRFLOW_METADATA_REFRESH_INTERVAL = float(os.getenv("AIRFLOW_METADATA_REFRESH_INTERVAL", "3600"))
+AIRFLOW_METADATA_VERSION_CHECK_INTERVAL = float(os.getenv("AIRFLOW_METADATA_VERSION_CHECK_INTERVAL", "300"))
+
+# get_health is served from a background prober sampling every AIRFLOW_HEALTH_PROBE_INTERVAL seconds;
+# AIRFLOW_HEALTH_HISTORY_SIZE samples are kept for get_health_history (an hour at the default interval)
+AIRFLOW_HEALTH_PROBE_INTERVAL = float(os.getenv("AIRFLOW_HEALTH_PROBE_INTERVAL", "15"))
+AIRFLOW_HEALTH_HISTORY_SIZE = int(os.getenv("AIRFLOW_HEALTH_HISTORY_SIZE", "240"))
+
+# Forward the Authorization header of each MCP HTTP request to Airflow instead of using the credentials above
+_per_caller_credentials_raw = os.getenv("AIRFLOW_PER_CALLER_CREDENTIALS", "false")
+AIRFLOW_PER_CALLER_CREDENTIALS = _per_caller_credentials_raw.lower() in ("true", "1", "yes", "on")
+# With per-caller credentials, how many callers keep their own Airflow connection pool open at once
+AIRFLOW_CALLER_CLIENTS_LIMIT = int(os.getenv("AIRFLOW_CALLER_CLIENTS_LIMIT", "64"))
+
+# Record the traffic to Airflow to the AIRFLOW_CASSETTE file, or replay it from there without an Airflow
+# (AIRFLOW_CASSETTE_MODE is "record" or "replay"), waiting the recorded latencies times AIRFLOW_CASSETTE_LATENCY_SCALE
+AIRFLOW_CASSETTE = os.getenv("AIRFLOW_CASSETTE")
+AIRFLOW_CASSETTE_MODE = os.getenv("AIRFLOW_CASSETTE_MODE", "replay").lower()
+AIRFLOW_CASSETTE_LATENCY_SCALE = float(os.getenv("AIRFLOW_CASSETTE_LATENCY_SCALE", "1"))
+
+# Trace every tool call, appending its spans to this file in the OTLP/JSON format; tracing is off when unset
+MCP_TRACE_FILE = os.getenv("MCP_TRACE_FILE")
+
+# Expose the profile_server tool and profile on SIGUSR2; off by default. Profiles last MCP_PROFILE_SECONDS unless
+# the tool asks otherwise, and are written to MCP_PROFILE_DIR
+MCP_PROFILING = os.getenv("MCP_PROFILING", "false").lower() in ("true", "1", "yes", "on")
+MCP_PROFILE_SECONDS = float(os.getenv("MCP_PROFILE_SECONDS", "30"))
+MCP_PROFILE_DIR = os.getenv("MCP_PROFILE_DIR", tempfile.gettempdir())
+
+# Hard cap on the size of listings fetched page by page; items past it are left out and the response marked truncated
+MCP_MAX_RESPONSE_BYTES = int(os.getenv("MCP_MAX_RESPONSE_BYTES", str(10 * 1024 * 1024)))
@@ -0,0 +1,111 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Loaders of the tool call being served, so lookups are batched and cached for that call only
+_request_loaders: ContextVar[Optional[Dict[Hashable, "BatchLoader"]]] = ContextVar("request_loaders", default=None)
+
+
+class BatchLoader:
+    """
+    Collects the keys requested during one event-loop tick and resolves them with a single call of ``batch_fn``.
+
+    ``batch_fn`` is a blocking function taking a list of keys and returning a dict with a value for each key
+    it found; it runs in a worker thread. Keys missing from its result fail with ``KeyError``. Every key is
+    resolved once; later loads of the same key are answered from the loader's cache, failures included.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Dict[Any, Any]], max_batch_size: Optional[int] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._queue: List[Any] = []
+        self._dispatches: set = set()
+
+    async def load(self, key: Any) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                # Runs once the coroutines already scheduled in this tick had their chance to ask for keys
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        # One caller being cancelled must not cancel the load the others are waiting for
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Any]) -> List[Any]:
+        """Load several keys at once; failed keys are returned as their exception."""
+        return await asyncio.gather(*(self.load(key) for key in keys), return_exceptions=True)
+
+    def prime(self, key: Any, value: Any) -> None:
+        """Cache a value obtained some other way, e.g. as part of a listing."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        size = self.max_batch_size or len(keys)
+        for start in range(0, len(keys), size):
+            task = asyncio.ensure_future(self._resolve(keys[start : start + size]))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _resolve(self, keys: List[Any]) -> None:
+        self.batches += 1
+        try:
+            values = await asyncio.to_thread(self.batch_fn, keys)
+        except Exception as e:
+            for key in keys:
+                _settle(self._futures[key], exception=e)
+            return
+        for key in keys:
+            if key in values:
+                _settle(self._futures[key], result=values[key])
+            else:
+                _settle(self._futures[key], exception=KeyError(key))
+
+
+def _settle(future: asyncio.Future, result: Any = None, exception: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+        # Nobody may be waiting anymore; do not log the failure as never retrieved
+        future.exception()
+    else:
+        future.set_result(result)
+
+
+def request_loader(
+    key: Hashable, batch_fn: Callable[[List[Any]], Dict[Any, Any]], max_batch_size: Optional[int] = None
+) -> BatchLoader:
+    """
+    Return the loader registered under ``key`` for the tool call being served, creating it with ``batch_fn``.
+
+    Outside of a tool call every call returns a new loader, which batches but caches nothing beyond its own use.
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return BatchLoader(batch_fn, max_batch_size)
+    loader = loaders.get(key)
+    if loader is None:
+        loader = loaders[key] = BatchLoader(batch_fn, max_batch_size)
+    return loader
+
+
+class RequestLoadersMiddleware(Middleware):
+    """Gives every tool call its own set of loaders, dropped with their cache when the call returns."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        token = _request_loaders.set({})
+        try:
+            return await call_next(context)
+        finally:
+            _request_loaders.reset(token)
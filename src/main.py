@@ -1,42 +1,55 @@
+import importlib
 import logging
+from typing import Callable
 
 import click
-from fastmcp.tools import Tool
-
-from src.airflow.config import get_all_functions as get_config_functions
-from src.airflow.connection import get_all_functions as get_connection_functions
-from src.airflow.dag import get_all_functions as get_dag_functions
-from src.airflow.dagrun import get_all_functions as get_dagrun_functions
-from src.airflow.dagstats import get_all_functions as get_dagstats_functions
-from src.airflow.dataset import get_all_functions as get_dataset_functions
-from src.airflow.eventlog import get_all_functions as get_eventlog_functions
-from src.airflow.importerror import get_all_functions as get_importerror_functions
-from src.airflow.monitoring import get_all_functions as get_monitoring_functions
-from src.airflow.plugin import get_all_functions as get_plugin_functions
-from src.airflow.pool import get_all_functions as get_pool_functions
-from src.airflow.provider import get_all_functions as get_provider_functions
-from src.airflow.taskinstance import get_all_functions as get_taskinstance_functions
-from src.airflow.variable import get_all_functions as get_variable_functions
-from src.airflow.xcom import get_all_functions as get_xcom_functions
+
+from src.batch import BATCH_TOOL_DESCRIPTION, BATCH_TOOL_NAME, make_batch_tool
+from src.caller_credentials import CallerCredentialsMiddleware
 from src.enums import APIType
-from src.envs import READ_ONLY
+from src.envs import (
+    AIRFLOW_PER_CALLER_CREDENTIALS,
+    MCP_BATCH_TOOL,
+    MCP_HTTP_COMPRESSION,
+    MCP_HTTP_COMPRESSION_MIN_SIZE,
+    MCP_PROFILING,
+    READ_ONLY,
+)
+from src.loaders import RequestLoadersMiddleware
+from src.tool_schemas import cache_tool_list, tool_schema_cache
+
+
+def lazy_functions(module_name: str) -> Callable[[], list[tuple]]:
+    """
+    Return a ``get_all_functions`` that imports the API module on first call.
+
+    API modules import their Airflow client API classes, and those most of the model tree, so only the
+    modules of the selected APIs are imported.
+    """
+
+    def get_all_functions() -> list[tuple]:
+        return importlib.import_module(module_name).get_all_functions()
+
+    return get_all_functions
+
 
 APITYPE_TO_FUNCTIONS = {
-    APIType.CONFIG: get_config_functions,
-    APIType.CONNECTION: get_connection_functions,
-    APIType.DAG: get_dag_functions,
-    APIType.DAGRUN: get_dagrun_functions,
-    APIType.DAGSTATS: get_dagstats_functions,
-    APIType.DATASET: get_dataset_functions,
-    APIType.EVENTLOG: get_eventlog_functions,
-    APIType.IMPORTERROR: get_importerror_functions,
-    APIType.MONITORING: get_monitoring_functions,
-    APIType.PLUGIN: get_plugin_functions,
-    APIType.POOL: get_pool_functions,
-    APIType.PROVIDER: get_provider_functions,
-    APIType.TASKINSTANCE: get_taskinstance_functions,
-    APIType.VARIABLE: get_variable_functions,
-    APIType.XCOM: get_xcom_functions,
+    APIType.CONFIG: lazy_functions("src.airflow.config"),
+    APIType.CONNECTION: lazy_functions("src.airflow.connection"),
+    APIType.DAG: lazy_functions("src.airflow.dag"),
+    APIType.DAGRUN: lazy_functions("src.airflow.dagrun"),
+    APIType.DAGSTATS: lazy_functions("src.airflow.dagstats"),
+    APIType.DATASET: lazy_functions("src.airflow.dataset"),
+    APIType.EVENTLOG: lazy_functions("src.airflow.eventlog"),
+    APIType.IMPORTERROR: lazy_functions("src.airflow.importerror"),
+    APIType.MONITORING: lazy_functions("src.airflow.monitoring"),
+    APIType.PLUGIN: lazy_functions("src.airflow.plugin"),
+    APIType.POOL: lazy_functions("src.airflow.pool"),
+    APIType.PROVIDER: lazy_functions("src.airflow.provider"),
+    APIType.QUERY: lazy_functions("src.airflow.query"),
+    APIType.TASKINSTANCE: lazy_functions("src.airflow.taskinstance"),
+    APIType.VARIABLE: lazy_functions("src.airflow.variable"),
+    APIType.XCOM: lazy_functions("src.airflow.xcom"),
 }
 
 
@@ -77,9 +90,49 @@ def filter_functions_for_read_only(functions: list[tuple]) -> list[tuple]:
     default=READ_ONLY,
     help="Only expose read-only tools (GET operations, no CREATE/UPDATE/DELETE)",
 )
-def main(transport: str, mcp_host: str, mcp_port: int, apis: list[str], read_only: bool) -> None:
-    from src.server import app
-
+@click.option(
+    "--http-compression/--no-http-compression",
+    default=MCP_HTTP_COMPRESSION,
+    help="Compress responses with br or gzip in case of SSE or HTTP transports.",
+)
+@click.option(
+    "--http-compression-min-size",
+    default=MCP_HTTP_COMPRESSION_MIN_SIZE,
+    help="Responses smaller than this many bytes are sent uncompressed.",
+)
+@click.option(
+    "--per-caller-credentials",
+    is_flag=True,
+    default=AIRFLOW_PER_CALLER_CREDENTIALS,
+    help="Call Airflow with the Authorization header of each MCP request instead of the server's credentials "
+    "(SSE and HTTP transports only).",
+)
+@click.option(
+    "--batch-tool/--no-batch-tool",
+    default=MCP_BATCH_TOOL,
+    help="Expose a batch tool calling several of the other tools concurrently in one request.",
+)
+@click.option(
+    "--profiling",
+    is_flag=True,
+    default=MCP_PROFILING,
+    help="Expose the profile_server tool and profile the server when it receives SIGUSR2, for operators.",
+)
+def main(
+    transport: str,
+    mcp_host: str,
+    mcp_port: int,
+    apis: list[str],
+    read_only: bool,
+    http_compression: bool,
+    http_compression_min_size: int,
+    per_caller_credentials: bool,
+    batch_tool: bool,
+    profiling: bool,
+) -> None:
+    from src.server import app, http_middleware
+
+    registered_tools = {}
     for api in apis:
         logging.debug(f"Adding API: {api}")
         get_function = APITYPE_TO_FUNCTIONS[APIType(api)]
@@ -93,7 +146,34 @@ def main(transport: str, mcp_host: str, mcp_port: int, apis: list[str], read_onl
             functions = filter_functions_for_read_only(functions)
 
         for func, name, description, *_ in functions:
-            app.add_tool(Tool.from_function(func, name=name, description=description))
+            tool = tool_schema_cache.tool(func, name, description)
+            app.add_tool(tool)
+            registered_tools[name] = tool
+
+        if api == APIType.DAGRUN.value:
+            from src.subscriptions import register_dag_run_subscriptions
+
+            # The subscription poller cannot act with the callers' credentials
+            register_dag_run_subscriptions(
+                app, subscribable=not (per_caller_credentials and transport in {"sse", "http"})
+            )
+
+    # The batch tool can only call the tools registered above, so read-only mode applies to it as well
+    if batch_tool and registered_tools:
+        # Batched calls are measured and traced as calls of their own, but share the loaders of the batch
+        middleware = [layer for layer in app.middleware if not isinstance(layer, RequestLoadersMiddleware)]
+        batch = make_batch_tool(registered_tools, middleware)
+        app.add_tool(tool_schema_cache.tool(batch, BATCH_TOOL_NAME, BATCH_TOOL_DESCRIPTION))
+
+    # Profiling is only wired in on request, so a server without it pays nothing for it
+    if profiling:
+        from src.profiling import PROFILE_TOOL_DESCRIPTION, PROFILE_TOOL_NAME, install_signal_handler, profile_server
+
+        app.add_tool(tool_schema_cache.tool(profile_server, PROFILE_TOOL_NAME, PROFILE_TOOL_DESCRIPTION))
+        install_signal_handler()
+
+    tool_schema_cache.save()
+    cache_tool_list(app)
 
     logging.debug(f"Starting MCP server for Apache Airflow with {transport} transport")
     params_to_run = {}
@@ -103,5 +183,12 @@ def main(transport: str, mcp_host: str, mcp_port: int, apis: list[str], read_onl
             logging.warning("NOTE: the SSE transport is going to be deprecated.")
 
         params_to_run = {"port": int(mcp_port), "host": mcp_host}
+        if per_caller_credentials:
+            app.add_middleware(CallerCredentialsMiddleware())
+        middleware = http_middleware(compression=http_compression, compression_min_size=http_compression_min_size)
+        if middleware:
+            params_to_run["middleware"] = middleware
+    elif per_caller_credentials:
+        logging.warning("--per-caller-credentials has no effect with the stdio transport.")
 
     app.run(transport=transport, **params_to_run)
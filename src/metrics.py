@@ -0,0 +1,251 @@
+import bisect
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+import mcp.types as types
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Upstream calls made outside of any tool call (e.g. background pollers) are accounted under this name
+NO_TOOL = "<none>"
+
+# Name of the tool whose call is being served; asyncio.to_thread copies it into worker threads
+current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+# Upper bounds of the tool latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Amounts accumulated over each tool call, besides its latency
+CALL_AMOUNTS = (
+    "upstream_requests",
+    "upstream_seconds",
+    "received_bytes",
+    "deserialization_seconds",
+    "serialization_seconds",
+)
+
+
+class CallStats:
+    """Upstream requests, bytes and time accumulated by one tool call, from every thread working on it."""
+
+    __slots__ = ("amounts", "_lock")
+
+    def __init__(self):
+        self.amounts = dict.fromkeys(CALL_AMOUNTS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **amounts: float) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                self.amounts[name] += amount
+
+
+# Stats of the tool call being served; like current_tool, asyncio.to_thread carries it into worker threads
+current_call: ContextVar[Optional[CallStats]] = ContextVar("current_call", default=None)
+
+
+def timed(phase: str) -> Callable[[Callable], Callable]:
+    """Decorate a function to add the time spent in it to ``<phase>_seconds`` of the current tool call, if any."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            call = current_call.get()
+            if call is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                call.add(**{f"{phase}_seconds": time.perf_counter() - started})
+
+        return wrapper
+
+    return decorator
+
+
+class TransferMetrics:
+    """Per-tool counters of upstream response bytes, as sent on the wire and after decompression."""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, wire_bytes: int, decoded_bytes: int, tool: Optional[str] = None) -> None:
+        tool = tool or current_tool.get() or NO_TOOL
+        call = current_call.get()
+        if call is not None:
+            call.add(received_bytes=wire_bytes)
+        with self._lock:
+            counters = self._counters.setdefault(tool, {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0})
+            counters["requests"] += 1
+            counters["wire_bytes"] += wire_bytes
+            counters["decoded_bytes"] += decoded_bytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters per tool plus totals, with the compression ratio achieved for each."""
+        with self._lock:
+            tools = {tool: dict(counters) for tool, counters in self._counters.items()}
+        total = {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+        for counters in tools.values():
+            for key in total:
+                total[key] += counters[key]
+        for counters in [*tools.values(), total]:
+            counters["compression_ratio"] = (
+                round(counters["decoded_bytes"] / counters["wire_bytes"], 2) if counters["wire_bytes"] else None
+            )
+        return {"tools": tools, "total": total}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class CurrentToolMiddleware(Middleware):
+    """Makes the name of the tool being called available to upstream accounting through ``current_tool``."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        token = current_tool.set(context.message.name)
+        try:
+            return await call_next(context)
+        finally:
+            current_tool.reset(token)
+
+
+class ToolMetrics:
+    """
+    Per-tool call counts, errors, latency histogram and the upstream work and bytes of the calls.
+
+    Latencies are counted in the fixed ``LATENCY_BUCKETS``, so recording a call is a bisect and a few additions
+    under a lock, and the counters are exported as they are in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Dict[str, Any]] = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def record(
+        self, tool: str, seconds: float, error: bool, sent_bytes: int, amounts: Optional[Dict[str, float]] = None
+    ) -> None:
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            counters = self._tools.get(tool)
+            if counters is None:
+                counters = self._tools[tool] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    # One more bucket than bounds, for calls slower than the last one
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                    "sent_bytes": 0,
+                    **dict.fromkeys(CALL_AMOUNTS, 0),
+                }
+            counters["calls"] += 1
+            counters["errors"] += error
+            counters["seconds"] += seconds
+            counters["buckets"][bucket] += 1
+            counters["sent_bytes"] += sent_bytes
+            for name, amount in (amounts or {}).items():
+                counters[name] += amount
+
+    def calls(self) -> int:
+        """Tool calls completed so far, of every tool."""
+        with self._lock:
+            return sum(counters["calls"] for counters in self._tools.values())
+
+    def _copy(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {tool: {**counters, "buckets": list(counters["buckets"])} for tool, counters in self._tools.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters per tool, with latency percentiles estimated from the histogram."""
+        tools = {}
+        for tool, counters in sorted(self._copy().items()):
+            buckets = counters.pop("buckets")
+            seconds = counters.pop("seconds")
+            tools[tool] = {
+                "calls": counters.pop("calls"),
+                "errors": counters.pop("errors"),
+                "mean_ms": round(seconds / sum(buckets) * 1000, 2),
+                **{f"p{q}_ms": _quantile_ms(buckets, q / 100) for q in (50, 90, 99)},
+                **{name: round(value, 4) if isinstance(value, float) else value for name, value in counters.items()},
+            }
+        return {"uptime_seconds": round(time.time() - self._started, 1), "tools": tools}
+
+    def prometheus(self) -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        tools = sorted(self._copy().items())
+        lines = [
+            "# HELP mcp_tool_calls_total Tool calls served.",
+            "# TYPE mcp_tool_calls_total counter",
+            *(f'mcp_tool_calls_total{{tool="{tool}"}} {counters["calls"]}' for tool, counters in tools),
+            "# HELP mcp_tool_errors_total Tool calls that failed.",
+            "# TYPE mcp_tool_errors_total counter",
+            *(f'mcp_tool_errors_total{{tool="{tool}"}} {counters["errors"]}' for tool, counters in tools),
+            "# HELP mcp_tool_duration_seconds Time to serve a tool call.",
+            "# TYPE mcp_tool_duration_seconds histogram",
+        ]
+        for tool, counters in tools:
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), counters["buckets"], strict=True):
+                cumulative += count
+                lines.append(f'mcp_tool_duration_seconds_bucket{{tool="{tool}",le="{bound}"}} {cumulative}')
+            lines.append(f'mcp_tool_duration_seconds_sum{{tool="{tool}"}} {counters["seconds"]}')
+            lines.append(f'mcp_tool_duration_seconds_count{{tool="{tool}"}} {counters["calls"]}')
+        for name, help_text in (
+            ("upstream_requests", "Requests made to the Airflow API."),
+            ("upstream_seconds", "Time spent waiting on the Airflow API."),
+            ("received_bytes", "Bytes of Airflow API responses, as sent on the wire."),
+            ("sent_bytes", "Characters of tool results sent to the client."),
+            ("deserialization_seconds", "Time spent turning Airflow API responses into models."),
+            ("serialization_seconds", "Time spent turning models into dicts."),
+        ):
+            metric = f"mcp_tool_{name}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{tool="{tool}"}} {counters[name]}' for tool, counters in tools)
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+
+
+def _quantile_ms(buckets: List[int], fraction: float) -> Optional[float]:
+    """Estimate a quantile from histogram bucket counts, interpolating linearly within the bucket like Prometheus."""
+    rank = fraction * sum(buckets)
+    cumulative = 0
+    for i, count in enumerate(buckets):
+        if count and cumulative + count >= rank:
+            if i == len(LATENCY_BUCKETS):
+                # Slower than the last bound, which is then the best estimate there is
+                return LATENCY_BUCKETS[-1] * 1000
+            lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+            return round((lower + (LATENCY_BUCKETS[i] - lower) * (rank - cumulative) / count) * 1000, 2)
+        cumulative += count
+    return None
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Records the latency, outcome and result size of every tool call, with the upstream work it caused."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        call = CallStats()
+        token = current_call.set(call)
+        started = time.perf_counter()
+        error, sent_bytes = True, 0
+        try:
+            result = await call_next(context)
+            error = bool(getattr(result, "is_error", False))
+            # str(dict) results are ASCII but for non-ASCII values, so characters stand in for bytes
+            sent_bytes = sum(len(content.text) for content in result.content if isinstance(content, types.TextContent))
+            return result
+        finally:
+            current_call.reset(token)
+            tool_metrics.record(context.message.name, time.perf_counter() - started, error, sent_bytes, call.amounts)
+
+
+transfer_metrics = TransferMetrics()
+tool_metrics = ToolMetrics()
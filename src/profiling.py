@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import mcp.types as types
+
+from src.envs import MCP_PROFILE_DIR, MCP_PROFILE_SECONDS
+from src.metrics import tool_metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOOL_NAME = "profile_server"
+PROFILE_TOOL_DESCRIPTION = "Sample the server's threads for a while and report where they spend their time"
+DEFAULT_INTERVAL_SECONDS = 0.005
+MAX_PROFILE_SECONDS = 600
+# Functions a thread waits in for more work to do; samples of idle threads ending in them are not counted
+IDLE_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+# Samples with one of these functions on the stack are accounted to the category, as (file, function)
+CATEGORIES = {
+    "deserialization": ("api_client.py", "deserialize"),
+    "serialization": ("model_utils.py", "model_to_dict"),
+}
+
+Frame = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread of the process at a fixed interval, from a thread of its own.
+
+    Nothing is hooked into the interpreter: the sampler reads ``sys._current_frames()``, so the profiled code runs
+    unchanged and nothing at all happens while no profile is being taken. Samples of threads idling in a wait for
+    work are dropped, so the event loop waiting on its selector and worker threads waiting for tasks do not drown
+    out the time spent working, while threads blocked on Airflow responses are kept.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.monotonic() - (self.started_at or time.monotonic())
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _stack(frame)
+                if stack and (os.path.basename(stack[-1][0]), stack[-1][1]) not in IDLE_FUNCTIONS:
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed-stack format of flame graph tools, one ``frame;frame;... count`` per line."""
+        return "".join(
+            f"{';'.join(_frame_name(frame) for frame in stack)} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """Functions with the most samples on the CPU of their own (self) and anywhere on the stack (total)."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        categories: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[_function_name(stack[-1])] += count
+            for function in {_function_name(frame) for frame in stack}:
+                total[function] += count
+            files = {(os.path.basename(filename), function) for filename, function, _ in stack}
+            for category, frame in CATEGORIES.items():
+                if frame in files:
+                    categories[category] += count
+        busy = sum(self.stacks.values())
+
+        def share(count: int) -> float:
+            return round(100 * count / busy, 1) if busy else 0.0
+
+        return {
+            "duration_seconds": round(self.duration, 2),
+            "sampling_rounds": self.samples,
+            "busy_thread_samples": busy,
+            "categories_percent": {category: share(categories[category]) for category in CATEGORIES},
+            "top_self": [{"function": name, "percent": share(count)} for name, count in own.most_common(top)],
+            "top_total": [{"function": name, "percent": share(count)} for name, count in total.most_common(top)],
+        }
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    stack: List[Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    # Outermost frame first, as in flame graphs
+    return tuple(reversed(stack))
+
+
+def _function_name(frame: Frame) -> str:
+    filename, function, line = frame
+    return f"{function} ({_short_path(filename)}:{line})"
+
+
+def _frame_name(frame: Frame) -> str:
+    filename, function, _ = frame
+    # Semicolons separate frames in the collapsed format
+    return f"{function} ({_short_path(filename)})".replace(";", ",")
+
+
+def _short_path(filename: str) -> str:
+    # Keep the path from the package on, e.g. airflow_client/client/model_utils.py or src/airflow/dag.py
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            return "/".join(parts[parts.index(marker) + 1 :])
+    return "/".join(parts[-3:])
+
+
+def write_profile(profiler: SamplingProfiler, directory: str = MCP_PROFILE_DIR) -> str:
+    """Write the collapsed stacks of a finished profile and return the file's path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"profile-{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}.collapsed")
+    with open(path, "w") as f:
+        f.write(profiler.collapsed())
+    return path
+
+
+# A single profile at a time: two samplers would only slow each other down
+_profile_lock = threading.Lock()
+
+
+async def profile_server(
+    seconds: float = MCP_PROFILE_SECONDS,
+    tool_calls: Optional[int] = None,
+    top: int = 20,
+) -> List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]:
+    """
+    Profile the server by sampling the stacks of all its threads, then report the functions it spent the most time
+    in, and the share of time spent deserializing Airflow responses and serializing models. The samples are written
+    in the collapsed-stack format, ready for flame graph tools, to the file named in the result.
+
+    Args:
+        seconds: How long to profile. With tool_calls, the longest to wait for them.
+        tool_calls: Stop once this many other tool calls completed.
+        top: How many functions to list.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return [types.TextContent(type="text", text=str({"error": "A profile is already being taken"}))]
+    try:
+        seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+        profiler = SamplingProfiler()
+        calls_before = tool_metrics.calls()
+        profiler.start()
+        try:
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if tool_calls is not None and tool_metrics.calls() - calls_before >= tool_calls:
+                    break
+                await asyncio.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+        finally:
+            profiler.stop()
+        report = profiler.report(top)
+        report["tool_calls"] = tool_metrics.calls() - calls_before
+        report["file"] = await asyncio.to_thread(write_profile, profiler)
+    finally:
+        _profile_lock.release()
+    return [types.TextContent(type="text", text=str(report))]
+
+
+def install_signal_handler(signum: int = getattr(signal, "SIGUSR2", 0), seconds: float = MCP_PROFILE_SECONDS) -> bool:
+    """
+    Profile the server for ``seconds`` whenever it receives ``signum`` (SIGUSR2 by default), logging the top
+    functions and the file written. Returns whether the handler could be installed, which needs a POSIX platform.
+    """
+    if not signum:
+        return False
+
+    def profile_in_background() -> None:
+        if not _profile_lock.acquire(blocking=False):
+            logger.warning("Ignoring the profiling signal, a profile is already being taken")
+            return
+        try:
+            profiler = SamplingProfiler()
+            profiler.start()
+            # Waiting on an event rather than sleeping keeps this thread out of its own samples
+            threading.Event().wait(seconds)
+            profiler.stop()
+            report = profiler.report(top=10)
+            logger.warning(f"Profile written to {write_profile(profiler)}: {report}")
+        finally:
+            _profile_lock.release()
+
+    def handle(received_signum, frame) -> None:
+        # Signal handlers run on the main thread between bytecodes; do the profiling elsewhere
+        threading.Thread(target=profile_in_background, name="profile-signal", daemon=True).start()
+
+    signal.signal(signum, handle)
+    return True
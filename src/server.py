@@ -1,3 +1,37 @@
 from fastmcp import FastMCP
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-app = FastMCP("mcp-apache-airflow")
+from src.compression import DEFAULT_MINIMUM_SIZE, CompressionMiddleware
+from src.loaders import RequestLoadersMiddleware
+from src.metrics import CurrentToolMiddleware, ToolMetricsMiddleware, tool_metrics
+from src.tracing import TracingMiddleware, exporter
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+app = FastMCP(
+    "mcp-apache-airflow",
+    middleware=[
+        # Only with a trace file, so that untraced servers do not pay for it
+        *([TracingMiddleware()] if exporter is not None else []),
+        ToolMetricsMiddleware(),
+        CurrentToolMiddleware(),
+        RequestLoadersMiddleware(),
+    ],
+)
+
+
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Per-tool metrics for Prometheus to scrape, on the SSE and HTTP transports."""
+    return PlainTextResponse(tool_metrics.prometheus(), media_type=METRICS_CONTENT_TYPE)
+
+
+def http_middleware(compression: bool = False, compression_min_size: int = DEFAULT_MINIMUM_SIZE) -> list[Middleware]:
+    """Return the ASGI middleware to run the app with on the SSE and HTTP transports."""
+    middleware = []
+    if compression:
+        middleware.append(Middleware(CompressionMiddleware, minimum_size=compression_min_size))
+    return middleware
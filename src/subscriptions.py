@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from fastmcp import FastMCP
+from fastmcp.resources import ResourceTemplate
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+
+from src.airflow.dagrun import dag_run_api, get_dag_run_url
+from src.caller_credentials import use_server_credentials
+
+DAG_RUN_URI_PREFIX = "airflow://dags/"
+DAG_RUN_URI_TEMPLATE = DAG_RUN_URI_PREFIX + "{dag_id}/dagRuns/{dag_run_id}"
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+POLL_PAGE_LIMIT = 100
+POLL_MAX_PAGES = 10
+# Listings are ordered by primary key: runs updated while a listing is paged through keep their place in it
+POLL_ORDER_BY = "id"
+# Each polling window reaches back a little so updates committed while the previous poll was in flight are not missed
+POLL_WINDOW_OVERLAP = timedelta(seconds=2)
+# Fields whose change is reported to subscribers
+FINGERPRINT_FIELDS = ("state", "start_date", "end_date", "note")
+
+logger = logging.getLogger(__name__)
+
+
+def register_dag_run_subscriptions(
+    app: FastMCP, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS, subscribable: bool = True
+) -> None:
+    """
+    Expose DAG runs as subscribable resources on the app.
+
+    Subscriptions are served by a poller acting with the server's credentials outside of any request, so servers
+    calling Airflow with their callers' credentials expose DAG runs for reading only, with ``subscribable=False``.
+    """
+    app.add_template(
+        ResourceTemplate.from_function(
+            read_dag_run,
+            uri_template=DAG_RUN_URI_TEMPLATE,
+            name="dag_run",
+            description="A DAG run. Subscribe to get notified when its state changes."
+            if subscribable
+            else "A DAG run.",
+        )
+    )
+    if not subscribable:
+        return
+
+    subscriptions = DagRunSubscriptions(poll_interval)
+    server = app._mcp_server
+
+    @server.subscribe_resource()
+    async def subscribe(uri: AnyUrl) -> None:
+        await subscriptions.subscribe(str(uri), server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe(uri: AnyUrl) -> None:
+        subscriptions.unsubscribe(str(uri), server.request_context.session)
+
+    # The low-level server always advertises subscribe=False, even with a subscribe handler in place
+    get_capabilities = server.get_capabilities
+
+    def get_capabilities_with_subscribe(*args: Any, **kwargs: Any):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+    server.get_capabilities = get_capabilities_with_subscribe
+
+
+async def read_dag_run(dag_id: str, dag_run_id: str) -> str:
+    response = await asyncio.to_thread(dag_run_api.get_dag_run, dag_id=dag_id, dag_run_id=dag_run_id)
+    response_dict = response.to_dict()
+    response_dict["ui_url"] = get_dag_run_url(dag_id, dag_run_id)
+    return str(response_dict)
+
+
+class DagRunSubscriptions:
+    """
+    Tracks which sessions watch which DAG runs and serves all of them from a single poller.
+
+    Each poll is one listing of the DAG runs updated since the previous poll, so upstream load
+    depends on how many distinct runs are watched, not on how many sessions watch them. A listing
+    longer than ``POLL_MAX_PAGES`` pages is continued by the next poll, and the polling window only
+    moves forward once a listing was read to the end.
+    """
+
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._subscribers: Dict[str, Set[ServerSession]] = {}
+        self._fingerprints: Dict[str, Tuple[Any, ...]] = {}
+        self._window_start: Optional[datetime] = None
+        self._listing_dag_id: Optional[str] = None
+        self._listing_started_at: Optional[datetime] = None
+        self._listing_offset = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    async def subscribe(self, uri: str, session: ServerSession) -> None:
+        dag_id, dag_run_id = _parse_dag_run_uri(uri)
+        if uri not in self._subscribers:
+            # Establish the baseline once per run, however many sessions end up watching it
+            response = await asyncio.to_thread(dag_run_api.get_dag_run, dag_id=dag_id, dag_run_id=dag_run_id)
+            self._fingerprints[uri] = _fingerprint(response.to_dict())
+        self._subscribers.setdefault(uri, set()).add(session)
+        if self._poller is None or self._poller.done():
+            self._window_start = datetime.now(timezone.utc)
+            self._listing_offset = 0
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            del self._subscribers[uri]
+            self._fingerprints.pop(uri, None)
+        if not self._subscribers and self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    async def poll_once(self) -> Set[str]:
+        """Fetch DAG runs updated since the previous poll and notify subscribers of changed ones."""
+        if not self._subscribers:
+            return set()
+        dag_ids = {_parse_dag_run_uri(uri)[0] for uri in self._subscribers}
+        # A single watched DAG can be listed directly, otherwise one wildcard listing covers all of them
+        dag_id = next(iter(dag_ids)) if len(dag_ids) == 1 else "~"
+        if dag_id != self._listing_dag_id:
+            # A listing is only continued where it left off if it lists the same runs
+            self._listing_dag_id = dag_id
+            self._listing_offset = 0
+        if self._listing_offset == 0:
+            self._listing_started_at = datetime.now(timezone.utc)
+        updated_at_gte = (self._window_start - POLL_WINDOW_OVERLAP).isoformat()
+
+        changed = set()
+        is_complete = False
+        for _ in range(POLL_MAX_PAGES):
+            response = await asyncio.to_thread(
+                dag_run_api.get_dag_runs,
+                dag_id=dag_id,
+                updated_at_gte=updated_at_gte,
+                order_by=POLL_ORDER_BY,
+                limit=POLL_PAGE_LIMIT,
+                offset=self._listing_offset,
+            )
+            dag_runs = response.to_dict().get("dag_runs", [])
+            for dag_run in dag_runs:
+                uri = _dag_run_uri(dag_run["dag_id"], dag_run["dag_run_id"])
+                if uri not in self._subscribers:
+                    continue
+                fingerprint = _fingerprint(dag_run)
+                if self._fingerprints.get(uri) != fingerprint:
+                    self._fingerprints[uri] = fingerprint
+                    changed.add(uri)
+            self._listing_offset += len(dag_runs)
+            if len(dag_runs) < POLL_PAGE_LIMIT:
+                is_complete = True
+                break
+        if is_complete:
+            # Runs updated while the listing was paged through are in the next window
+            self._window_start = self._listing_started_at
+            self._listing_offset = 0
+
+        for uri in changed:
+            await self._notify(uri)
+        return changed
+
+    async def _notify(self, uri: str) -> None:
+        for session in list(self._subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(AnyUrl(uri))
+            except Exception as e:
+                logger.debug(f"Dropping subscriber of {uri} that can no longer be notified: {e}")
+                self.unsubscribe(uri, session)
+
+    async def _poll_loop(self) -> None:
+        use_server_credentials()
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.warning(f"Polling DAG runs for subscribers failed: {e}")
+
+
+def _dag_run_uri(dag_id: str, dag_run_id: str) -> str:
+    # Normalized the same way as the URIs clients subscribe with
+    return str(AnyUrl(DAG_RUN_URI_TEMPLATE.format(dag_id=dag_id, dag_run_id=dag_run_id)))
+
+
+def _parse_dag_run_uri(uri: str) -> Tuple[str, str]:
+    dag_id, separator, dag_run_id = uri.removeprefix(DAG_RUN_URI_PREFIX).partition("/dagRuns/")
+    if not uri.startswith(DAG_RUN_URI_PREFIX) or not separator or not dag_id or not dag_run_id:
+        raise ValueError(f"Not a DAG run resource: {uri}")
+    return unquote(dag_id), unquote(dag_run_id)
+
+
+def _fingerprint(dag_run: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(str(dag_run.get(field)) for field in FINGERPRINT_FIELDS)
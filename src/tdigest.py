@@ -0,0 +1,144 @@
+import math
+from typing import Any, Dict, List, Optional
+
+# Compression (delta) bounds the number of centroids kept per digest; 100 keeps tail error well under 1%
+DEFAULT_COMPRESSION = 100
+# Unmerged points are buffered and folded into the centroids in batches of this many per unit of compression
+BUFFER_FACTOR = 5
+
+
+class TDigest:
+    """
+    Mergeable t-digest for streaming quantile estimation.
+
+    Values are buffered and periodically compressed into weighted centroids using the k1 scale function,
+    so memory stays bounded by the compression factor regardless of how many values have been added,
+    and two digests built on different streams can be merged without losing accuracy at the tails.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.count = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._centroids: List[List[float]] = []
+        self._buffer: List[List[float]] = []
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Add a single observation to the digest."""
+        if math.isnan(value) or weight <= 0:
+            return
+        self._buffer.append([value, weight])
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= self.compression * BUFFER_FACTOR:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """Fold another digest into this one."""
+        if other.count == 0:
+            return
+        other._compress()
+        self._buffer.extend([mean, weight] for mean, weight in other._centroids)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile ``q`` (0..1), or None if the digest is empty."""
+        self._compress()
+        if not self._centroids:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        target = q * self.count
+        points = self._interpolation_points()
+        for (left_rank, left_value), (right_rank, right_value) in zip(points, points[1:], strict=False):
+            if target <= right_rank:
+                if right_rank == left_rank:
+                    return right_value
+                fraction = (target - left_rank) / (right_rank - left_rank)
+                return left_value + fraction * (right_value - left_value)
+        return self.max
+
+    def cdf(self, value: float) -> Optional[float]:
+        """Estimate the fraction of observations less than or equal to ``value``."""
+        self._compress()
+        if not self._centroids:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+
+        points = self._interpolation_points()
+        for (left_rank, left_value), (right_rank, right_value) in zip(points, points[1:], strict=False):
+            if value <= right_value:
+                if right_value == left_value:
+                    return right_rank / self.count
+                fraction = (value - left_value) / (right_value - left_value)
+                return (left_rank + fraction * (right_rank - left_rank)) / self.count
+        return 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the digest into a JSON-compatible dictionary."""
+        self._compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "centroids": self._centroids,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        """Rebuild a digest previously serialized with ``to_dict``."""
+        digest = cls(compression=data.get("compression", DEFAULT_COMPRESSION))
+        digest.count = data.get("count", 0.0)
+        digest.min = data.get("min")
+        digest.max = data.get("max")
+        digest._centroids = [[mean, weight] for mean, weight in data.get("centroids", [])]
+        return digest
+
+    def _interpolation_points(self) -> List[List[float]]:
+        # Each centroid sits at the midpoint of the rank range it covers; min and max pin both ends
+        points = [[0.0, self.min]]
+        cumulative = 0.0
+        for mean, weight in self._centroids:
+            points.append([cumulative + weight / 2, mean])
+            cumulative += weight
+        points.append([self.count, self.max])
+        return points
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        items = sorted(self._centroids + self._buffer, key=lambda centroid: centroid[0])
+        self._buffer = []
+
+        merged: List[List[float]] = [list(items[0])]
+        weight_so_far = 0.0
+        k_lower = self._scale(0.0)
+        for mean, weight in items[1:]:
+            current = merged[-1]
+            k_upper = self._scale((weight_so_far + current[1] + weight) / self.count)
+            if k_upper - k_lower <= 1:
+                combined = current[1] + weight
+                current[0] += (mean - current[0]) * weight / combined
+                current[1] = combined
+            else:
+                weight_so_far += current[1]
+                k_lower = self._scale(weight_so_far / self.count)
+                merged.append([mean, weight])
+        self._centroids = merged
+
+    def _scale(self, q: float) -> float:
+        # k1 scale function: centroids are allowed to grow large around the median and stay small at the tails
+        q = min(max(q, 0.0), 1.0)
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
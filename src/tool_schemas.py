@@ -0,0 +1,172 @@
+import enum
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import typing
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import mcp.types as types
+from fastmcp import FastMCP
+from fastmcp.tools import Tool
+from fastmcp.tools.tool import FunctionTool
+from pydantic import BaseModel
+
+from src.envs import AIRFLOW_MCP_STATE_DIR
+
+TOOL_SCHEMAS_FILE_NAME = "tool_schemas.json"
+
+logger = logging.getLogger(__name__)
+
+
+def installed_version() -> str:
+    try:
+        return version("mcp-server-apache-airflow")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def fingerprint(func: Callable[..., Any]) -> str:
+    """
+    Identify a tool function by its location and signature; a changed signature changes its schema.
+
+    The signature only names the argument models and enums, so their fields and values are hashed along:
+    changing a model's fields changes the tool's schema, not the signature.
+    """
+    key = f"{func.__module__}.{func.__qualname__}{inspect.signature(func)}"
+    types_digest = hashlib.sha256()
+    for annotation_type in _annotation_types(func):
+        if issubclass(annotation_type, BaseModel):
+            types_digest.update(repr(annotation_type.model_fields).encode())
+        else:
+            types_digest.update(repr([member.value for member in annotation_type]).encode())
+    return f"{key}#{types_digest.hexdigest()[:16]}"
+
+
+def _annotation_types(func: Callable[..., Any]) -> List[type]:
+    """The models and enums the parameters of ``func`` are annotated with, also within other types and models."""
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {name: parameter.annotation for name, parameter in inspect.signature(func).parameters.items()}
+    hints.pop("return", None)
+    found: List[type] = []
+    pending = list(hints.values())
+    while pending:
+        annotation = pending.pop()
+        pending.extend(typing.get_args(annotation))
+        if not isinstance(annotation, type) or annotation in found:
+            continue
+        if issubclass(annotation, BaseModel):
+            found.append(annotation)
+            pending.extend(field.annotation for field in annotation.model_fields.values())
+        elif issubclass(annotation, enum.Enum):
+            found.append(annotation)
+    return found
+
+
+class ToolSchemaCache:
+    """
+    Input and output schemas of the tools, generated once per package version and kept on disk.
+
+    Generating a schema means introspecting the function and building a pydantic model of its parameters,
+    which for all the tools adds up to a noticeable part of startup. Cached schemas are used as long as the
+    package version and the function's fingerprint are the same as when they were generated.
+    """
+
+    def __init__(self, path: Optional[Path] = None, package_version: Optional[str] = None):
+        self.path = path
+        self.package_version = package_version or installed_version()
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    def tool(self, func: Callable[..., Any], name: str, description: str) -> Tool:
+        """Equivalent to ``Tool.from_function(func, name=name, description=description)``."""
+        key = fingerprint(func)
+        with self._lock:
+            cached = self._schemas.get(name)
+        if cached is not None and cached["fingerprint"] == key:
+            return FunctionTool(
+                fn=func,
+                name=name,
+                description=description,
+                parameters=cached["parameters"],
+                output_schema=cached["output_schema"],
+                tags=set(),
+                enabled=True,
+            )
+
+        tool = Tool.from_function(func, name=name, description=description)
+        with self._lock:
+            self._schemas[name] = {
+                "fingerprint": key,
+                "parameters": tool.parameters,
+                "output_schema": tool.output_schema,
+            }
+            self._dirty = True
+        return tool
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool schema cache {self.path}: {e}")
+            return
+        if data.get("package_version") != self.package_version:
+            return
+        with self._lock:
+            self._schemas = data.get("tools", {})
+
+    def save(self) -> None:
+        """Write the schemas if any had to be generated since they were loaded."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"package_version": self.package_version, "tools": dict(self._schemas)}
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so a crash mid-write never leaves a truncated cache behind
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write tool schema cache {self.path}: {e}")
+
+
+def cache_tool_list(app: FastMCP) -> None:
+    """
+    Answer tools/list from a result built once, rebuilt only when the registered tools change.
+
+    Clients list the tools at the start of every session; the list of this server does not depend on who
+    asks, so converting each tool to its MCP form every time is wasted work.
+    """
+    server = app._mcp_server
+    build_tool_list = server.request_handlers[types.ListToolsRequest]
+    cached: Dict[str, Any] = {"key": None, "result": None}
+
+    async def list_tools(request: Any) -> types.ServerResult:
+        tools = await app.get_tools()
+        key = tuple((name, id(tool), tool.enabled) for name, tool in tools.items())
+        if cached["key"] != key:
+            cached["result"] = await build_tool_list(request)
+            cached["key"] = key
+        return cached["result"]
+
+    server.request_handlers[types.ListToolsRequest] = list_tools
+
+
+tool_schema_cache = ToolSchemaCache(
+    Path(AIRFLOW_MCP_STATE_DIR) / TOOL_SCHEMAS_FILE_NAME if AIRFLOW_MCP_STATE_DIR else None
+)
@@ -0,0 +1,237 @@
+import asyncio
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src.envs import MCP_TRACE_FILE
+
+SERVICE_NAME = "mcp-server-apache-airflow"
+# Span kinds and status codes as numbered by OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_ERROR = 2
+# W3C trace context: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+INVALID_TRACE_ID = "0" * 32
+INVALID_SPAN_ID = "0" * 16
+# How many written traces are remembered, to drop the spans of tasks that end after their trace was written
+EXPORTED_TRACES_LIMIT = 1024
+
+
+class Span:
+    """A timed operation of a trace, with OpenTelemetry's identifiers, kind, attributes and status."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_span_id", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C ``traceparent`` header making a downstream service's spans children of this one."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.error is not None:
+            otlp["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return otlp
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64-bit integers are strings in OTLP/JSON
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class FileSpanExporter:
+    """
+    Appends finished spans to a file in the OTLP/JSON format, one ``ExportTraceServiceRequest`` per line.
+
+    That is the format OpenTelemetry Collector's ``otlpjsonfile`` receiver reads, so the file can be replayed into
+    any tracing backend, or read as-is. Spans are buffered per trace and each trace is written in one batch, when
+    its outermost tool call ends. Spans ended after that, by tasks the tool call left running, are dropped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: Dict[str, List[Span]] = {}
+        # Outermost tool calls in progress per trace; a caller may make several within its own trace
+        self._open: Dict[str, int] = {}
+        self._exported: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self, trace_id: str) -> None:
+        """Note that an outermost tool call of the trace started, so its spans are buffered until it ends."""
+        with self._lock:
+            self._open[trace_id] = self._open.get(trace_id, 0) + 1
+            self._exported.pop(trace_id, None)
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            if span.trace_id in self._exported:
+                return
+            self._pending.setdefault(span.trace_id, []).append(span)
+
+    def flush(self, trace_id: str) -> None:
+        """Write the spans of a trace once its outermost tool call ended; this blocks, so call it in a thread."""
+        with self._lock:
+            spans = self._pending.pop(trace_id, [])
+            self._open[trace_id] = self._open.get(trace_id, 1) - 1
+            if self._open[trace_id] <= 0:
+                del self._open[trace_id]
+                self._exported[trace_id] = None
+                while len(self._exported) > EXPORTED_TRACES_LIMIT:
+                    self._exported.popitem(last=False)
+        if not spans:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(SERVICE_NAME)}]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+                }
+            ]
+        }
+        line = json.dumps(request, separators=(",", ":")) + "\n"
+        with self._write_lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+# Span of the operation being served; asyncio.to_thread carries it into worker threads
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """Return the trace ID, parent span ID and whether the caller sampled it, or None for a missing or bad header."""
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if match is None or match.group(1) == INVALID_TRACE_ID or match.group(2) == INVALID_SPAN_ID:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a child span of the current span, if any; yields None outside of a traced tool call.
+
+    Only tool calls start traces, so when tracing is off, this costs a context variable lookup.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current_span.reset(token)
+        child.end_ns = time.time_ns()
+        exporter.export(child)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function to record a span around it within traced tool calls."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware(Middleware):
+    """
+    Starts a trace for every tool call, whose spans break down where the call spent its time.
+
+    On the SSE and HTTP transports, a W3C ``traceparent`` header sent with the request makes the tool call span a
+    child of the caller's span, and a caller that did not sample its trace is not traced here either. Tool calls
+    made within a traced tool call, like those of the batch tool, are child spans of the enclosing call.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        enclosing = current_span.get()
+        if enclosing is not None:
+            parent = (enclosing.trace_id, enclosing.span_id, True)
+        else:
+            parent = parse_traceparent(get_http_headers(include_all=True).get("traceparent"))
+        if parent is not None and not parent[2]:
+            return await call_next(context)
+        trace_id, parent_span_id = parent[:2] if parent is not None else (os.urandom(16).hex(), None)
+        tool = context.message.name
+        root = Span(f"tools/call {tool}", trace_id, parent_span_id, KIND_SERVER, {"mcp.tool.name": tool})
+        if enclosing is None:
+            exporter.start(trace_id)
+        token = current_span.set(root)
+        try:
+            result = await call_next(context)
+            if getattr(result, "is_error", False):
+                root.error = "Tool returned an error"
+            return result
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current_span.reset(token)
+            root.end_ns = time.time_ns()
+            exporter.export(root)
+            if enclosing is None:
+                # The spans of the whole trace are written once its outermost tool call ends, off the event loop
+                await asyncio.to_thread(exporter.flush, trace_id)
+
+
+exporter = FileSpanExporter(MCP_TRACE_FILE) if MCP_TRACE_FILE else None
@@ -0,0 +1,141 @@
+"""Tests for recording and replaying Airflow traffic."""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+from airflow_client.client import Configuration
+from airflow_client.client.api.connection_api import ConnectionApi
+from airflow_client.client.api.pool_api import PoolApi
+from airflow_client.client.exceptions import NotFoundException
+
+from src.airflow import airflow_client
+from src.airflow.cassette import RECORD, REDACTED, REPLAY, Cassette, CassetteMiss, redact
+from src.metrics import TransferMetrics
+
+
+class _AirflowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        if self.path.startswith("/api/v1/connections/"):
+            status, payload = 200, {"connection_id": "db", "conn_type": "postgres", "password": "s3cret"}
+        elif self.path.startswith("/api/v1/pools/default_pool"):
+            status, payload = 200, {"name": "default_pool", "slots": self.server.requests}
+        else:
+            status, payload = 404, {"title": "Not Found", "status": 404}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _client(cassette, port=1):
+    configuration = Configuration(host=f"http://127.0.0.1:{port}/api/v1", username="admin", password="hunter2")
+    return airflow_client.AirflowApiClient(configuration, cassette=cassette)
+
+
+class TestCassette:
+    """Test cases for the record/replay cassette of the Airflow client."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _AirflowHandler)
+        server.requests = 0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture(autouse=True)
+    def transfer_metrics(self):
+        with patch.object(airflow_client, "transfer_metrics", TransferMetrics()) as metrics:
+            yield metrics
+
+    def _record(self, server, path):
+        cassette = Cassette(str(path), RECORD)
+        client = _client(cassette, server.server_port)
+        connection = ConnectionApi(client).get_connection("db", _check_return_type=False).to_dict()
+        pools = [PoolApi(client).get_pool("default_pool", _check_return_type=False).to_dict() for _ in range(2)]
+        with pytest.raises(NotFoundException):
+            PoolApi(client).get_pool("missing", _check_return_type=False)
+        cassette.close()
+        return connection, pools
+
+    @pytest.mark.parametrize("name", ["traffic.jsonl", "traffic.jsonl.gz"])
+    def test_recorded_traffic_is_replayed_without_airflow(self, server, tmp_path, name):
+        path = tmp_path / name
+        connection, pools = self._record(server, path)
+        server.requests = 0
+
+        client = _client(Cassette(str(path), REPLAY, latency_scale=0))
+        replayed_connection = ConnectionApi(client).get_connection("db", _check_return_type=False).to_dict()
+        replayed = [PoolApi(client).get_pool("default_pool", _check_return_type=False).to_dict() for _ in range(3)]
+        with pytest.raises(NotFoundException):
+            PoolApi(client).get_pool("missing", _check_return_type=False)
+
+        assert server.requests == 0
+        assert replayed_connection == {**connection, "password": REDACTED}
+        # Responses recorded for the same request are served in order, then again from the first
+        assert replayed == [pools[0], pools[1], pools[0]]
+
+    def test_credentials_are_not_recorded(self, server, tmp_path):
+        path = tmp_path / "traffic.jsonl"
+        self._record(server, path)
+        recorded = path.read_text()
+
+        assert "s3cret" not in recorded
+        assert "hunter2" not in recorded and "YWRtaW46aHVudGVyMg" not in recorded
+        assert "session=abc" not in recorded
+
+    def test_unrecorded_request_raises(self, server, tmp_path):
+        path = tmp_path / "traffic.jsonl"
+        self._record(server, path)
+
+        client = _client(Cassette(str(path), REPLAY, latency_scale=0))
+        with pytest.raises(CassetteMiss):
+            PoolApi(client).get_pools(limit=5, _check_return_type=False)
+
+    def test_recorded_latency_is_scaled(self, server, tmp_path):
+        path = tmp_path / "traffic.jsonl"
+        self._record(server, path)
+        elapsed = json.loads(path.read_text().splitlines()[1])["elapsed"]
+
+        client = _client(Cassette(str(path), REPLAY, latency_scale=2.5))
+        with patch("src.airflow.cassette.time.sleep") as sleep:
+            ConnectionApi(client).get_connection("db", _check_return_type=False)
+
+        sleep.assert_called_once_with(elapsed * 2.5)
+
+    def test_truncated_recording_is_replayed_up_to_its_last_complete_entry(self, server, tmp_path):
+        path = tmp_path / "traffic.jsonl.gz"
+        self._record(server, path)
+        recorded = gzip.decompress(path.read_bytes())
+        truncated = tmp_path / "truncated.jsonl.gz"
+        truncated.write_bytes(gzip.compress(recorded)[:-40])
+
+        assert 0 < len(Cassette(str(truncated), REPLAY)) < len(recorded.splitlines()) - 1
+
+    def test_redact_replaces_sensitive_keys_at_any_depth(self):
+        value = {
+            "connections": [{"conn_id": "db", "password": "p", "extra": "{}", "extra_dejson": {"api_key": "k"}}],
+            "file_token": "Ii9kYWdzIg",
+            "access_token": "t",
+        }
+
+        assert redact(value) == {
+            "connections": [
+                {"conn_id": "db", "password": REDACTED, "extra": REDACTED, "extra_dejson": {"api_key": REDACTED}}
+            ],
+            "file_token": "Ii9kYWdzIg",
+            "access_token": REDACTED,
+        }
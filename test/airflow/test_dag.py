@@ -4,6 +4,7 @@ from unittest.mock import ANY, MagicMock, patch
 
 import mcp.types as types
 import pytest
+from airflow_client.client.exceptions import NotFoundException
 
 from src.airflow.dag import (
     clear_task_instances,
@@ -16,6 +17,7 @@ from src.airflow.dag import (
     get_dags,
     get_task,
     get_tasks,
+    load_dags,
     patch_dag,
     pause_dag,
     reparse_dag_file,
@@ -520,3 +522,65 @@ class TestDagModule:
         mock_dag_api.patch_dag.assert_called_once()
         mock_dag_api.get_tasks.assert_called_once_with(dag_id=dag_id)
         mock_dag_api.delete_dag.assert_called_once_with(dag_id=dag_id)
+
+
+class TestLoadDags:
+    """Test cases for fetching several DAGs by ID at once."""
+
+    @staticmethod
+    def _page(dag_ids, total_entries):
+        response = MagicMock()
+        response.to_dict.return_value = {
+            "dags": [{"dag_id": dag_id} for dag_id in dag_ids],
+            "total_entries": total_entries,
+        }
+        return response
+
+    @pytest.fixture
+    def mock_dag_api(self):
+        with patch("src.airflow.dag.dag_api") as mock_api:
+            mock_api.get_dag.side_effect = lambda dag_id: MagicMock(to_dict=lambda: {"dag_id": dag_id})
+            yield mock_api
+
+    def test_single_dag_is_fetched_directly(self, mock_dag_api):
+        assert load_dags(["etl_daily"]) == {"etl_daily": {"dag_id": "etl_daily"}}
+        mock_dag_api.get_dags.assert_not_called()
+
+    def test_dags_are_listed_by_common_prefix(self, mock_dag_api):
+        mock_dag_api.get_dags.return_value = self._page(["etl_daily", "etl_hourly", "etl_weekly"], 3)
+
+        assert load_dags(["etl_daily", "etl_weekly"]) == {
+            "etl_daily": {"dag_id": "etl_daily"},
+            "etl_weekly": {"dag_id": "etl_weekly"},
+        }
+        mock_dag_api.get_dags.assert_called_once_with(
+            limit=100, offset=0, only_active=False, order_by="dag_id", dag_id_pattern="etl_"
+        )
+        mock_dag_api.get_dag.assert_not_called()
+
+    def test_dags_without_a_selective_prefix_are_fetched_one_by_one(self, mock_dag_api):
+        assert set(load_dags(["etl_daily", "export", "zeta"])) == {"etl_daily", "export", "zeta"}
+        mock_dag_api.get_dags.assert_not_called()
+        assert mock_dag_api.get_dag.call_count == 3
+
+    def test_missing_dags_are_fetched_one_by_one_when_cheaper(self, mock_dag_api):
+        # Two DAGs still missing with 49 pages to go: fetching them directly takes fewer requests
+        mock_dag_api.get_dags.return_value = self._page([f"dag_{i:03}" for i in range(100)], 5000)
+        mock_dag_api.get_dag.side_effect = [NotFoundException(), MagicMock(to_dict=lambda: {"dag_id": "dag_zeta"})]
+
+        assert load_dags(["dag_001", "dag_zeta", "dag_deleted"]) == {
+            "dag_001": {"dag_id": "dag_001"},
+            "dag_zeta": {"dag_id": "dag_zeta"},
+        }
+        assert mock_dag_api.get_dags.call_count == 1
+        assert mock_dag_api.get_dag.call_args_list[0].kwargs == {"dag_id": "dag_deleted"}
+
+    def test_listing_continues_while_cheaper(self, mock_dag_api):
+        mock_dag_api.get_dags.side_effect = [
+            self._page([f"etl_{i:03}" for i in range(100)], 150),
+            self._page([f"etl_{i:03}" for i in range(100, 150)], 150),
+        ]
+
+        assert set(load_dags(["etl_001", "etl_120", "etl_130"])) == {"etl_001", "etl_120", "etl_130"}
+        assert mock_dag_api.get_dags.call_count == 2
+        mock_dag_api.get_dag.assert_not_called()
@@ -0,0 +1,170 @@
+"""Unit tests for dagrun module using pytest framework."""
+
+import ast
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.airflow.dagrun import _poll_interval, get_dag_runs_batch, wait_for_dag_run
+
+
+def _response(payload):
+    response = MagicMock()
+    response.to_dict.return_value = payload
+    return response
+
+
+class TestGetDagRunsBatch:
+    """Test cases for the get_dag_runs_batch tool."""
+
+    @pytest.mark.asyncio
+    async def test_include_dag_loads_each_dag_once(self):
+        runs = {
+            "dag_runs": [
+                {"dag_id": "etl_daily", "dag_run_id": "run_1"},
+                {"dag_id": "etl_daily", "dag_run_id": "run_2"},
+                {"dag_id": "etl_report", "dag_run_id": "run_1"},
+                {"dag_id": "etl_gone", "dag_run_id": "run_1"},
+            ],
+            "total_entries": 4,
+        }
+        dags = {
+            "dags": [
+                {"dag_id": "etl_daily", "is_paused": False, "owners": ["data"], "tags": [{"name": "finance"}]},
+                {"dag_id": "etl_report", "is_paused": True, "owners": ["bi"], "tags": []},
+            ],
+            "total_entries": 2,
+        }
+        with (
+            patch("src.airflow.dagrun.dag_run_api") as mock_dag_run_api,
+            patch("src.airflow.dag.dag_api") as mock_dag_api,
+        ):
+            mock_dag_run_api.get_dag_runs_batch.return_value = _response(runs)
+            mock_dag_api.get_dags.return_value = _response(dags)
+            result = await get_dag_runs_batch(dag_ids=["etl_daily", "etl_report", "etl_gone"], include_dag=True)
+
+        dag_runs = ast.literal_eval(result[0].text)["dag_runs"]
+        assert [run["dag"] for run in dag_runs] == [
+            {"is_paused": False, "owners": ["data"], "tags": [{"name": "finance"}]},
+            {"is_paused": False, "owners": ["data"], "tags": [{"name": "finance"}]},
+            {"is_paused": True, "owners": ["bi"], "tags": []},
+            None,
+        ]
+        mock_dag_api.get_dags.assert_called_once()
+        mock_dag_api.get_dag.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dags_are_not_loaded_by_default(self):
+        with (
+            patch("src.airflow.dagrun.dag_run_api") as mock_dag_run_api,
+            patch("src.airflow.dag.dag_api") as mock_dag_api,
+        ):
+            mock_dag_run_api.get_dag_runs_batch.return_value = _response(
+                {"dag_runs": [{"dag_id": "etl", "dag_run_id": "run_1"}], "total_entries": 1}
+            )
+            result = await get_dag_runs_batch()
+
+        assert "dag" not in ast.literal_eval(result[0].text)["dag_runs"][0]
+        mock_dag_api.get_dags.assert_not_called()
+
+
+class TestWaitForDagRun:
+    """Test cases for the wait_for_dag_run tool."""
+
+    @pytest.fixture
+    def mock_dag_run_api(self):
+        """Mock the DAG run API with a history of ten-minute runs."""
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        history = {
+            "dag_runs": [
+                {"start_date": started.isoformat(), "end_date": (started + timedelta(minutes=10)).isoformat()}
+                for _ in range(3)
+            ]
+        }
+        with patch("src.airflow.dagrun.dag_run_api") as mock_api:
+            mock_api.get_dag_runs.return_value = _response(history)
+            yield mock_api
+
+    @pytest.fixture
+    def mock_sleep(self):
+        """Skip the actual waiting between polls."""
+        with patch("src.airflow.dagrun.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            yield mock_sleep
+
+    @pytest.mark.parametrize(
+        "elapsed, waited, expected_duration, expected_interval",
+        [
+            (None, 0.0, 600.0, 5),
+            (None, 300.0, 600.0, 30),
+            (60.0, 0.0, None, 6),
+            (0.0, 0.0, 600.0, 60),
+            (560.0, 0.0, 600.0, 20),
+            (598.0, 0.0, 600.0, 5),
+            (700.0, 0.0, 600.0, 25),
+            (5000.0, 0.0, 600.0, 60),
+        ],
+        ids=[
+            "just-queued",
+            "long-queued",
+            "no-history",
+            "just-started",
+            "near-completion",
+            "at-completion",
+            "overdue",
+            "long-overdue",
+        ],
+    )
+    def test_poll_interval(self, elapsed, waited, expected_duration, expected_interval):
+        """Polls are frequent near the expected completion and sparse elsewhere."""
+        assert _poll_interval(elapsed, waited, expected_duration, 5, 60) == expected_interval
+
+    async def test_returns_when_run_reaches_terminal_state(self, mock_dag_run_api, mock_sleep):
+        """Polling stops as soon as the run succeeds."""
+        start_date = (datetime.now(timezone.utc) - timedelta(minutes=9)).isoformat()
+        mock_dag_run_api.get_dag_run.side_effect = [
+            _response({"dag_id": "dag_1", "dag_run_id": "run_1", "state": "running", "start_date": start_date}),
+            _response({"dag_id": "dag_1", "dag_run_id": "run_1", "state": "success", "start_date": start_date}),
+        ]
+
+        result = await wait_for_dag_run(dag_id="dag_1", dag_run_id="run_1")
+
+        mock_dag_run_api.get_dag_runs.assert_called_once_with(
+            dag_id="dag_1", state=["success"], order_by="-end_date", limit=10
+        )
+        assert mock_dag_run_api.get_dag_run.call_count == 2
+        # One minute before the expected completion the next poll comes half a minute later
+        assert mock_sleep.await_args.args[0] == pytest.approx(30, abs=1)
+        text = result[0].text
+        assert "'timed_out': False" in text
+        assert "'polls': 2" in text
+        assert "'expected_duration_seconds': 600.0" in text
+
+    async def test_times_out(self, mock_dag_run_api, mock_sleep):
+        """The tool gives up once the timeout has passed."""
+        mock_dag_run_api.get_dag_run.return_value = _response(
+            {"dag_id": "dag_1", "dag_run_id": "run_1", "state": "queued", "start_date": None}
+        )
+
+        result = await wait_for_dag_run(dag_id="dag_1", dag_run_id="run_1", timeout_seconds=0)
+
+        mock_sleep.assert_not_awaited()
+        assert "'timed_out': True" in result[0].text
+
+    async def test_reports_task_progress(self, mock_dag_run_api, mock_sleep):
+        """Each poll reports how many task instances of the run have finished."""
+        mock_dag_run_api.get_dag_run.return_value = _response(
+            {"dag_id": "dag_1", "dag_run_id": "run_1", "state": "success", "start_date": None}
+        )
+        ctx = MagicMock()
+        ctx.report_progress = AsyncMock()
+        task_instances = _response(
+            {"task_instances": [{"state": "success"}, {"state": "skipped"}, {"state": "running"}, {"state": None}]}
+        )
+
+        with patch("src.airflow.dagrun.task_instance_api.get_task_instances", return_value=task_instances):
+            await wait_for_dag_run(dag_id="dag_1", dag_run_id="run_1", ctx=ctx)
+
+        ctx.report_progress.assert_awaited_once_with(
+            progress=2, total=4, message="none: 1, running: 1, skipped: 1, success: 1"
+        )
@@ -0,0 +1,89 @@
+"""Unit tests for eventlog module using pytest framework."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.airflow.eventlog import tail_event_logs
+
+WHEN = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _response(event_log_ids):
+    response = MagicMock()
+    response.to_dict.return_value = {
+        "event_logs": [
+            {"event_log_id": event_log_id, "event": "paused", "when": WHEN} for event_log_id in event_log_ids
+        ]
+    }
+    return response
+
+
+class TestTailEventLogs:
+    """Test cases for cursor-based event log tailing."""
+
+    @pytest.fixture
+    def mock_get_event_logs(self):
+        """Patch the event log API listing call."""
+        with patch("src.airflow.eventlog.event_log_api.get_event_logs") as mock_get:
+            yield mock_get
+
+    async def test_first_call_returns_latest_entries_and_cursor(self, mock_get_event_logs):
+        """Without a cursor the newest entries are returned oldest first."""
+        mock_get_event_logs.return_value = _response([12, 11, 10])
+
+        result = await tail_event_logs(limit=3, dag_id="dag_1")
+
+        mock_get_event_logs.assert_called_once_with(order_by="-event_log_id", limit=3, dag_id="dag_1")
+        text = result[0].text
+        assert text.index("'event_log_id': 10") < text.index("'event_log_id': 12")
+        assert f"'cursor': '12@{WHEN.isoformat()}'" in text
+
+    async def test_cursor_only_fetches_newer_entries(self, mock_get_event_logs):
+        """Entries at or before the cursor are not returned again."""
+        mock_get_event_logs.return_value = _response([12, 13])
+
+        result = await tail_event_logs(cursor=f"12@{WHEN.isoformat()}")
+
+        mock_get_event_logs.assert_called_once_with(
+            order_by="event_log_id", after=WHEN - timedelta(microseconds=1), offset=0, limit=100
+        )
+        text = result[0].text
+        assert "'event_log_id': 12" not in text
+        assert f"'cursor': '13@{WHEN.isoformat()}'" in text
+
+    async def test_entries_sharing_the_cursor_timestamp_are_skipped_page_by_page(self, mock_get_event_logs):
+        """More entries than the limit at the cursor's timestamp do not keep the tail from advancing."""
+        mock_get_event_logs.side_effect = [_response([10, 11]), _response([12, 13]), _response([14])]
+
+        result = await tail_event_logs(cursor=f"13@{WHEN.isoformat()}", limit=2)
+
+        assert [call.kwargs["offset"] for call in mock_get_event_logs.call_args_list] == [0, 2, 4]
+        assert f"'cursor': '14@{WHEN.isoformat()}'" in result[0].text
+
+    async def test_long_poll_waits_for_new_entries(self, mock_get_event_logs):
+        """With a timeout, the call keeps polling until new entries show up."""
+        mock_get_event_logs.side_effect = [_response([12]), _response([12]), _response([12, 13])]
+
+        result = await tail_event_logs(cursor=f"12@{WHEN.isoformat()}", timeout_seconds=5, poll_interval_seconds=0)
+
+        assert mock_get_event_logs.call_count == 3
+        assert "'event_log_id': 13" in result[0].text
+
+    async def test_long_poll_gives_up_after_timeout(self, mock_get_event_logs):
+        """When nothing new arrives, the original cursor is returned."""
+        mock_get_event_logs.return_value = _response([12])
+        cursor = f"12@{WHEN.isoformat()}"
+
+        result = await tail_event_logs(cursor=cursor, timeout_seconds=0.05, poll_interval_seconds=0.01)
+
+        assert f"'cursor': '{cursor}'" in result[0].text
+        assert "'event_logs': []" in result[0].text
+
+    async def test_invalid_cursor(self, mock_get_event_logs):
+        """A malformed cursor is rejected before any request is made."""
+        with pytest.raises(ValueError, match="Invalid event log cursor"):
+            await tail_event_logs(cursor="not-a-cursor")
+
+        mock_get_event_logs.assert_not_called()
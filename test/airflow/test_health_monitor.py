@@ -0,0 +1,124 @@
+"""Tests for the background health monitor."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.airflow import monitoring
+from src.airflow.health_monitor import HealthMonitor
+
+
+def make_health(scheduler_status="healthy", heartbeat_lag_seconds=5):
+    heartbeat = (datetime.now(timezone.utc) - timedelta(seconds=heartbeat_lag_seconds)).isoformat()
+    return {
+        "metadatabase": {"status": "healthy"},
+        "scheduler": {"status": scheduler_status, "latest_scheduler_heartbeat": heartbeat},
+        "triggerer": {"status": None, "latest_triggerer_heartbeat": None},
+        "dag_processor": None,
+    }
+
+
+@pytest.fixture
+def monitor():
+    monitor = HealthMonitor(MagicMock(return_value=make_health()), interval=15, history_size=10)
+    yield monitor
+    monitor.stop()
+
+
+class TestHealthMonitor:
+    """Test cases for HealthMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_latest_reuses_fresh_sample(self, monitor):
+        first = await monitor.latest()
+        second = await monitor.latest()
+
+        assert first is second
+        assert monitor.probe.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_latest_probes_when_sample_is_too_old(self, monitor):
+        await monitor.latest()
+        await monitor.latest(max_age_seconds=0)
+
+        assert monitor.probe.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_is_recorded(self, monitor):
+        monitor.probe.side_effect = RuntimeError("connection refused")
+        sample = await monitor.sample()
+
+        assert sample.to_dict()["webserver"] == "unhealthy"
+        assert sample.to_dict()["error"] == "connection refused"
+        assert sample.status("scheduler") is None
+
+    @pytest.mark.asyncio
+    async def test_history_summarizes_samples(self, monitor):
+        monitor.probe.side_effect = [
+            make_health(heartbeat_lag_seconds=5),
+            make_health(scheduler_status="unhealthy", heartbeat_lag_seconds=65),
+            make_health(heartbeat_lag_seconds=5),
+        ]
+        for _ in range(3):
+            await monitor.sample()
+
+        history = monitor.history(timeline_limit=2)
+
+        assert history["samples"] == 3
+        assert sum(history["latency_ms"]["histogram"].values()) == 3
+        scheduler = history["components"]["scheduler"]
+        assert scheduler["last"] == "healthy"
+        assert scheduler["healthy_ratio"] == pytest.approx(0.667)
+        assert scheduler["heartbeat_lag_seconds"]["max"] >= 65
+        assert [(change["component"], change["to"]) for change in history["status_changes"]] == [
+            ("scheduler", "unhealthy"),
+            ("scheduler", "healthy"),
+        ]
+        assert len(history["timeline"]) == 2
+        assert "triggerer_heartbeat_lag_seconds" not in history["timeline"][0]
+
+    async def test_history_without_samples(self, monitor):
+        assert monitor.history() == {"samples": 0}
+
+
+class TestHealthTools:
+    """Test cases for the health tools."""
+
+    @pytest.mark.asyncio
+    async def test_get_health_is_served_from_sample(self, monitor):
+        with patch.object(monitoring, "health_monitor", monitor):
+            result = await monitoring.get_health()
+            await monitoring.get_health()
+
+        assert monitor.probe.call_count == 1
+        assert "'sample_age_seconds'" in result[0].text
+        assert "'metadatabase': {'status': 'healthy'}" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_get_health_history_starts_the_probe(self):
+        monitor = HealthMonitor(MagicMock(return_value=make_health()), interval=0.01, history_size=10)
+        try:
+            with patch.object(monitoring, "health_monitor", monitor):
+                first = await monitoring.get_health_history()
+                await asyncio.sleep(0.1)
+                later = await monitoring.get_health_history()
+        finally:
+            monitor.stop()
+
+        assert first[0].text == str({"samples": 0})
+        assert "'samples': 0" not in later[0].text
+        assert monitor.probe.call_count > 0
+
+    @pytest.mark.asyncio
+    async def test_get_health_calls_airflow_when_probe_failed(self, monitor):
+        monitor.probe.side_effect = RuntimeError("timeout")
+        with (
+            patch.object(monitoring, "health_monitor", monitor),
+            patch.object(monitoring, "monitoring_api") as monitoring_api,
+        ):
+            monitoring_api.get_health.return_value.to_dict.return_value = make_health()
+            await monitoring.get_health()
+
+        monitoring_api.get_health.assert_called_once()
@@ -0,0 +1,230 @@
+"""Tests for the metadata store."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.airflow import config, plugin, provider
+from src.airflow.metadata_store import MetadataStore, collect_pages, paginate
+from src.caller_credentials import caller_authorization
+
+
+@pytest.fixture
+def store():
+    store = MetadataStore(refresh_interval=3600, version_check_interval=300)
+    yield store
+    store.stop()
+
+
+def counting_loader(*values):
+    loader = MagicMock(side_effect=list(values))
+    return loader
+
+
+class TestMetadataStore:
+    """Test cases for MetadataStore."""
+
+    @pytest.mark.asyncio
+    async def test_entry_is_loaded_once(self, store):
+        loader = counting_loader({"plugins": []})
+        store.register("plugins", loader)
+
+        first = await store.get("plugins")
+        second = await store.get("plugins")
+
+        assert first is second
+        assert loader.call_count == 1
+        assert "plugins" in store.info()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_share_one_load(self, store):
+        calls = 0
+
+        def slow_loader():
+            nonlocal calls
+            calls += 1
+            return {"sections": []}
+
+        store.register("config", slow_loader)
+        await asyncio.gather(*(store.get("config") for _ in range(5)))
+
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_reports_per_entry(self, store):
+        store.register("plugins", counting_loader({"plugins": []}, {"plugins": [{"name": "p"}]}))
+        store.register("config", MagicMock(side_effect=RuntimeError("forbidden")))
+        await store.get("plugins")
+
+        results = await store.refresh(["plugins", "config", "nope"])
+
+        assert results["plugins"] == "refreshed"
+        assert results["config"].startswith("failed")
+        assert results["nope"] == "unknown"
+        assert await store.get("plugins") == {"plugins": [{"name": "p"}]}
+
+    @pytest.mark.asyncio
+    async def test_version_change_reloads_loaded_entries(self, store):
+        store.register("version", counting_loader({"version": "2.9.0"}, {"version": "2.9.0"}, {"version": "2.10.0"}))
+        providers = counting_loader({"providers": []}, {"providers": [{"package_name": "new"}]})
+        store.register("providers", providers)
+        await store.get("version")
+        await store.get("providers")
+
+        assert await store.check_version() is False
+        assert providers.call_count == 1
+        assert await store.check_version() is True
+        assert providers.call_count == 2
+        assert await store.get("providers") == {"providers": [{"package_name": "new"}]}
+
+    @pytest.mark.asyncio
+    async def test_entries_are_kept_per_caller(self, store):
+        def loader():
+            return {"plugins": [{"name": caller_authorization.get()}]}
+
+        store.register("plugins", loader)
+        token = caller_authorization.set("Bearer team-a")
+        try:
+            team_a = await store.get("plugins")
+        finally:
+            caller_authorization.reset(token)
+
+        assert team_a == {"plugins": [{"name": "Bearer team-a"}]}
+        assert await store.get("plugins") == {"plugins": [{"name": None}]}
+        assert list(store.info()) == ["plugins"]
+
+    @pytest.mark.asyncio
+    async def test_reloading_everything_drops_callers_entries(self, store):
+        loaded_as = []
+
+        def loader():
+            loaded_as.append(caller_authorization.get())
+            return {"plugins": [{"name": caller_authorization.get()}]}
+
+        store.register("plugins", loader)
+        token = caller_authorization.set("Bearer team-a")
+        try:
+            await store.get("plugins")
+        finally:
+            caller_authorization.reset(token)
+        await store.get("plugins")
+
+        await store._reload_all()
+
+        assert list(store._entries) == [(None, "plugins")]
+        assert loaded_as == ["Bearer team-a", None, None]
+        assert await store.get("plugins") == {"plugins": [{"name": None}]}
+
+    @pytest.mark.asyncio
+    async def test_only_the_most_recent_callers_entries_are_kept(self):
+        store = MetadataStore(refresh_interval=3600, version_check_interval=300, callers_limit=2)
+        loader = MagicMock(side_effect=lambda: {"plugins": [{"name": caller_authorization.get()}]})
+        store.register("plugins", loader)
+
+        async def get_as(authorization):
+            token = caller_authorization.set(authorization)
+            try:
+                await store.get("plugins")
+            finally:
+                caller_authorization.reset(token)
+
+        try:
+            for authorization in ["Bearer a", "Bearer b", "Bearer a", "Bearer c"]:
+                await get_as(authorization)
+            await store.get("plugins")
+        finally:
+            store.stop()
+
+        assert {authorization for authorization, _ in store._entries} == {"Bearer a", "Bearer c", None}
+        await get_as("Bearer b")
+        assert loader.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_entries_go_with_the_callers_connection_pool(self, store):
+        from src.airflow.airflow_client import AirflowApiClient
+
+        client = AirflowApiClient(caller_clients_limit=1)
+        client.caller_eviction_callbacks.append(store.forget_caller)
+        store.register("plugins", lambda: {"plugins": []})
+        token = caller_authorization.set("Bearer a")
+        try:
+            await store.get("plugins")
+        finally:
+            caller_authorization.reset(token)
+
+        client._caller_rest_client("Bearer a")
+        client._caller_rest_client("Bearer b")
+
+        assert not store._entries
+
+
+class TestPagination:
+    """Test cases for loading and serving collections."""
+
+    def test_collect_pages(self):
+        pages = [
+            {"plugins": [{"name": str(i)} for i in range(100)], "total_entries": 150},
+            {"plugins": [{"name": str(i)} for i in range(100, 150)], "total_entries": 150},
+        ]
+        fetch = MagicMock(side_effect=[MagicMock(to_dict=MagicMock(return_value=page)) for page in pages])
+
+        collection = collect_pages(fetch, "plugins")
+
+        assert collection["total_entries"] == 150
+        assert len(collection["plugins"]) == 150
+        assert [call.kwargs["offset"] for call in fetch.call_args_list] == [0, 100]
+
+    @pytest.mark.parametrize(
+        "limit, offset, expected",
+        [(None, None, list(range(100))), (5, 10, list(range(10, 15))), (None, 140, list(range(140, 150)))],
+        ids=["default-page", "limit-offset", "last-page"],
+    )
+    def test_paginate(self, limit, offset, expected):
+        collection = {"plugins": list(range(150)), "total_entries": 150}
+
+        assert paginate(collection, "plugins", limit, offset) == {"plugins": expected, "total_entries": 150}
+
+
+class TestMetadataTools:
+    """Test cases for tools served from the metadata store."""
+
+    @pytest.mark.asyncio
+    async def test_get_plugins_is_served_from_memory(self, store):
+        store.register("plugins", counting_loader({"plugins": [{"name": "a"}, {"name": "b"}], "total_entries": 2}))
+        with patch.object(plugin, "metadata_store", store):
+            result = await plugin.get_plugins(limit=1, offset=1)
+            await plugin.get_plugins()
+
+        assert result[0].text == str({"plugins": [{"name": "b"}], "total_entries": 2})
+
+    @pytest.mark.asyncio
+    async def test_get_providers_stores_the_response_as_returned(self, store):
+        providers = {"providers": [{"package_name": "apache-airflow-providers-http"}], "total_entries": 1}
+        store.register("providers", provider.load_providers)
+        with (
+            patch.object(provider, "metadata_store", store),
+            patch.object(provider.provider_api, "get_providers", return_value=providers),
+        ):
+            result = await provider.get_providers()
+
+        assert result[0].text == str(providers)
+
+    @pytest.mark.asyncio
+    async def test_get_config_filters_section_in_memory(self, store):
+        sections = [{"name": "core", "options": []}, {"name": "webserver", "options": []}]
+        store.register("config", counting_loader({"sections": sections}))
+        with patch.object(config, "metadata_store", store), patch.object(config, "config_api") as config_api:
+            result = await config.get_config(section="webserver")
+
+        assert result[0].text == str({"sections": [{"name": "webserver", "options": []}]})
+        config_api.get_config.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_config_unknown_section_goes_upstream(self, store):
+        store.register("config", counting_loader({"sections": []}))
+        with patch.object(config, "metadata_store", store), patch.object(config, "config_api") as config_api:
+            config_api.get_config.return_value.to_dict.return_value = {"sections": []}
+            await config.get_config(section="missing")
+
+        config_api.get_config.assert_called_once_with(section="missing")
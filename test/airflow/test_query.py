@@ -0,0 +1,144 @@
+"""Unit tests for the query module using pytest framework."""
+
+import ast
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.airflow.query import DagSelection, RunSelection, TaskInstanceSelection, query
+
+
+def _response(payload):
+    response = MagicMock()
+    response.to_dict.return_value = payload
+    return response
+
+
+def _dag(dag_id, tags=("finance",), is_paused=False):
+    return {"dag_id": dag_id, "tags": [{"name": tag} for tag in tags], "is_paused": is_paused, "is_active": True}
+
+
+def _run(dag_id, dag_run_id, state="failed"):
+    return {"dag_id": dag_id, "dag_run_id": dag_run_id, "state": state, "end_date": "2024-01-01T00:00:00+00:00"}
+
+
+def _task_instance(dag_id, dag_run_id, task_id, state="failed"):
+    return {"dag_id": dag_id, "dag_run_id": dag_run_id, "task_id": task_id, "state": state, "try_number": 1}
+
+
+async def _query(**kwargs):
+    result = await query(**kwargs)
+    return ast.literal_eval(result[0].text)
+
+
+class TestQuery:
+    """Test cases for the query tool."""
+
+    @pytest.fixture
+    def apis(self):
+        with (
+            patch("src.airflow.query.dag_api") as dag_api,
+            patch("src.airflow.query.dag_run_api") as dag_run_api,
+            patch("src.airflow.query.task_instance_api") as task_instance_api,
+        ):
+            yield dag_api, dag_run_api, task_instance_api
+
+    async def test_latest_runs_per_dag_with_failed_task_instances(self, apis):
+        """DAGs are listed once, runs fetched per DAG, and task instances in one batch, then joined."""
+        dag_api, dag_run_api, task_instance_api = apis
+        dag_api.get_dags.return_value = _response({"dags": [_dag("a"), _dag("b")], "total_entries": 2})
+        dag_run_api.get_dag_runs.side_effect = lambda dag_id, **_: _response(
+            {"dag_runs": [_run(dag_id, "scheduled__1")], "total_entries": 1}
+        )
+        task_instance_api.get_task_instances_batch.return_value = _response(
+            {
+                "task_instances": [
+                    _task_instance("a", "scheduled__1", "load"),
+                    _task_instance("b", "scheduled__1", "extract"),
+                    # Cross-matched by the independent dag_ids/dag_run_ids filters
+                    _task_instance("c", "scheduled__1", "other"),
+                ]
+            }
+        )
+
+        result = await _query(
+            dags=DagSelection(tags=["finance"], fields=["is_paused"]),
+            runs=RunSelection(per_dag=1, fields=["state"]),
+            task_instances=TaskInstanceSelection(state=["failed"], fields=["state"]),
+        )
+
+        dag_api.get_dags.assert_called_once_with(limit=100, offset=0, only_active=True, tags=["finance"])
+        assert dag_run_api.get_dag_runs.call_count == 2
+        dag_run_api.get_dag_runs.assert_any_call(dag_id="a", limit=1, order_by="-execution_date")
+        form = task_instance_api.get_task_instances_batch.call_args.kwargs["list_task_instance_form"]
+        assert form == {"dag_ids": ["a", "b"], "dag_run_ids": ["scheduled__1"], "state": ["failed"]}
+
+        assert [dag["dag_id"] for dag in result["dags"]] == ["a", "b"]
+        dag_a = result["dags"][0]
+        assert set(dag_a) == {"dag_id", "is_paused", "ui_url", "dag_runs"}
+        assert dag_a["dag_runs"][0]["state"] == "failed"
+        assert dag_a["dag_runs"][0]["task_instances"] == [{"task_id": "load", "state": "failed"}]
+        assert result["plan"]["api_calls"] == 4
+        assert [step["endpoint"] for step in result["plan"]["steps"]] == [
+            "get_dags",
+            "get_dag_runs",
+            "get_task_instances_batch",
+        ]
+
+    async def test_window_uses_batch_endpoint_and_keeps_per_dag_limit(self, apis):
+        """With a date window, runs come from paginated batch requests and are trimmed per DAG."""
+        dag_api, dag_run_api, task_instance_api = apis
+        dag_api.get_dags.return_value = _response({"dags": [_dag("a"), _dag("b")], "total_entries": 2})
+        dag_run_api.get_dag_runs_batch.side_effect = [
+            _response({"dag_runs": [_run("a", f"r{i}") for i in range(100)], "total_entries": 101}),
+            _response({"dag_runs": [_run("b", "r0")], "total_entries": 101}),
+        ]
+
+        result = await _query(runs=RunSelection(per_dag=2, end_date_gte="2024-01-01", state=["failed"]))
+
+        forms = [call.kwargs["list_dag_runs_form"] for call in dag_run_api.get_dag_runs_batch.call_args_list]
+        assert [form["page_offset"] for form in forms] == [0, 100]
+        assert forms[0]["dag_ids"] == ["a", "b"]
+        assert forms[0]["states"] == ["failed"]
+        assert forms[0]["end_date_gte"] == "2024-01-01"
+        dag_run_api.get_dag_runs.assert_not_called()
+        task_instance_api.get_task_instances_batch.assert_not_called()
+        assert [len(dag["dag_runs"]) for dag in result["dags"]] == [2, 1]
+        assert result["plan"]["steps"][1] == {
+            "level": "dag_runs",
+            "endpoint": "get_dag_runs_batch",
+            "calls": 2,
+            "strategy": "batch",
+            "truncated": False,
+        }
+
+    async def test_dags_by_id_report_errors_per_dag(self, apis):
+        """DAGs asked for by ID are fetched concurrently; a failing one is reported, not fatal."""
+        dag_api, _, _ = apis
+
+        def get_dag(dag_id):
+            if dag_id == "missing":
+                raise RuntimeError("Not Found")
+            return _response(_dag(dag_id))
+
+        dag_api.get_dag.side_effect = get_dag
+
+        result = await _query(dags=DagSelection(dag_ids=["a", "missing"]))
+
+        dag_api.get_dags.assert_not_called()
+        assert [dag["dag_id"] for dag in result["dags"]] == ["a"]
+        assert result["errors"] == [{"level": "dags", "dag_id": "missing", "error": "Not Found"}]
+        assert "dag_runs" not in result["dags"][0]
+
+    async def test_run_limit_truncates_per_dag_results(self, apis):
+        """The overall run limit caps the joined result and is flagged in the plan."""
+        dag_api, dag_run_api, _ = apis
+        dag_api.get_dags.return_value = _response({"dags": [_dag("a"), _dag("b")], "total_entries": 2})
+        dag_run_api.get_dag_runs.side_effect = lambda dag_id, **_: _response(
+            {"dag_runs": [_run(dag_id, "r1"), _run(dag_id, "r2")]}
+        )
+
+        result = await _query(runs=RunSelection(per_dag=2, limit=3))
+
+        assert [len(dag["dag_runs"]) for dag in result["dags"]] == [2, 1]
+        assert result["plan"]["steps"][1]["truncated"] is True
@@ -0,0 +1,67 @@
+"""Tests for the revalidation cache."""
+
+import pytest
+
+from src.airflow.revalidation import CachedResponse, RevalidationCache
+
+
+def make_entry(data: bytes = b"{}", **headers) -> CachedResponse:
+    return CachedResponse(200, "OK", headers, data)
+
+
+class TestRevalidationCache:
+    """Test cases for RevalidationCache."""
+
+    @pytest.mark.parametrize(
+        "method, url, expected",
+        [
+            ("GET", "http://airflow/api/v1/config", True),
+            ("GET", "http://airflow/api/v1/plugins", True),
+            ("GET", "http://airflow/api/v1/providers", True),
+            ("GET", "http://airflow/api/v1/pools", True),
+            ("GET", "http://airflow/api/v1/pools/default_pool", True),
+            ("GET", "http://airflow/api/v1/dags/example/details", True),
+            ("GET", "http://airflow/api/v1/dags/example", False),
+            ("GET", "http://airflow/api/v1/dags/example/dagRuns", False),
+            ("PATCH", "http://airflow/api/v1/pools/default_pool", False),
+        ],
+        ids=["config", "plugins", "providers", "pools", "pool", "dag-details", "dag", "dag-runs", "patch"],
+    )
+    def test_applies(self, method, url, expected):
+        assert RevalidationCache.applies(method, url) is expected
+
+    def test_key_depends_on_credentials(self):
+        url = "http://airflow/api/v1/config"
+        assert RevalidationCache.key(url, [], {"Authorization": "Bearer a"}) != RevalidationCache.key(
+            url, [], {"Authorization": "Bearer b"}
+        )
+
+    def test_conditional_headers(self):
+        entry = make_entry(ETag='"abc"', **{"Last-Modified": "Wed, 01 May 2024 12:00:00 GMT"})
+
+        assert entry.conditional_headers() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT",
+        }
+        assert make_entry().conditional_headers() == {}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = RevalidationCache(max_entries=2)
+        cache.store(("a",), make_entry())
+        cache.store(("b",), make_entry())
+        cache.get(("a",))
+        cache.store(("c",), make_entry())
+
+        assert cache.get(("a",)) is not None
+        assert cache.get(("b",)) is None
+        assert cache.stats()["entries"] == 2
+
+    def test_refetch_counts_unchanged_content(self):
+        cache = RevalidationCache()
+        cache.store(("a",), make_entry(b'{"x": 1}'))
+        cache.store(("a",), make_entry(b'{"x": 1}'))
+        cache.store(("a",), make_entry(b'{"x": 2}'))
+
+        stats = cache.stats()
+        assert stats["modified"] == 2
+        assert stats["unchanged_content"] == 1
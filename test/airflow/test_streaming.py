@@ -0,0 +1,165 @@
+"""Tests for encoding listing responses page by page."""
+
+import ast
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.airflow.dag import get_dags
+from src.airflow.eventlog import get_event_logs
+from src.airflow.streaming import STREAM_PAGE_LIMIT, ResponseEncoder, encode_pages
+
+
+def _event_logs(total_entries, maximum_page_limit=STREAM_PAGE_LIMIT):
+    """A fake ``get_event_logs`` serving ``total_entries`` entries, at most ``maximum_page_limit`` at a time."""
+
+    def get_event_logs(limit=STREAM_PAGE_LIMIT, offset=0, **kwargs):
+        response = MagicMock()
+        ids = range(offset, min(offset + min(limit, maximum_page_limit), total_entries))
+        response.to_dict.return_value = {
+            "event_logs": [{"event_log_id": i, "event": "paused", "extra": "é" * (i % 3)} for i in ids],
+            "total_entries": total_entries,
+        }
+        return response
+
+    return MagicMock(side_effect=get_event_logs)
+
+
+class TestResponseEncoder:
+    """Test cases for the page by page encoder."""
+
+    def test_pages_are_encoded_as_str_of_the_whole_response(self):
+        encoder = ResponseEncoder("event_logs")
+        encoder.add_page({"event_logs": [{"id": 1}, {"id": "x'y"}], "total_entries": 3})
+        encoder.add_page({"event_logs": [], "total_entries": 3})
+        encoder.add_page({"event_logs": [{"id": None}], "total_entries": 3})
+
+        assert encoder.text() == str({"event_logs": [{"id": 1}, {"id": "x'y"}, {"id": None}], "total_entries": 3})
+
+    @pytest.mark.parametrize(
+        "response",
+        [{}, {"event_logs": [], "total_entries": 0}, {"total_entries": 5, "event_logs": None}, {"dag_id": "d"}],
+    )
+    def test_responses_without_items(self, response):
+        encoder = ResponseEncoder("event_logs")
+        encoder.add_page(response)
+
+        assert encoder.text() == str(response)
+
+    def test_items_past_the_cap_are_truncated(self):
+        items = [{"event_log_id": i, "event": "paused"} for i in range(50)]
+        encoder = ResponseEncoder("event_logs", offset=10, max_bytes=1000)
+
+        assert encoder.add_page({"event_logs": items, "total_entries": 60}) is False
+        text = encoder.text()
+        response = ast.literal_eval(text)
+        assert len(text.encode()) <= 1000
+        assert response["event_logs"] == items[: encoder.returned]
+        assert response["truncated"] is True
+        assert response["next_offset"] == 10 + encoder.returned
+
+
+class TestEncodePages:
+    """Test cases for fetching and encoding a listing a page at a time."""
+
+    def test_small_limit_is_a_single_request(self):
+        fetch = _event_logs(500)
+
+        text = encode_pages(fetch, "event_logs", limit=20, offset=5)
+
+        fetch.assert_called_once_with(limit=20, offset=5)
+        assert text == str(fetch(limit=20, offset=5).to_dict())
+
+    def test_large_limit_is_fetched_page_by_page(self):
+        fetch = _event_logs(1000)
+
+        text = encode_pages(fetch, "event_logs", limit=250, offset=30)
+
+        assert [call.kwargs for call in fetch.call_args_list] == [
+            {"limit": 100, "offset": 30},
+            {"limit": 100, "offset": 130},
+            {"limit": 50, "offset": 230},
+        ]
+        expected = [
+            item for offset in (30, 130, 230) for item in fetch(limit=100, offset=offset).to_dict()["event_logs"]
+        ]
+        assert text == str({"event_logs": expected[:250], "total_entries": 1000})
+
+    def test_fetching_stops_at_the_last_entry(self):
+        fetch = _event_logs(150)
+
+        response = ast.literal_eval(encode_pages(fetch, "event_logs", limit=1000))
+
+        assert fetch.call_count == 2
+        assert len(response["event_logs"]) == 150
+
+    def test_pages_shorter_than_asked_are_not_the_end(self):
+        """A server capping pages below the streamed page size is paged through to the last entry."""
+        fetch = _event_logs(120, maximum_page_limit=50)
+
+        response = ast.literal_eval(encode_pages(fetch, "event_logs", limit=1000))
+
+        assert [call.kwargs["offset"] for call in fetch.call_args_list] == [0, 50, 100]
+        assert [entry["event_log_id"] for entry in response["event_logs"]] == list(range(120))
+
+    def test_pages_are_requested_in_a_stable_order(self):
+        """The order to page through is only requested when there are several pages."""
+        fetch = _event_logs(1000)
+
+        encode_pages(fetch, "event_logs", limit=20, order_by="event_log_id")
+        encode_pages(fetch, "event_logs", limit=200, order_by="event_log_id")
+
+        assert [call.kwargs.get("order_by") for call in fetch.call_args_list] == [None, "event_log_id", "event_log_id"]
+
+    def test_fetching_stops_at_the_size_cap(self):
+        fetch = _event_logs(10_000)
+
+        response = ast.literal_eval(encode_pages(fetch, "event_logs", limit=10_000, max_bytes=20_000))
+
+        assert fetch.call_count < 10
+        assert response["truncated"] is True
+        assert response["next_offset"] == len(response["event_logs"])
+
+
+class TestStreamedTools:
+    """Test cases for tools streaming large listings."""
+
+    @pytest.mark.asyncio
+    async def test_get_event_logs_with_a_large_limit(self):
+        fetch = _event_logs(300)
+        with patch("src.airflow.eventlog.event_log_api.get_event_logs", fetch):
+            result = await get_event_logs(limit=1000, dag_id="dag_1")
+
+        assert fetch.call_args_list[-1].kwargs == {
+            "dag_id": "dag_1",
+            "limit": 100,
+            "offset": 200,
+            "order_by": "event_log_id",
+        }
+        assert len(ast.literal_eval(result[0].text)["event_logs"]) == 300
+
+    @pytest.mark.asyncio
+    async def test_get_event_logs_keeps_the_requested_order(self):
+        fetch = _event_logs(300)
+        with patch("src.airflow.eventlog.event_log_api.get_event_logs", fetch):
+            await get_event_logs(limit=1000, order_by="-dttm")
+
+        assert {call.kwargs["order_by"] for call in fetch.call_args_list} == {"-dttm"}
+
+    @pytest.mark.asyncio
+    async def test_get_dags_adds_ui_urls_to_every_page(self):
+        def fetch(limit, offset, **kwargs):
+            response = MagicMock()
+            response.to_dict.return_value = {
+                "dags": [{"dag_id": f"dag_{i}"} for i in range(offset, min(offset + limit, 120))],
+                "total_entries": 120,
+            }
+            return response
+
+        with patch("src.airflow.dag.dag_api.get_dags", side_effect=fetch):
+            with patch("src.airflow.dag.AIRFLOW_HOST", "http://localhost:8080"):
+                result = await get_dags(limit=500)
+
+        dags = ast.literal_eval(result[0].text)["dags"]
+        assert len(dags) == 120
+        assert dags[-1]["ui_url"] == "http://localhost:8080/dags/dag_119/grid"
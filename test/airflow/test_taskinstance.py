@@ -1,16 +1,23 @@
 """Unit tests for taskinstance module using pytest framework."""
 
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import ANY, MagicMock, patch
 
 import mcp.types as types
 import pytest
 
+from src.airflow.duration_baseline import DurationBaselines
 from src.airflow.taskinstance import (
+    check_task_duration,
+    get_task_duration_baseline,
     get_task_instance,
     list_task_instance_tries,
     list_task_instances,
+    refresh_task_duration_baselines,
+    triage_failures,
     update_task_instance,
 )
+from src.caller_credentials import caller_authorization
 
 
 class TestTaskInstanceModule:
@@ -297,3 +304,304 @@ class TestTaskInstanceModule:
                 if v is not None
             },
         )
+
+
+class TestTaskDurationBaselines:
+    """Test cases for the task duration baseline tools."""
+
+    @pytest.fixture
+    def baselines(self, tmp_path):
+        """Replace the module-level baselines with a store persisted under a temporary directory."""
+        store = DurationBaselines(tmp_path / "baselines.json")
+        with patch("src.airflow.taskinstance.duration_baselines", store):
+            yield store
+
+    @staticmethod
+    def _task_instances(durations, state="success", dag_run_id="run_1"):
+        return [
+            {
+                "dag_id": "dag_1",
+                "task_id": "task_a",
+                "dag_run_id": dag_run_id,
+                "map_index": -1,
+                "try_number": index,
+                "state": state,
+                "duration": duration,
+            }
+            for index, duration in enumerate(durations)
+        ]
+
+    def test_observe_skips_unfinished_and_duplicate_tries(self, baselines):
+        """Only successful tries are counted, and each try only once."""
+        task_instances = self._task_instances([10.0, 20.0]) + self._task_instances([99.0], state="running")
+
+        assert baselines.observe(task_instances) == 2
+        assert baselines.observe(task_instances) == 0
+        assert baselines.summary("dag_1", "task_a")["count"] == 2
+
+    def test_baselines_survive_reload(self, baselines):
+        """Baselines are written to disk and restored by a new store."""
+        task_instances = self._task_instances([float(i) for i in range(1, 101)])
+        baselines.observe(task_instances)
+
+        restored = DurationBaselines(baselines.path)
+
+        assert restored.summary("dag_1", "task_a") == baselines.summary("dag_1", "task_a")
+        assert restored.observe(task_instances[-1:]) == 0
+
+    def test_saves_are_throttled(self, baselines):
+        """Observations within the save interval are only written on flush."""
+        baselines.observe(self._task_instances([1.0]))
+        baselines.observe(self._task_instances([2.0], dag_run_id="run_2"))
+
+        assert DurationBaselines(baselines.path).summary("dag_1", "task_a")["count"] == 1
+
+        baselines.flush()
+
+        assert DurationBaselines(baselines.path).summary("dag_1", "task_a")["count"] == 2
+
+    async def test_callers_do_not_share_baselines(self, baselines):
+        """A caller using its own credentials neither reads nor feeds the baselines of others."""
+        mock_response = MagicMock()
+        mock_response.to_dict.return_value = {"task_instances": self._task_instances([5.0, 7.0])}
+
+        token = caller_authorization.set("Bearer caller-a")
+        try:
+            with patch("src.airflow.taskinstance.task_instance_api.get_task_instances", return_value=mock_response):
+                await refresh_task_duration_baselines(page_size=10)
+            own = await get_task_duration_baseline(dag_id="dag_1", task_id="task_a")
+            caller_authorization.set("Bearer caller-b")
+            other = await get_task_duration_baseline(dag_id="dag_1", task_id="task_a")
+        finally:
+            caller_authorization.reset(token)
+
+        assert "'count': 2" in own[0].text
+        assert "'count': 0" in other[0].text
+        assert baselines.get("dag_1", "task_a") is None
+        assert baselines.poll_cursor is None
+
+    async def test_list_task_instances_feeds_baselines(self, baselines):
+        """Listing task instances updates the baselines as a side effect."""
+        mock_response = MagicMock()
+        mock_response.to_dict.return_value = {"task_instances": self._task_instances([5.0, 7.0])}
+
+        with patch("src.airflow.taskinstance.task_instance_api.get_task_instances", return_value=mock_response):
+            await list_task_instances(dag_id="dag_1", dag_run_id="run_1")
+
+        result = await get_task_duration_baseline(dag_id="dag_1", task_id="task_a")
+        assert "'count': 2" in result[0].text
+
+    @pytest.mark.parametrize(
+        "duration, expected_anomalous",
+        [(50.0, False), (500.0, True)],
+        ids=["within-baseline", "above-p99"],
+    )
+    async def test_check_task_duration(self, baselines, duration, expected_anomalous):
+        """A duration above the requested quantile is flagged as anomalous."""
+        baselines.observe(self._task_instances([float(i) for i in range(1, 101)]))
+
+        result = await check_task_duration(dag_id="dag_1", task_id="task_a", duration=duration)
+
+        assert f"'is_anomalous': {expected_anomalous}" in result[0].text
+
+    async def test_check_task_duration_without_baseline(self, baselines):
+        """Tasks that were never observed report an unknown verdict."""
+        result = await check_task_duration(dag_id="dag_1", task_id="unknown", duration=1.0)
+
+        assert "'is_anomalous': None" in result[0].text
+
+    async def test_refresh_advances_cursor_after_last_page(self, baselines):
+        """Refresh pages through finished task instances and then moves the polling cursor forward."""
+        full_page = MagicMock()
+        full_page.to_dict.return_value = {"task_instances": self._task_instances([1.0, 2.0])}
+        last_page = MagicMock()
+        last_page.to_dict.return_value = {"task_instances": self._task_instances([3.0], dag_run_id="run_2")}
+
+        with patch(
+            "src.airflow.taskinstance.task_instance_api.get_task_instances", side_effect=[full_page, last_page]
+        ) as mock_get:
+            result = await refresh_task_duration_baselines(page_size=2)
+
+        assert mock_get.call_count == 2
+        mock_get.assert_called_with(
+            dag_id="~", dag_run_id="~", offset=2, state=["success"], limit=2, updated_at_lte=ANY
+        )
+        assert mock_get.call_args.kwargs["updated_at_lte"] == baselines.poll_cursor
+        assert "'observed': 3" in result[0].text
+        assert baselines.poll_cursor is not None
+
+    async def test_refresh_keeps_cursor_when_pages_skipped_instances(self, baselines):
+        """Pages listed in a different order repeat and skip instances, so the window is read again next time."""
+        first_page = MagicMock()
+        first_page.to_dict.return_value = {
+            "task_instances": self._task_instances([1.0, 2.0]),
+            "total_entries": 3,
+        }
+        shifted_page = MagicMock()
+        shifted_page.to_dict.return_value = {
+            "task_instances": self._task_instances([1.0]),
+            "total_entries": 3,
+        }
+
+        with patch(
+            "src.airflow.taskinstance.task_instance_api.get_task_instances", side_effect=[first_page, shifted_page]
+        ):
+            result = await refresh_task_duration_baselines(page_size=2)
+
+        assert "'fetched': 3" in result[0].text
+        assert "'is_complete': False" in result[0].text
+        assert baselines.poll_cursor is None
+
+
+class TestTriageFailures:
+    """Test cases for the triage_failures tool."""
+
+    @staticmethod
+    def _response(payload):
+        response = MagicMock()
+        response.to_dict.return_value = payload
+        return response
+
+    @pytest.fixture
+    def failed_fleet(self):
+        """Two failed runs with three failed task instances, plus one cross-matched instance to be ignored."""
+        dag_runs = self._response(
+            {
+                "dag_runs": [
+                    {"dag_id": "dag_1", "dag_run_id": "run_1"},
+                    {"dag_id": "dag_2", "dag_run_id": "run_2"},
+                ]
+            }
+        )
+        task_instances = self._response(
+            {
+                "task_instances": [
+                    {"dag_id": "dag_1", "dag_run_id": "run_1", "task_id": "extract", "try_number": 1},
+                    {"dag_id": "dag_2", "dag_run_id": "run_2", "task_id": "extract", "try_number": 2},
+                    {"dag_id": "dag_2", "dag_run_id": "run_2", "task_id": "load", "try_number": 1},
+                    {"dag_id": "dag_1", "dag_run_id": "run_2", "task_id": "other", "try_number": 1},
+                ]
+            }
+        )
+        with (
+            patch("src.airflow.taskinstance.dag_run_api.get_dag_runs_batch", return_value=dag_runs) as mock_runs,
+            patch(
+                "src.airflow.taskinstance.task_instance_api.get_task_instances_batch", return_value=task_instances
+            ) as mock_task_instances,
+        ):
+            yield mock_runs, mock_task_instances
+
+    @staticmethod
+    def _log(**kwargs):
+        if kwargs["task_id"] == "extract":
+            content = (
+                f"[2024-01-0{kwargs['task_try_number']}T00:00:00] {{taskinstance.py:2905}} ERROR - "
+                f"ConnectionError: port {5000 + kwargs['task_try_number']} refused\nTask failed"
+            )
+        else:
+            content = "[2024-01-01T00:00:00] {standard_task_runner.py:110} ERROR - KeyError: 'customer_id'"
+        return TestTriageFailures._response({"content": content})
+
+    async def test_groups_failures_by_error_signature(self, failed_fleet):
+        """Failures whose errors only differ in volatile details end up in the same group."""
+        mock_runs, mock_task_instances = failed_fleet
+
+        with patch("src.airflow.taskinstance.task_instance_api.get_log", side_effect=self._log) as mock_log:
+            result = await triage_failures(end_date_gte="2024-01-01T00:00:00Z", dag_ids=["dag_1", "dag_2"])
+
+        mock_runs.assert_called_once_with(
+            list_dag_runs_form={
+                "states": ["failed"],
+                "order_by": "-end_date",
+                "page_limit": 50,
+                "end_date_gte": "2024-01-01T00:00:00Z",
+                "dag_ids": ["dag_1", "dag_2"],
+            }
+        )
+        mock_task_instances.assert_called_once_with(
+            list_task_instance_form={
+                "dag_ids": ["dag_1", "dag_2"],
+                "dag_run_ids": ["run_1", "run_2"],
+                "state": ["failed"],
+            }
+        )
+        assert mock_log.call_count == 3
+
+        text = result[0].text
+        assert "'failed_task_instances': 3" in text
+        assert "'signature': 'ConnectionError: port <n> refused', 'count': 2" in text
+        assert "'signature': \"KeyError: 'customer_id'\", 'count': 1" in text
+
+    async def test_stragglers_are_reported_as_timed_out(self, failed_fleet):
+        """Logs that do not arrive within the latency budget are reported instead of awaited."""
+
+        def slow_log(**kwargs):
+            if kwargs["task_id"] == "load":
+                time.sleep(0.5)
+            return self._log(**kwargs)
+
+        with patch("src.airflow.taskinstance.task_instance_api.get_log", side_effect=slow_log):
+            result = await triage_failures(latency_budget_seconds=0.2)
+
+        text = result[0].text
+        assert "'timed_out': [{'dag_id': 'dag_2', 'dag_run_id': 'run_2', 'task_id': 'load', 'try_number': 1}]" in text
+        assert "'count': 2" in text
+
+    async def test_failed_runs_without_failed_task_instances(self):
+        """Runs that failed without a failed task instance, e.g. on a timeout, are triaged without fetching logs."""
+        with (
+            patch(
+                "src.airflow.taskinstance.dag_run_api.get_dag_runs_batch",
+                return_value=self._response({"dag_runs": [{"dag_id": "dag_1", "dag_run_id": "run_1"}]}),
+            ),
+            patch(
+                "src.airflow.taskinstance.task_instance_api.get_task_instances_batch",
+                return_value=self._response({"task_instances": [], "total_entries": 0}),
+            ),
+            patch("src.airflow.taskinstance.task_instance_api.get_log") as mock_log,
+        ):
+            result = await triage_failures()
+
+        mock_log.assert_not_called()
+        assert "'failed_dag_runs': 1, 'failed_task_instances': 0, 'groups': []" in result[0].text
+
+    async def test_failed_task_instances_are_paged_through(self):
+        """A batch listing cut at the server's page size is continued until every failed task instance is in."""
+        task_instances = [
+            {"dag_id": "dag_1", "dag_run_id": "run_1", "task_id": f"task_{i}", "try_number": 1} for i in range(5)
+        ]
+        pages = [
+            self._response({"task_instances": task_instances[:2], "total_entries": 5}),
+            self._response({"task_instances": task_instances[2:4], "total_entries": 5}),
+            self._response({"task_instances": task_instances[4:], "total_entries": 5}),
+        ]
+        with (
+            patch(
+                "src.airflow.taskinstance.dag_run_api.get_dag_runs_batch",
+                return_value=self._response({"dag_runs": [{"dag_id": "dag_1", "dag_run_id": "run_1"}]}),
+            ),
+            patch(
+                "src.airflow.taskinstance.task_instance_api.get_task_instances_batch", side_effect=pages
+            ) as mock_task_instances,
+            patch("src.airflow.taskinstance.task_instance_api.get_log", side_effect=self._log),
+        ):
+            result = await triage_failures()
+
+        forms = [call.kwargs["list_task_instance_form"] for call in mock_task_instances.call_args_list]
+        assert [(form.get("page_offset"), form.get("page_limit")) for form in forms] == [(None, None), (2, 2), (4, 2)]
+        assert "'failed_task_instances': 5" in result[0].text
+        assert "task_instances_truncated" not in result[0].text
+
+    async def test_no_failed_dag_runs(self):
+        """No task instances or logs are fetched when nothing failed."""
+        with (
+            patch(
+                "src.airflow.taskinstance.dag_run_api.get_dag_runs_batch",
+                return_value=self._response({"dag_runs": []}),
+            ),
+            patch("src.airflow.taskinstance.task_instance_api.get_task_instances_batch") as mock_task_instances,
+        ):
+            result = await triage_failures()
+
+        mock_task_instances.assert_not_called()
+        assert "'failed_dag_runs': 0" in result[0].text
@@ -0,0 +1,96 @@
+"""Tests for the JWT token provider."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+
+from src.airflow.token_provider import JwtTokenProvider, endpoint_token_source, file_token_source
+
+
+def make_token(expires_in: float, subject: str = "airflow") -> str:
+    return jwt.encode({"sub": subject, "exp": int(time.time() + expires_in)}, "secret", algorithm="HS256")
+
+
+class TestJwtTokenProvider:
+    """Test cases for JwtTokenProvider."""
+
+    def test_valid_token_is_not_refreshed(self):
+        token = make_token(3600)
+        source = MagicMock()
+        provider = JwtTokenProvider(token, source=source, refresh_margin=60)
+
+        assert provider.authorization() == f"Bearer {token}"
+        assert provider.expires_at == pytest.approx(time.time() + 3600, abs=5)
+        source.assert_not_called()
+
+    def test_token_is_refreshed_ahead_of_expiry(self):
+        fresh = make_token(3600, subject="fresh")
+        provider = JwtTokenProvider(make_token(30), source=MagicMock(return_value=fresh), refresh_margin=60)
+
+        assert provider.authorization() == f"Bearer {fresh}"
+        assert provider.authorization() == f"Bearer {fresh}"
+        provider.source.assert_called_once()
+
+    def test_token_is_fetched_on_first_use(self):
+        token = make_token(3600)
+        provider = JwtTokenProvider(source=MagicMock(return_value=token))
+
+        assert provider.authorization() == f"Bearer {token}"
+
+    def test_failed_refresh_keeps_unexpired_token(self):
+        current = make_token(30)
+        provider = JwtTokenProvider(current, source=MagicMock(side_effect=OSError("unreachable")), refresh_margin=60)
+
+        assert provider.authorization() == f"Bearer {current}"
+
+    def test_failed_refresh_of_expired_token_raises(self):
+        provider = JwtTokenProvider(make_token(-10), source=MagicMock(side_effect=OSError("unreachable")))
+
+        with pytest.raises(OSError):
+            provider.authorization()
+
+    @pytest.mark.parametrize("token", ["test.jwt.token", jwt.encode({"sub": "x"}, "secret")], ids=["opaque", "no_exp"])
+    def test_token_without_expiry_is_kept_until_rejected(self, token):
+        fresh = make_token(3600)
+        provider = JwtTokenProvider(token, source=MagicMock(return_value=fresh))
+
+        assert provider.expires_at is None
+        assert provider.authorization() == f"Bearer {token}"
+        provider.invalidate("Bearer someone-else")
+        assert provider.authorization() == f"Bearer {token}"
+        provider.invalidate(f"Bearer {token}")
+        assert provider.authorization() == f"Bearer {fresh}"
+
+    def test_static_token_is_never_refreshed(self):
+        token = make_token(-10)
+        provider = JwtTokenProvider(token)
+        provider.invalidate(f"Bearer {token}")
+
+        assert not provider.refreshable
+        assert provider.authorization() == f"Bearer {token}"
+
+
+class TestTokenSources:
+    """Test cases for where new tokens come from."""
+
+    def test_file_token_source(self, tmp_path):
+        path = tmp_path / "token"
+        path.write_text("first\n")
+        source = file_token_source(str(path))
+
+        assert source() == "first"
+        path.write_text("second")
+        assert source() == "second"
+
+    def test_endpoint_token_source_posts_credentials(self):
+        with patch("src.airflow.token_provider.httpx.post") as post:
+            post.return_value.json.return_value = {"access_token": "abc"}
+            token = endpoint_token_source("http://airflow/auth/token", "user", "pass")()
+
+        assert token == "abc"
+        post.assert_called_once_with(
+            "http://airflow/auth/token", json={"username": "user", "password": "pass"}, timeout=30
+        )
+        post.return_value.raise_for_status.assert_called_once()
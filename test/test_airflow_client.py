@@ -1,11 +1,20 @@
 """Tests for the airflow client authentication module."""
 
 import base64
+import contextvars
+import gzip
+import json
 import os
 import sys
-from unittest.mock import patch
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import MagicMock, patch
 
-from airflow_client.client import ApiClient
+import pytest
+from airflow_client.client import ApiClient, Configuration
+from airflow_client.client.api.config_api import ConfigApi
+from airflow_client.client.api.monitoring_api import MonitoringApi
+from airflow_client.client.api.pool_api import PoolApi
 
 
 class TestAirflowClientAuthentication:
@@ -133,6 +142,35 @@ class TestAirflowClientAuthentication:
             assert "Authorization" not in getattr(configuration, "api_key", {})
             assert isinstance(api_client, ApiClient)
 
+    def test_refreshable_jwt_configuration(self):
+        """Test that a token endpoint makes the username and password fetch JWTs instead of Basic auth."""
+        with patch.dict(
+            os.environ,
+            {
+                "AIRFLOW_HOST": "http://localhost:8080",
+                "AIRFLOW_USERNAME": "testuser",
+                "AIRFLOW_PASSWORD": "testpass",
+                "AIRFLOW_JWT_TOKEN_URL": "http://localhost:8080/auth/token",
+                "AIRFLOW_JWT_REFRESH_MARGIN": "120",
+                "AIRFLOW_API_VERSION": "v1",
+            },
+            clear=True,
+        ):
+            # Clear any cached modules
+            modules_to_clear = ["src.envs", "src.airflow.airflow_client"]
+            for module in modules_to_clear:
+                if module in sys.modules:
+                    del sys.modules[module]
+
+            # Re-import after setting environment
+            from src.airflow.airflow_client import api_client, configuration
+
+            assert api_client.token_provider.refreshable
+            assert api_client.token_provider.refresh_margin == 120
+            # The credentials are only used against the token endpoint
+            assert configuration.auth_settings() == {}
+            assert "Authorization" not in api_client.default_headers
+
     def test_environment_variable_parsing(self):
         """Test that environment variables are parsed correctly."""
         with patch.dict(
@@ -164,3 +202,312 @@ class TestAirflowClientAuthentication:
             assert configuration.api_key == {"Authorization": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9..."}
             assert configuration.api_key_prefix == {"Authorization": "Bearer"}
             assert api_client.default_headers["Authorization"] == "Bearer eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9..."
+
+
+class _GzipHealthHandler(BaseHTTPRequestHandler):
+    body = json.dumps({"metadatabase": {"status": "healthy"}, "padding": "x" * 10_000}).encode()
+
+    def do_GET(self):
+        self.server.accept_encodings.append(self.headers.get("Accept-Encoding"))
+        payload = self.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAirflowClientCompression:
+    """Test cases for compressed response negotiation and transfer accounting."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _GzipHealthHandler)
+        server.accept_encodings = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def test_requests_are_compressed_and_accounted_per_tool(self, server):
+        from src.airflow import airflow_client
+        from src.metrics import TransferMetrics, current_tool
+
+        metrics = TransferMetrics()
+        client = airflow_client.AirflowApiClient(Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1"))
+        token = current_tool.set("get_health")
+        try:
+            with patch.object(airflow_client, "transfer_metrics", metrics):
+                response = MonitoringApi(client).get_health(_check_return_type=False)
+        finally:
+            current_tool.reset(token)
+
+        assert "gzip" in server.accept_encodings[0]
+        assert response.to_dict()["metadatabase"] == {"status": "healthy"}
+        counters = metrics.snapshot()["tools"]["get_health"]
+        assert counters["requests"] == 1
+        assert counters["decoded_bytes"] == len(_GzipHealthHandler.body)
+        assert counters["wire_bytes"] == len(gzip.compress(_GzipHealthHandler.body))
+        assert counters["compression_ratio"] > 10
+
+    def test_explicit_accept_encoding_is_kept(self, server):
+        from src.airflow import airflow_client
+
+        client = airflow_client.AirflowApiClient(Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1"))
+        client.default_headers["Accept-Encoding"] = "identity"
+        MonitoringApi(client).get_health(_check_return_type=False)
+
+        assert server.accept_encodings == ["identity"]
+
+
+class _ConditionalHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+        if server.etag is not None and self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+        payload = json.dumps(server.payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if server.etag is not None:
+            self.send_header("ETag", server.etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAirflowClientRevalidation:
+    """Test cases for conditional revalidation of rarely changing resources."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _ConditionalHandler)
+        server.requests = []
+        server.etag = '"v1"'
+        server.payload = {"sections": [{"name": "core", "options": [{"key": "dags_folder", "value": "/dags"}]}]}
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def client(self, server):
+        from src.airflow import airflow_client
+        from src.airflow.revalidation import RevalidationCache
+        from src.metrics import TransferMetrics
+
+        with (
+            patch.object(airflow_client, "revalidation_cache", RevalidationCache()) as cache,
+            patch.object(airflow_client, "transfer_metrics", TransferMetrics()),
+        ):
+            client = airflow_client.AirflowApiClient(
+                Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1")
+            )
+            client.cache = cache
+            yield client
+
+    def test_not_modified_is_served_from_cache(self, server, client):
+        first = ConfigApi(client).get_config(_check_return_type=False)
+        second = ConfigApi(client).get_config(_check_return_type=False)
+
+        assert [if_none_match for _, if_none_match, _ in server.requests] == [None, '"v1"']
+        assert second.to_dict() == first.to_dict() == server.payload
+        stats = client.cache.stats()
+        assert stats["not_modified"] == 1
+        assert stats["bytes_saved"] == len(json.dumps(server.payload))
+
+    def test_changed_resource_is_refetched(self, server, client):
+        ConfigApi(client).get_config(_check_return_type=False)
+        server.etag = '"v2"'
+        server.payload = {"sections": []}
+        response = ConfigApi(client).get_config(_check_return_type=False)
+
+        assert response.to_dict() == {"sections": []}
+        assert client.cache.stats()["modified"] == 1
+
+    def test_content_hash_detects_unchanged_body_without_validators(self, server, client):
+        server.etag = None
+        server.payload = {"pools": [], "total_entries": 0}
+        PoolApi(client).get_pools(_check_return_type=False)
+        PoolApi(client).get_pools(_check_return_type=False)
+
+        assert [if_none_match for _, if_none_match, _ in server.requests] == [None, None]
+        stats = client.cache.stats()
+        assert stats["not_modified"] == 0
+        assert stats["unchanged_content"] == 1
+
+    def test_other_resources_are_not_cached(self, server, client):
+        server.payload = {"metadatabase": {"status": "healthy"}}
+        MonitoringApi(client).get_health(_check_return_type=False)
+        MonitoringApi(client).get_health(_check_return_type=False)
+
+        assert [if_none_match for _, if_none_match, _ in server.requests] == [None, None]
+        assert client.cache.stats()["entries"] == 0
+
+
+class _AuthorizationHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.authorizations.append(self.headers.get("Authorization"))
+        payload = json.dumps({"metadatabase": {"status": "healthy"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def call_as(authorization, api_method):
+    from src.caller_credentials import call_with_authorization
+
+    # Run in a copy of the context, like asyncio.to_thread does, so the caller does not leak into other tests
+    return contextvars.copy_context().run(call_with_authorization, authorization, api_method, _check_return_type=False)
+
+
+class TestAirflowClientCallerCredentials:
+    """Test cases for forwarding per-caller credentials."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _AuthorizationHandler)
+        server.authorizations = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def client(self, server):
+        from src.airflow import airflow_client
+
+        configuration = Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1")
+        configuration.username = "server"
+        configuration.password = "secret"
+        return airflow_client.AirflowApiClient(configuration, caller_clients_limit=2)
+
+    def test_server_credentials_are_used_by_default(self, server, client):
+        MonitoringApi(client).get_health(_check_return_type=False)
+
+        assert server.authorizations == ["Basic " + base64.b64encode(b"server:secret").decode()]
+        assert client._caller_rest_clients == {}
+
+    @pytest.mark.parametrize(
+        "authorization, expected",
+        [("Bearer team-a", "Bearer team-a"), ("", None)],
+        ids=["caller_token", "caller_without_credentials"],
+    )
+    def test_caller_authorization_replaces_server_credentials(self, server, client, authorization, expected):
+        call_as(authorization, MonitoringApi(client).get_health)
+
+        assert server.authorizations == [expected]
+        assert list(client._caller_rest_clients) == [authorization]
+
+    def test_each_caller_gets_its_own_pool(self, server, client):
+        for authorization in ["Bearer a", "Bearer b", "Bearer a"]:
+            call_as(authorization, MonitoringApi(client).get_health)
+
+        first = client._caller_rest_client("Bearer a")
+        assert first is not client._caller_rest_client("Bearer b")
+        assert first is not client.rest_client
+        assert first.pool_manager.pools
+        assert server.authorizations == ["Bearer a", "Bearer b", "Bearer a"]
+
+    def test_least_recently_seen_caller_pool_is_closed(self, client):
+        with patch("src.airflow.airflow_client.RESTClientObject", side_effect=lambda _: MagicMock()) as rest_client_cls:
+            first = client._caller_rest_client("Bearer a")
+            second = client._caller_rest_client("Bearer b")
+            client._caller_rest_client("Bearer a")
+            client._caller_rest_client("Bearer c")
+
+        assert list(client._caller_rest_clients) == ["Bearer a", "Bearer c"]
+        assert rest_client_cls.call_count == 3
+        second.pool_manager.clear.assert_called_once()
+        first.pool_manager.clear.assert_not_called()
+
+
+class _TokenCheckingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        authorization = self.headers.get("Authorization")
+        self.server.authorizations.append(authorization)
+        status = 401 if authorization in self.server.rejected else 200
+        payload = json.dumps({"metadatabase": {"status": "healthy"}} if status == 200 else {"title": "Unauthorized"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAirflowClientTokenRefresh:
+    """Test cases for using a refreshed JWT without rebuilding the client."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _TokenCheckingHandler)
+        server.authorizations = []
+        server.rejected = set()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def make_client(self, server, provider):
+        from src.airflow import airflow_client
+
+        return airflow_client.AirflowApiClient(
+            Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1"), token_provider=provider
+        )
+
+    def test_refreshed_token_is_used_by_the_same_client(self, server):
+        from src.airflow.token_provider import JwtTokenProvider
+
+        tokens = iter(["second", "third"])
+        provider = JwtTokenProvider("first", source=lambda: next(tokens))
+        client = self.make_client(server, provider)
+        rest_client = client.rest_client
+
+        MonitoringApi(client).get_health(_check_return_type=False)
+        provider.invalidate("Bearer first")
+        MonitoringApi(client).get_health(_check_return_type=False)
+
+        assert server.authorizations == ["Bearer first", "Bearer second"]
+        assert client.rest_client is rest_client
+        assert client.default_headers["Authorization"] == "Bearer second"
+
+    def test_rejected_token_is_refreshed_and_retried_once(self, server):
+        from airflow_client.client import ApiException
+
+        from src.airflow.token_provider import JwtTokenProvider
+
+        server.rejected = {"Bearer revoked", "Bearer also-revoked"}
+        tokens = iter(["also-revoked", "valid"])
+        client = self.make_client(server, JwtTokenProvider("revoked", source=lambda: next(tokens)))
+
+        with pytest.raises(ApiException) as exc_info:
+            MonitoringApi(client).get_health(_check_return_type=False)
+        response = MonitoringApi(client).get_health(_check_return_type=False)
+
+        assert exc_info.value.status == 401
+        assert server.authorizations == ["Bearer revoked", "Bearer also-revoked", "Bearer also-revoked", "Bearer valid"]
+        assert response.to_dict()["metadatabase"] == {"status": "healthy"}
@@ -0,0 +1,173 @@
+"""Tests for the batch tool."""
+
+import ast
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import mcp.types as types
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.tools import Tool
+
+from src import tracing
+from src.batch import BatchCall, make_batch_tool
+from src.metrics import ToolMetrics, ToolMetricsMiddleware, current_tool
+from src.tracing import FileSpanExporter, TracingMiddleware
+
+
+async def get_variable(key: str) -> list[types.TextContent]:
+    return [types.TextContent(type="text", text=str({"key": key, "value": key.upper()}))]
+
+
+async def delete_variable(key: str) -> list[types.TextContent]:
+    raise RuntimeError(f"Variable {key} is locked")
+
+
+async def which_tool() -> list[types.TextContent]:
+    return [types.TextContent(type="text", text=str(current_tool.get()))]
+
+
+def _tools(*funcs):
+    return {func.__name__: Tool.from_function(func, name=func.__name__, description="") for func in funcs}
+
+
+async def _batch(tools, calls, **kwargs):
+    result = await make_batch_tool(tools)([BatchCall(**call) for call in calls], **kwargs)
+    return ast.literal_eval(result[0].text)
+
+
+class TestBatchTool:
+    """Test cases for calling several tools in one request."""
+
+    @pytest.mark.asyncio
+    async def test_results_and_errors_are_returned_in_order(self):
+        response = await _batch(
+            _tools(get_variable, delete_variable),
+            [
+                {"tool": "get_variable", "arguments": {"key": "a"}},
+                {"tool": "delete_variable", "arguments": {"key": "b"}},
+                {"tool": "get_variable", "arguments": {}},
+                {"tool": "get_variable", "arguments": {"key": "c"}},
+            ],
+        )
+
+        results = response["results"]
+        assert results[0] == {"tool": "get_variable", "result": "{'key': 'a', 'value': 'A'}"}
+        assert results[1] == {"tool": "delete_variable", "error": "RuntimeError: Variable b is locked"}
+        assert results[2]["error"].startswith("ValidationError")
+        assert results[3] == {"tool": "get_variable", "result": "{'key': 'c', 'value': 'C'}"}
+        assert (response["succeeded"], response["failed"]) == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_unknown_tools_are_reported(self):
+        response = await _batch(_tools(get_variable), [{"tool": "delete_variable", "arguments": {"key": "a"}}])
+
+        assert response["results"] == [{"tool": "delete_variable", "error": "Unknown tool 'delete_variable'"}]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited(self):
+        running, peak = 0, 0
+
+        async def slow(key: str) -> list[types.TextContent]:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return [types.TextContent(type="text", text=key)]
+
+        calls = [{"tool": "slow", "arguments": {"key": str(i)}} for i in range(10)]
+        response = await _batch(_tools(slow), calls, max_concurrency=3)
+
+        assert [result["result"] for result in response["results"]] == [str(i) for i in range(10)]
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_calls_running_past_the_timeout_are_cancelled(self):
+        cancelled = asyncio.Event()
+
+        async def hang() -> list[types.TextContent]:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        response = await _batch(
+            _tools(get_variable, hang),
+            [{"tool": "hang"}, {"tool": "get_variable", "arguments": {"key": "a"}}],
+            timeout=0.05,
+        )
+
+        assert response["results"][0] == {"tool": "hang", "error": "Timed out after 0.05 seconds"}
+        assert "result" in response["results"][1]
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_calls_are_accounted_to_the_called_tool(self):
+        response = await _batch(_tools(which_tool), [{"tool": "which_tool"}])
+
+        assert response["results"][0]["result"] == "which_tool"
+
+    @pytest.mark.asyncio
+    async def test_batch_over_mcp(self):
+        tools = _tools(get_variable)
+        app = FastMCP("test")
+        app.add_tool(Tool.from_function(make_batch_tool(tools), name="batch", description=""))
+
+        async with Client(app) as client:
+            result = await client.call_tool(
+                "batch", {"calls": [{"tool": "get_variable", "arguments": {"key": "a"}}], "max_concurrency": 2}
+            )
+
+        response = ast.literal_eval(result.content[0].text)
+        assert response["results"] == [{"tool": "get_variable", "result": "{'key': 'a', 'value': 'A'}"}]
+
+    @pytest.mark.asyncio
+    async def test_blocking_airflow_calls_run_concurrently_and_time_out(self):
+        from src.airflow.dag import get_dag
+
+        def slow_get_dag(dag_id):
+            time.sleep(0.3 if dag_id != "stuck" else 1.5)
+            response = MagicMock()
+            response.to_dict.return_value = {"dag_id": dag_id}
+            return response
+
+        calls = [{"tool": "get_dag", "arguments": {"dag_id": f"dag_{i}"}} for i in range(4)]
+        calls.append({"tool": "get_dag", "arguments": {"dag_id": "stuck"}})
+        started = time.monotonic()
+        with patch("src.airflow.dag.dag_api.get_dag", side_effect=slow_get_dag):
+            response = await _batch(
+                {"get_dag": Tool.from_function(get_dag, name="get_dag", description="")}, calls, timeout=1
+            )
+        elapsed = time.monotonic() - started
+
+        # Serially, the four quick calls alone would take 1.2 seconds
+        assert elapsed < 1.4
+        assert response["succeeded"] == 4
+        assert response["results"][-1] == {"tool": "get_dag", "error": "Timed out after 1 seconds"}
+
+    @pytest.mark.asyncio
+    async def test_calls_go_through_the_middleware(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(tracing, "exporter", FileSpanExporter(str(tmp_path / "traces.jsonl")))
+        metrics = ToolMetrics()
+        tools = _tools(get_variable)
+        app = FastMCP("test", middleware=[TracingMiddleware()])
+        batch = make_batch_tool(tools, [TracingMiddleware(), ToolMetricsMiddleware()])
+        app.add_tool(Tool.from_function(batch, name="batch", description=""))
+
+        with patch("src.metrics.tool_metrics", metrics):
+            async with Client(app) as client:
+                await client.call_tool("batch", {"calls": [{"tool": "get_variable", "arguments": {"key": "a"}}]})
+
+        assert metrics.snapshot()["tools"]["get_variable"]["calls"] == 1
+        spans = [
+            span
+            for line in (tmp_path / "traces.jsonl").read_text().splitlines()
+            for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ]
+        by_name = {span["name"]: span for span in spans}
+        assert by_name["tools/call get_variable"]["parentSpanId"] == by_name["tools/call batch"]["spanId"]
+        assert by_name["tools/call get_variable"]["traceId"] == by_name["tools/call batch"]["traceId"]
@@ -0,0 +1,53 @@
+"""Tests for the caller credentials module."""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from src.caller_credentials import (
+    CallerCredentialsMiddleware,
+    call_with_authorization,
+    caller_authorization,
+    use_server_credentials,
+)
+
+
+class TestCallerCredentials:
+    """Test cases for carrying the caller's credentials through a request."""
+
+    @pytest.mark.asyncio
+    async def test_call_with_authorization_is_local_to_the_thread(self):
+        seen = await asyncio.to_thread(call_with_authorization, "Bearer a", caller_authorization.get)
+
+        assert seen == "Bearer a"
+        assert caller_authorization.get() is None
+
+    @pytest.mark.asyncio
+    async def test_background_task_uses_server_credentials(self):
+        async def background():
+            use_server_credentials()
+            return caller_authorization.get()
+
+        token = caller_authorization.set("Bearer a")
+        try:
+            task = asyncio.create_task(background())
+        finally:
+            caller_authorization.reset(token)
+
+        assert await task is None
+
+    @pytest.mark.asyncio
+    async def test_middleware_without_http_request(self):
+        app = FastMCP("test", middleware=[CallerCredentialsMiddleware()])
+
+        @app.tool
+        def which_credentials() -> str:
+            return repr(caller_authorization.get())
+
+        async with Client(app) as client:
+            result = await client.call_tool("which_credentials")
+
+        # In-memory and stdio sessions carry no HTTP headers, the caller is treated as sending no credentials
+        assert result.data == "''"
+        assert caller_authorization.get() is None
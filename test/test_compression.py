@@ -0,0 +1,144 @@
+"""Tests for the HTTP response compression middleware."""
+
+import asyncio
+import gzip
+import zlib
+from unittest.mock import patch
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from src import compression
+from src.compression import CompressionMiddleware, select_encoding
+
+LARGE_BODY = "dag_id=example_dag " * 10_000
+
+
+async def large(request):
+    return PlainTextResponse(LARGE_BODY)
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def events(request):
+    async def stream():
+        for i in range(3):
+            yield f"event: message\ndata: {i}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def call_asgi(app, path):
+    """Call the app directly and return every message it sends, as the server would see them."""
+    messages = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client stays connected until the response is complete
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [(b"accept-encoding", b"gzip")]}
+    scope["query_string"] = b""
+    await app(scope, receive, send)
+    return messages
+
+
+def make_app(**kwargs):
+    app = Starlette(routes=[Route("/large", large), Route("/small", small), Route("/events", events)])
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return app
+
+
+class TestSelectEncoding:
+    """Test cases for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            ("gzip, deflate", "gzip"),
+            ("", None),
+            ("identity", None),
+            ("gzip;q=0", None),
+            ("*", "gzip"),
+            ("br", None),
+        ],
+        ids=["gzip", "empty", "identity", "gzip-refused", "wildcard", "br-without-brotli"],
+    )
+    def test_without_brotli(self, accept_encoding, expected):
+        with patch.object(compression, "brotli", None):
+            assert select_encoding(accept_encoding) == expected
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [("gzip, br", "br"), ("gzip;q=1.0, br;q=0.5", "gzip"), ("br;q=0, gzip", "gzip")],
+        ids=["br-preferred-on-tie", "higher-quality-wins", "br-refused"],
+    )
+    def test_with_brotli(self, accept_encoding, expected):
+        with patch.object(compression, "brotli", object()):
+            assert select_encoding(accept_encoding) == expected
+
+
+class TestCompressionMiddleware:
+    """Test cases for compressing responses."""
+
+    @pytest.mark.asyncio
+    async def test_large_response_is_gzipped(self):
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert "content-length" not in response.headers
+        assert response.text == LARGE_BODY
+
+    @pytest.mark.asyncio
+    async def test_small_response_is_not_compressed(self):
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+
+    @pytest.mark.asyncio
+    async def test_identity_is_sent_when_not_accepted(self):
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-length"] == str(len(LARGE_BODY))
+
+    @pytest.mark.asyncio
+    async def test_large_body_is_sent_in_chunks(self):
+        messages = await call_asgi(make_app(chunk_size=16 * 1024), "/large")
+
+        bodies = [message for message in messages if message["type"] == "http.response.body"]
+        assert len(bodies) > 1
+        assert all(message["more_body"] for message in bodies[:-1])
+        assert gzip.decompress(b"".join(message["body"] for message in bodies)).decode() == LARGE_BODY
+
+    @pytest.mark.asyncio
+    async def test_streamed_events_are_flushed_individually(self):
+        messages = await call_asgi(make_app(), "/events")
+
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        decoded = []
+        for message in messages:
+            if message["type"] == "http.response.body" and message["more_body"]:
+                decoded.append(decompressor.decompress(message["body"]).decode())
+        # Every event can be decoded as soon as its message arrives, without waiting for the end of the stream
+        assert [chunk for chunk in decoded if chunk] == [f"event: message\ndata: {i}\n\n" for i in range(3)]
@@ -0,0 +1,139 @@
+"""Tests for the per-request batching loaders."""
+
+import asyncio
+import threading
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from src.loaders import BatchLoader, RequestLoadersMiddleware, request_loader
+
+
+class _RecordingBatchFn:
+    def __init__(self, values=None, error=None):
+        self.values = values
+        self.error = error
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, keys):
+        with self.lock:
+            self.calls.append(list(keys))
+        if self.error is not None:
+            raise self.error
+        if self.values is not None:
+            return {key: self.values[key] for key in keys if key in self.values}
+        return {key: key.upper() for key in keys}
+
+
+class TestBatchLoader:
+    """Test cases for collecting keys into batches."""
+
+    @pytest.mark.asyncio
+    async def test_keys_loaded_in_the_same_tick_share_a_batch(self):
+        batch_fn = _RecordingBatchFn()
+        loader = BatchLoader(batch_fn)
+
+        results = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"))
+
+        assert results == ["A", "B", "A"]
+        assert batch_fn.calls == [["a", "b"]]
+        assert loader.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_loaded_keys_are_cached(self):
+        batch_fn = _RecordingBatchFn()
+        loader = BatchLoader(batch_fn)
+
+        assert await loader.load("a") == "A"
+        assert await loader.load_many(["a", "b"]) == ["A", "B"]
+
+        assert batch_fn.calls == [["a"], ["b"]]
+
+    @pytest.mark.asyncio
+    async def test_batches_are_split_at_max_batch_size(self):
+        batch_fn = _RecordingBatchFn()
+        loader = BatchLoader(batch_fn, max_batch_size=2)
+
+        assert await loader.load_many(["a", "b", "c"]) == ["A", "B", "C"]
+
+        assert sorted(batch_fn.calls) == [["a", "b"], ["c"]]
+
+    @pytest.mark.asyncio
+    async def test_missing_keys_fail_with_key_error(self):
+        loader = BatchLoader(_RecordingBatchFn(values={"a": 1}))
+
+        results = await loader.load_many(["a", "b"])
+
+        assert results[0] == 1
+        assert isinstance(results[1], KeyError)
+        with pytest.raises(KeyError):
+            await loader.load("b")
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_fails_every_key_of_the_batch(self):
+        loader = BatchLoader(_RecordingBatchFn(error=RuntimeError("Airflow unavailable")))
+
+        results = await loader.load_many(["a", "b"])
+
+        assert [str(result) for result in results] == ["Airflow unavailable", "Airflow unavailable"]
+
+    @pytest.mark.asyncio
+    async def test_primed_values_are_not_loaded(self):
+        batch_fn = _RecordingBatchFn()
+        loader = BatchLoader(batch_fn)
+        loader.prime("a", "from listing")
+
+        assert await loader.load_many(["a", "b"]) == ["from listing", "B"]
+        assert batch_fn.calls == [["b"]]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_load(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_batch_fn(keys):
+            started.set()
+            release.wait(5)
+            return {key: key for key in keys}
+
+        loader = BatchLoader(slow_batch_fn)
+        first = asyncio.ensure_future(loader.load("a"))
+        second = asyncio.ensure_future(loader.load("a"))
+        await asyncio.to_thread(started.wait, 5)
+        first.cancel()
+        release.set()
+
+        assert await second == "a"
+        assert first.cancelled()
+
+
+class TestRequestLoaders:
+    """Test cases for scoping loaders to a tool call."""
+
+    @pytest.mark.asyncio
+    async def test_outside_a_tool_call_loaders_are_not_shared(self):
+        batch_fn = _RecordingBatchFn()
+
+        assert request_loader("letters", batch_fn) is not request_loader("letters", batch_fn)
+
+    @pytest.mark.asyncio
+    async def test_loaders_are_shared_within_a_tool_call_only(self):
+        batch_fn = _RecordingBatchFn()
+        app = FastMCP("test", middleware=[RequestLoadersMiddleware()])
+
+        @app.tool
+        async def upper(keys: list[str]) -> list[str]:
+            # Separate lookups of the same call are answered from the same cache
+            first = await request_loader("letters", batch_fn).load_many(keys)
+            second = await request_loader("letters", batch_fn).load_many(keys)
+            assert first == second
+            return first
+
+        async with Client(app) as client:
+            first = await client.call_tool("upper", {"keys": ["a", "b"]})
+            second = await client.call_tool("upper", {"keys": ["a"]})
+
+        assert first.data == ["A", "B"]
+        assert second.data == ["A"]
+        assert batch_fn.calls == [["a", "b"], ["a"]]
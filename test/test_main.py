@@ -1,12 +1,17 @@
 """Tests for the main module using pytest framework."""
 
+import ast
+import os
+import subprocess
+import sys
 from unittest.mock import patch
 
 import pytest
 from click.testing import CliRunner
+from fastmcp.tools import Tool
 
 from src.enums import APIType
-from src.main import APITYPE_TO_FUNCTIONS, Tool, main
+from src.main import APITYPE_TO_FUNCTIONS, main
 
 
 class TestMain:
@@ -31,6 +36,24 @@ class TestMain:
         actual_keys = set(APITYPE_TO_FUNCTIONS.keys())
         assert expected_keys == actual_keys
 
+    def test_only_selected_api_modules_are_imported(self):
+        """Test that API modules are imported when their functions are requested, not with src.main."""
+        script = (
+            "import sys\n"
+            "from src.enums import APIType\n"
+            "from src.main import APITYPE_TO_FUNCTIONS\n"
+            "imported = lambda: sorted(m for m in sys.modules if m.startswith('src.airflow.'))\n"
+            "print(imported())\n"
+            "APITYPE_TO_FUNCTIONS[APIType.DAG]()\n"
+            "print('src.airflow.dag' in imported(), 'src.airflow.xcom' in imported())\n"
+        )
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True, cwd=repo_root
+        )
+
+        assert result.stdout.splitlines() == ["[]", "True False"]
+
     @patch("src.server.app")
     def test_main_default_options(self, mock_app, runner):
         """Test main function with default options."""
@@ -187,6 +210,68 @@ class TestMain:
         expected_params["host"] = host if host else "0.0.0.0"
         mock_app.run.assert_called_once_with(transport=transport, **expected_params)
 
+    @pytest.mark.parametrize("transport", ["sse", "http"])
+    @patch("src.server.app")
+    def test_http_compression_can_be_enabled(self, mock_app, transport, runner):
+        """Test that --http-compression installs the response compression middleware on SSE and HTTP transports."""
+        from src.compression import CompressionMiddleware
+
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: []}, clear=True):
+            result = runner.invoke(
+                main,
+                [
+                    "--transport",
+                    transport,
+                    "--apis",
+                    "config",
+                    "--http-compression",
+                    "--http-compression-min-size",
+                    "2048",
+                ],
+            )
+
+        assert result.exit_code == 0
+        (middleware,) = mock_app.run.call_args.kwargs["middleware"]
+        assert middleware.cls is CompressionMiddleware
+        assert middleware.kwargs == {"minimum_size": 2048}
+
+    @patch("src.server.app")
+    def test_http_compression_can_be_disabled(self, mock_app, runner):
+        """Test that --no-http-compression runs without compression middleware."""
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: []}, clear=True):
+            result = runner.invoke(main, ["--transport", "http", "--apis", "config", "--no-http-compression"])
+
+        assert result.exit_code == 0
+        mock_app.run.assert_called_once_with(transport="http", port=8000, host="0.0.0.0")
+
+    @pytest.mark.parametrize(
+        "transport, installed", [("http", True), ("sse", True), ("stdio", False)], ids=["http", "sse", "stdio"]
+    )
+    @patch("src.server.app")
+    def test_per_caller_credentials(self, mock_app, transport, installed, runner):
+        """Test that --per-caller-credentials installs the credentials middleware on SSE and HTTP transports."""
+        from src.caller_credentials import CallerCredentialsMiddleware
+
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: []}, clear=True):
+            result = runner.invoke(main, ["--transport", transport, "--apis", "config", "--per-caller-credentials"])
+
+        assert result.exit_code == 0
+        added = [call.args[0] for call in mock_app.add_middleware.call_args_list]
+        assert any(isinstance(middleware, CallerCredentialsMiddleware) for middleware in added) is installed
+
+    @pytest.mark.parametrize("transport, subscribable", [("http", False), ("stdio", True)], ids=["http", "stdio"])
+    @patch("src.server.app")
+    def test_per_caller_credentials_leave_out_subscriptions(self, mock_app, transport, subscribable, runner):
+        """Test that DAG run subscriptions, polled with the server's credentials, are not offered to callers."""
+        with (
+            patch.dict(APITYPE_TO_FUNCTIONS, {APIType.DAGRUN: lambda: []}, clear=True),
+            patch("src.subscriptions.register_dag_run_subscriptions") as mock_register,
+        ):
+            result = runner.invoke(main, ["--transport", transport, "--apis", "dagrun", "--per-caller-credentials"])
+
+        assert result.exit_code == 0
+        mock_register.assert_called_once_with(mock_app, subscribable=subscribable)
+
     @pytest.mark.parametrize("api_name", [api.value for api in APIType])
     @patch("src.server.app")
     def test_individual_api_selection(self, mock_app, api_name, runner):
@@ -297,6 +382,64 @@ class TestMain:
         assert "another_read_function" in registered_names
         assert "write_function" not in registered_names
 
+    @pytest.mark.asyncio
+    @patch("src.server.app")
+    async def test_batch_tool_honors_read_only_mode(self, mock_app, runner):
+        """Test that the batch tool cannot call tools excluded in read-only mode."""
+
+        async def read_function() -> str:
+            return "read"
+
+        async def write_function() -> str:
+            return "written"
+
+        mock_functions = [
+            (read_function, "read_function", "Read function", True),
+            (write_function, "write_function", "Write function", False),
+        ]
+
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: mock_functions}, clear=True):
+            result = runner.invoke(main, ["--read-only", "--apis", "config", "--batch-tool"])
+
+        assert result.exit_code == 0
+        batch_tool = mock_app.add_tool.call_args_list[-1].args[0]
+        assert batch_tool.name == "batch"
+        result = await batch_tool.run({"calls": [{"tool": "read_function"}, {"tool": "write_function"}]})
+        assert ast.literal_eval(result.content[0].text)["results"] == [
+            {"tool": "read_function", "result": "read"},
+            {"tool": "write_function", "error": "Unknown tool 'write_function'"},
+        ]
+
+    @patch("src.server.app")
+    def test_batch_tool_is_off_by_default(self, mock_app, runner):
+        """Test that the batch tool is only registered with --batch-tool."""
+        mock_functions = [(lambda: None, "test_function", "Test description")]
+
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: mock_functions}, clear=True):
+            result = runner.invoke(main, ["--apis", "config"])
+
+        assert result.exit_code == 0
+        assert [call.args[0].name for call in mock_app.add_tool.call_args_list] == ["test_function"]
+
+    @patch("src.server.app")
+    def test_profiling_is_off_by_default(self, mock_app, runner):
+        """Test that the profile tool and signal handler are only installed with --profiling."""
+        mock_functions = [(lambda: None, "test_function", "Test description")]
+
+        with patch.dict(APITYPE_TO_FUNCTIONS, {APIType.CONFIG: lambda: mock_functions}, clear=True):
+            with patch("src.profiling.install_signal_handler") as install_signal_handler:
+                result = runner.invoke(main, ["--apis", "config"])
+                assert not install_signal_handler.called
+                result = runner.invoke(main, ["--apis", "config", "--profiling"])
+
+        assert result.exit_code == 0
+        install_signal_handler.assert_called_once_with()
+        assert [call.args[0].name for call in mock_app.add_tool.call_args_list] == [
+            "test_function",
+            "test_function",
+            "profile_server",
+        ]
+
     @patch("src.server.app")
     def test_main_read_only_mode_with_no_read_functions(self, mock_app, runner):
         """Test main function with read-only flag when API has no read-only functions."""
@@ -0,0 +1,176 @@
+"""Tests for the metrics module."""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from src import metrics
+from src.metrics import (
+    NO_TOOL,
+    CallStats,
+    CurrentToolMiddleware,
+    ToolMetrics,
+    ToolMetricsMiddleware,
+    TransferMetrics,
+    current_call,
+    current_tool,
+    timed,
+)
+
+
+class TestTransferMetrics:
+    """Test cases for per-tool transfer counters."""
+
+    def test_record_is_attributed_to_current_tool(self):
+        metrics = TransferMetrics()
+        token = current_tool.set("get_dags")
+        try:
+            metrics.record(wire_bytes=100, decoded_bytes=800)
+            metrics.record(wire_bytes=50, decoded_bytes=200)
+        finally:
+            current_tool.reset(token)
+        metrics.record(wire_bytes=10, decoded_bytes=10)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["tools"]["get_dags"] == {
+            "requests": 2,
+            "wire_bytes": 150,
+            "decoded_bytes": 1000,
+            "compression_ratio": 6.67,
+        }
+        assert snapshot["tools"][NO_TOOL]["compression_ratio"] == 1.0
+        assert snapshot["total"]["requests"] == 3
+        assert snapshot["total"]["wire_bytes"] == 160
+
+    def test_empty_body_has_no_ratio(self):
+        metrics = TransferMetrics()
+        metrics.record(wire_bytes=0, decoded_bytes=0, tool="delete_pool")
+
+        assert metrics.snapshot()["tools"]["delete_pool"]["compression_ratio"] is None
+
+    def test_reset(self):
+        metrics = TransferMetrics()
+        metrics.record(wire_bytes=1, decoded_bytes=1, tool="get_health")
+        metrics.reset()
+
+        assert metrics.snapshot() == {
+            "tools": {},
+            "total": {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0, "compression_ratio": None},
+        }
+
+
+class TestCurrentToolMiddleware:
+    """Test cases for exposing the called tool's name."""
+
+    @pytest.mark.asyncio
+    async def test_current_tool_is_set_during_call(self):
+        app = FastMCP("test", middleware=[CurrentToolMiddleware()])
+
+        @app.tool
+        def which_tool() -> str:
+            return current_tool.get()
+
+        async with Client(app) as client:
+            result = await client.call_tool("which_tool")
+
+        assert result.data == "which_tool"
+        assert current_tool.get() is None
+
+
+class TestToolMetrics:
+    """Test cases for per-tool call metrics."""
+
+    def test_snapshot_estimates_percentiles_from_the_histogram(self):
+        tool_metrics = ToolMetrics()
+        for _ in range(9):
+            tool_metrics.record("get_dag", 0.02, error=False, sent_bytes=100)
+        tool_metrics.record("get_dag", 0.4, error=True, sent_bytes=0, amounts={"upstream_requests": 2})
+
+        counters = tool_metrics.snapshot()["tools"]["get_dag"]
+        assert (counters["calls"], counters["errors"]) == (10, 1)
+        assert counters["mean_ms"] == 58.0
+        # 9 calls in the (0.01, 0.025] bucket, 1 in (0.25, 0.5]
+        assert 10 < counters["p50_ms"] <= 25
+        assert 250 < counters["p99_ms"] <= 500
+        assert counters["sent_bytes"] == 900
+        assert counters["upstream_requests"] == 2
+
+    def test_calls_slower_than_the_last_bucket(self):
+        tool_metrics = ToolMetrics()
+        tool_metrics.record("get_event_logs", 120, error=False, sent_bytes=0)
+
+        assert tool_metrics.snapshot()["tools"]["get_event_logs"]["p99_ms"] == 60000
+
+    def test_prometheus_exposition(self):
+        tool_metrics = ToolMetrics()
+        tool_metrics.record("get_dag", 0.02, error=False, sent_bytes=100, amounts={"upstream_seconds": 0.015})
+        tool_metrics.record("get_dag", 0.2, error=True, sent_bytes=0)
+
+        lines = tool_metrics.prometheus().splitlines()
+        assert "# TYPE mcp_tool_duration_seconds histogram" in lines
+        assert 'mcp_tool_calls_total{tool="get_dag"} 2' in lines
+        assert 'mcp_tool_errors_total{tool="get_dag"} 1' in lines
+        assert 'mcp_tool_duration_seconds_bucket{tool="get_dag",le="0.025"} 1' in lines
+        assert 'mcp_tool_duration_seconds_bucket{tool="get_dag",le="0.25"} 2' in lines
+        assert 'mcp_tool_duration_seconds_bucket{tool="get_dag",le="+Inf"} 2' in lines
+        assert 'mcp_tool_duration_seconds_count{tool="get_dag"} 2' in lines
+        assert 'mcp_tool_upstream_seconds_total{tool="get_dag"} 0.015' in lines
+
+    def test_timed_adds_to_the_current_call_only(self):
+        @timed("serialization")
+        def to_dict():
+            return {}
+
+        to_dict()
+        call = CallStats()
+        token = current_call.set(call)
+        try:
+            to_dict()
+        finally:
+            current_call.reset(token)
+
+        assert call.amounts["serialization_seconds"] > 0
+
+
+class TestToolMetricsMiddleware:
+    """Test cases for recording tool calls."""
+
+    @pytest.fixture
+    def tool_metrics(self, monkeypatch):
+        tool_metrics = ToolMetrics()
+        monkeypatch.setattr(metrics, "tool_metrics", tool_metrics)
+        return tool_metrics
+
+    @pytest.mark.asyncio
+    async def test_calls_errors_and_upstream_work_are_recorded(self, tool_metrics):
+        app = FastMCP("test", middleware=[ToolMetricsMiddleware()])
+
+        @app.tool
+        async def get_dag() -> str:
+            def fetch():
+                # Upstream requests run in worker threads, and still count for the call
+                current_call.get().add(upstream_requests=1, upstream_seconds=0.01)
+                metrics.transfer_metrics.record(wire_bytes=300, decoded_bytes=1200)
+
+            await asyncio.to_thread(fetch)
+            return "dag"
+
+        @app.tool
+        def delete_dag() -> str:
+            raise RuntimeError("locked")
+
+        async with Client(app) as client:
+            await client.call_tool("get_dag")
+            with pytest.raises(ToolError):
+                await client.call_tool("delete_dag")
+
+        tools = tool_metrics.snapshot()["tools"]
+        assert tools["get_dag"]["calls"] == 1
+        assert tools["get_dag"]["errors"] == 0
+        assert tools["get_dag"]["upstream_requests"] == 1
+        assert tools["get_dag"]["received_bytes"] == 300
+        assert tools["get_dag"]["sent_bytes"] == 3
+        assert tools["delete_dag"]["errors"] == 1
+        assert current_call.get() is None
@@ -0,0 +1,111 @@
+"""Tests for the profiling module."""
+
+import ast
+import os
+import signal
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src import profiling
+from src.metrics import ToolMetrics
+from src.profiling import SamplingProfiler, install_signal_handler, profile_server, write_profile
+
+
+def deserialize(seconds):
+    # Named after ApiClient.deserialize, in a file named like it, to be accounted as deserialization
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+deserialize.__code__ = deserialize.__code__.replace(co_filename="/venv/site-packages/airflow_client/api_client.py")
+
+
+def busy(seconds):
+    deserialize(seconds)
+
+
+@pytest.fixture
+def tool_metrics():
+    with patch.object(profiling, "tool_metrics", ToolMetrics()) as metrics:
+        yield metrics
+
+
+class TestSamplingProfiler:
+    """Test cases for sampling thread stacks."""
+
+    def test_busy_thread_is_sampled_and_idle_threads_are_not(self):
+        idle = threading.Event()
+        idle_thread = threading.Thread(target=idle.wait, daemon=True)
+        idle_thread.start()
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        busy(0.2)
+        profiler.stop()
+        idle.set()
+
+        report = profiler.report(top=100)
+        assert profiler.samples > 0
+        assert report["categories_percent"] == {"deserialization": 100.0, "serialization": 0.0}
+        assert report["top_self"][0]["function"].startswith("deserialize (airflow_client/api_client.py:")
+        assert any(entry["function"].startswith("busy (") for entry in report["top_total"])
+        assert all("wait (" not in entry["function"] for entry in report["top_self"])
+
+    def test_collapsed_stacks_are_written(self, tmp_path):
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        busy(0.05)
+        profiler.stop()
+
+        path = write_profile(profiler, str(tmp_path))
+        lines = open(path).read().splitlines()
+        assert os.path.basename(path).startswith(f"profile-{os.getpid()}-")
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sum(profiler.stacks.values())
+        assert any(
+            "test_profiling.py);deserialize (airflow_client/api_client.py)" in line.rsplit(" ", 1)[0] for line in lines
+        )
+
+
+class TestProfileServer:
+    """Test cases for the profile_server tool."""
+
+    @pytest.mark.asyncio
+    async def test_profile_stops_after_the_given_tool_calls(self, tool_metrics, tmp_path):
+        timer = threading.Timer(0.1, tool_metrics.record, ("get_dags", 0.1, False, 0))
+        timer.start()
+        with patch.object(profiling, "write_profile", lambda profiler: write_profile(profiler, str(tmp_path))):
+            result = await profile_server(seconds=30, tool_calls=1)
+
+        report = ast.literal_eval(result[0].text)
+        assert report["tool_calls"] == 1
+        assert report["duration_seconds"] < 5
+        assert os.path.dirname(report["file"]) == str(tmp_path)
+
+    @pytest.mark.asyncio
+    async def test_one_profile_at_a_time(self, tool_metrics):
+        with profiling._profile_lock:
+            result = await profile_server(seconds=1)
+
+        assert ast.literal_eval(result[0].text) == {"error": "A profile is already being taken"}
+
+
+class TestSignalHandler:
+    """Test cases for profiling on a signal."""
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="SIGUSR2 is POSIX only")
+    def test_signal_profiles_in_the_background(self, tmp_path):
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            with patch.object(profiling, "write_profile", lambda profiler: write_profile(profiler, str(tmp_path))):
+                assert install_signal_handler(seconds=0.05)
+                os.kill(os.getpid(), signal.SIGUSR2)
+                deadline = time.monotonic() + 5
+                while not list(tmp_path.iterdir()) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+        assert len(list(tmp_path.iterdir())) == 1
@@ -89,3 +89,26 @@ class TestServer:
         assert app is not None
         assert hasattr(app, "name")
         assert app.name == "mcp-apache-airflow"
+
+
+class TestMetricsEndpoint:
+    """Test cases for the Prometheus endpoint of the HTTP transports."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_served_in_prometheus_format(self):
+        import httpx
+
+        from src.metrics import tool_metrics
+        from src.server import METRICS_CONTENT_TYPE, app
+
+        tool_metrics.record("get_dag", 0.02, error=False, sent_bytes=10)
+        try:
+            transport = httpx.ASGITransport(app=app.http_app())
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/metrics")
+        finally:
+            tool_metrics.reset()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == METRICS_CONTENT_TYPE
+        assert 'mcp_tool_calls_total{tool="get_dag"} 1' in response.text.splitlines()
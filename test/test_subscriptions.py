@@ -0,0 +1,174 @@
+"""Tests for the DAG run subscriptions module using pytest framework."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import mcp.types as types
+import pytest
+from fastmcp import FastMCP
+
+from src.subscriptions import DAG_RUN_URI_TEMPLATE, DagRunSubscriptions, read_dag_run, register_dag_run_subscriptions
+
+URI = "airflow://dags/dag_1/dagRuns/run_1"
+OTHER_URI = "airflow://dags/dag_2/dagRuns/run_2"
+
+
+def _response(payload):
+    response = MagicMock()
+    response.to_dict.return_value = payload
+    return response
+
+
+class TestDagRunSubscriptions:
+    """Test cases for the shared DAG run poller."""
+
+    @pytest.fixture
+    def dag_run_state(self):
+        """Mutable state of the DAG runs served by the mocked API."""
+        return {"run_1": "running", "run_2": "queued"}
+
+    @pytest.fixture
+    def mock_dag_run_api(self, dag_run_state):
+        """Mock the DAG run API with runs whose state can be changed by the test."""
+        with patch("src.subscriptions.dag_run_api") as mock_api:
+            mock_api.get_dag_run.side_effect = lambda dag_id, dag_run_id: _response(
+                {"dag_id": dag_id, "dag_run_id": dag_run_id, "state": dag_run_state[dag_run_id]}
+            )
+            mock_api.get_dag_runs.side_effect = lambda **kwargs: _response(
+                {
+                    "dag_runs": [
+                        {"dag_id": "dag_1", "dag_run_id": "run_1", "state": dag_run_state["run_1"]},
+                        {"dag_id": "dag_2", "dag_run_id": "run_2", "state": dag_run_state["run_2"]},
+                        {"dag_id": "dag_3", "dag_run_id": "unwatched", "state": "success"},
+                    ]
+                }
+            )
+            yield mock_api
+
+    @pytest.fixture
+    async def subscriptions(self):
+        """A subscription registry whose background poller never fires during a test."""
+        subscriptions = DagRunSubscriptions(poll_interval=3600)
+        yield subscriptions
+        if subscriptions._poller is not None:
+            subscriptions._poller.cancel()
+
+    async def test_watchers_of_the_same_run_share_upstream_requests(
+        self, subscriptions, mock_dag_run_api, dag_run_state
+    ):
+        """Many sessions on one run cost one baseline fetch and one listing per poll."""
+        sessions = [AsyncMock() for _ in range(5)]
+        for session in sessions:
+            await subscriptions.subscribe(URI, session)
+
+        dag_run_state["run_1"] = "success"
+        changed = await subscriptions.poll_once()
+
+        assert changed == {URI}
+        mock_dag_run_api.get_dag_run.assert_called_once_with(dag_id="dag_1", dag_run_id="run_1")
+        assert mock_dag_run_api.get_dag_runs.call_count == 1
+        assert mock_dag_run_api.get_dag_runs.call_args.kwargs["dag_id"] == "dag_1"
+        for session in sessions:
+            session.send_resource_updated.assert_awaited_once()
+
+    async def test_unchanged_runs_are_not_notified(self, subscriptions, mock_dag_run_api):
+        """Polling without state changes sends no notifications."""
+        session = AsyncMock()
+        await subscriptions.subscribe(URI, session)
+
+        assert await subscriptions.poll_once() == set()
+        session.send_resource_updated.assert_not_awaited()
+
+    async def test_runs_of_several_dags_use_one_wildcard_listing(self, subscriptions, mock_dag_run_api, dag_run_state):
+        """Watching runs of different DAGs still costs a single listing per poll."""
+        await subscriptions.subscribe(URI, AsyncMock())
+        await subscriptions.subscribe(OTHER_URI, AsyncMock())
+
+        dag_run_state["run_2"] = "running"
+        changed = await subscriptions.poll_once()
+
+        assert changed == {OTHER_URI}
+        mock_dag_run_api.get_dag_runs.assert_called_once()
+        assert mock_dag_run_api.get_dag_runs.call_args.kwargs["dag_id"] == "~"
+
+    async def test_last_unsubscribe_stops_polling(self, subscriptions, mock_dag_run_api):
+        """The poller only runs while someone is subscribed."""
+        session = AsyncMock()
+        await subscriptions.subscribe(URI, session)
+
+        subscriptions.unsubscribe(URI, session)
+
+        assert subscriptions._poller is None
+        assert await subscriptions.poll_once() == set()
+        mock_dag_run_api.get_dag_runs.assert_not_called()
+
+    async def test_unreachable_sessions_are_dropped(self, subscriptions, mock_dag_run_api, dag_run_state):
+        """A session that fails to receive a notification is unsubscribed."""
+        broken_session = AsyncMock()
+        broken_session.send_resource_updated.side_effect = RuntimeError("closed")
+        healthy_session = AsyncMock()
+        await subscriptions.subscribe(URI, broken_session)
+        await subscriptions.subscribe(URI, healthy_session)
+
+        dag_run_state["run_1"] = "failed"
+        await subscriptions.poll_once()
+
+        assert subscriptions._subscribers[URI] == {healthy_session}
+
+    async def test_long_listings_are_continued_before_the_window_moves(self, subscriptions, mock_dag_run_api):
+        """A listing cut short by the page budget is resumed by the next poll from the same window."""
+        await subscriptions.subscribe(URI, AsyncMock())
+        full_page = _response({"dag_runs": [{"dag_id": "dag_1", "dag_run_id": f"other_{i}"} for i in range(100)]})
+        last_page = _response({"dag_runs": [{"dag_id": "dag_1", "dag_run_id": "run_1", "state": "success"}]})
+        mock_dag_run_api.get_dag_runs.side_effect = [full_page] * 10 + [last_page]
+
+        with patch("src.subscriptions.POLL_MAX_PAGES", 10):
+            assert await subscriptions.poll_once() == set()
+            window_start = subscriptions._window_start
+            assert await subscriptions.poll_once() == {URI}
+
+        first_poll, second_poll = mock_dag_run_api.get_dag_runs.call_args_list[9:]
+        assert first_poll.kwargs["offset"] == 900
+        assert second_poll.kwargs["offset"] == 1000
+        assert second_poll.kwargs["updated_at_gte"] == first_poll.kwargs["updated_at_gte"]
+        assert second_poll.kwargs["order_by"] == "id"
+        assert subscriptions._window_start > window_start
+
+    async def test_invalid_uri(self, subscriptions):
+        """Only DAG run URIs can be subscribed to."""
+        with pytest.raises(ValueError, match="Not a DAG run resource"):
+            await subscriptions.subscribe("airflow://dags/dag_1", AsyncMock())
+
+
+class TestRegisterDagRunSubscriptions:
+    """Test cases for exposing DAG runs as resources."""
+
+    @pytest.mark.parametrize("subscribable", [True, False])
+    def test_subscriptions_can_be_left_out(self, subscribable):
+        """Without subscriptions, DAG runs can still be read but not subscribed to."""
+        app = FastMCP("test")
+
+        register_dag_run_subscriptions(app, subscribable=subscribable)
+
+        assert (types.SubscribeRequest in app._mcp_server.request_handlers) is subscribable
+        assert DAG_RUN_URI_TEMPLATE in asyncio.run(app.get_resource_templates())
+
+    async def test_reading_a_dag_run_does_not_block_the_event_loop(self):
+        """The DAG run is fetched in a worker thread."""
+        with patch("src.subscriptions.dag_run_api") as mock_api:
+            mock_api.get_dag_run.side_effect = lambda **kwargs: time.sleep(0.3) or _response(kwargs)
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            text = await read_dag_run("dag_1", "run_1")
+            ticker.cancel()
+
+        assert "'dag_run_id': 'run_1'" in text
+        assert ticks > 10
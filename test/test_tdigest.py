@@ -0,0 +1,61 @@
+"""Tests for the t-digest module using pytest framework."""
+
+import random
+
+import pytest
+
+from src.tdigest import TDigest
+
+
+class TestTDigest:
+    """Test cases for the TDigest quantile sketch."""
+
+    @pytest.fixture
+    def values(self):
+        """A reproducible, skewed sample of durations."""
+        rng = random.Random(42)
+        return [rng.expovariate(1 / 60) for _ in range(20000)]
+
+    def test_empty_digest(self):
+        """An empty digest has no quantiles."""
+        digest = TDigest()
+
+        assert digest.quantile(0.5) is None
+        assert digest.cdf(1.0) is None
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.99])
+    def test_quantile_accuracy(self, values, q):
+        """Quantile estimates stay within 1% of the exact rank."""
+        digest = TDigest()
+        for value in values:
+            digest.add(value)
+
+        estimate = digest.quantile(q)
+        exact_rank = sum(value <= estimate for value in values) / len(values)
+        assert abs(exact_rank - q) < 0.01
+
+    def test_merge_matches_single_digest(self, values):
+        """Merging digests built on halves of a stream matches a digest built on the whole stream."""
+        whole, left, right = TDigest(), TDigest(), TDigest()
+        for value in values:
+            whole.add(value)
+        for value in values[::2]:
+            left.add(value)
+        for value in values[1::2]:
+            right.add(value)
+
+        left.merge(right)
+
+        assert left.count == whole.count
+        assert left.quantile(0.99) == pytest.approx(whole.quantile(0.99), rel=0.02)
+
+    def test_round_trip_serialization(self, values):
+        """A digest restored from to_dict answers the same queries."""
+        digest = TDigest()
+        for value in values:
+            digest.add(value)
+
+        restored = TDigest.from_dict(digest.to_dict())
+
+        assert restored.quantile(0.95) == digest.quantile(0.95)
+        assert restored.cdf(60.0) == digest.cdf(60.0)
@@ -0,0 +1,133 @@
+"""Tests for the tool schema cache."""
+
+import json
+from typing import Optional
+
+import mcp.types as types
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.tools import Tool
+from pydantic import BaseModel
+
+from src.tool_schemas import ToolSchemaCache, cache_tool_list
+
+
+async def get_dag(dag_id: str, fields: Optional[list[str]] = None) -> str:
+    return dag_id
+
+
+async def get_dag_renamed_param(dag: str) -> str:
+    return dag
+
+
+def make_query_tool(*selection_fields: str):
+    """The same tool, taking a model nested in another one whose fields are ``selection_fields``."""
+    Selection = type("Selection", (BaseModel,), {"__annotations__": dict.fromkeys(selection_fields, Optional[str])})
+
+    class Query(BaseModel):
+        selection: Selection
+
+    async def query(query: Query) -> str:
+        return str(query)
+
+    return query
+
+
+class TestToolSchemaCache:
+    """Test cases for ToolSchemaCache."""
+
+    def test_cached_tool_equals_generated_tool(self, tmp_path):
+        path = tmp_path / "tool_schemas.json"
+        first = ToolSchemaCache(path, package_version="1.0")
+        first.tool(get_dag, "get_dag", "Get a DAG")
+        first.save()
+        cache = ToolSchemaCache(path, package_version="1.0")
+
+        # The cached schema is used, nothing is generated
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(Tool, "from_function", None)
+            tool = cache.tool(get_dag, "get_dag", "Get a DAG")
+
+        assert tool == Tool.from_function(get_dag, name="get_dag", description="Get a DAG")
+
+    def test_save_writes_generated_schemas_once(self, tmp_path):
+        path = tmp_path / "state" / "tool_schemas.json"
+        cache = ToolSchemaCache(path, package_version="1.0")
+        cache.tool(get_dag, "get_dag", "Get a DAG")
+        cache.save()
+        written = path.read_text()
+        path.write_text("{}")
+        cache.save()
+
+        data = json.loads(written)
+        assert data["package_version"] == "1.0"
+        assert data["tools"]["get_dag"]["parameters"]["required"] == ["dag_id"]
+        assert path.read_text() == "{}"
+
+    @pytest.mark.parametrize(
+        "package_version, func, regenerated",
+        [("1.0", get_dag, False), ("1.1", get_dag, True), ("1.0", get_dag_renamed_param, True)],
+        ids=["same_version_and_signature", "new_version", "changed_signature"],
+    )
+    def test_schemas_are_regenerated_when_stale(self, tmp_path, package_version, func, regenerated):
+        path = tmp_path / "tool_schemas.json"
+        cache = ToolSchemaCache(path, package_version="1.0")
+        cache.tool(get_dag, "get_dag", "Get a DAG")
+        cache.save()
+
+        cache = ToolSchemaCache(path, package_version=package_version)
+        tool = cache.tool(func, "get_dag", "Get a DAG")
+
+        assert cache._dirty is regenerated
+        assert tool == Tool.from_function(func, name="get_dag", description="Get a DAG")
+
+    def test_schemas_are_regenerated_when_a_nested_model_changes(self, tmp_path):
+        path = tmp_path / "tool_schemas.json"
+        cache = ToolSchemaCache(path, package_version="1.0")
+        cache.tool(make_query_tool("dag_id"), "query", "Query")
+        cache.save()
+        changed = make_query_tool("dag_id", "tags")
+
+        cache = ToolSchemaCache(path, package_version="1.0")
+        tool = cache.tool(changed, "query", "Query")
+
+        assert cache._dirty is True
+        assert tool == Tool.from_function(changed, name="query", description="Query")
+
+    def test_unreadable_cache_is_ignored(self, tmp_path):
+        path = tmp_path / "tool_schemas.json"
+        path.write_text("not json")
+
+        tool = ToolSchemaCache(path, package_version="1.0").tool(get_dag, "get_dag", "Get a DAG")
+
+        assert tool.parameters["required"] == ["dag_id"]
+
+
+class TestCacheToolList:
+    """Test cases for answering tools/list from a prebuilt result."""
+
+    @pytest.mark.asyncio
+    async def test_tool_list_is_rebuilt_only_when_tools_change(self):
+        app = FastMCP("test")
+        app.add_tool(Tool.from_function(get_dag, name="get_dag"))
+        handlers = app._mcp_server.request_handlers
+        build_tool_list = handlers[types.ListToolsRequest]
+        calls = 0
+
+        async def counting_build_tool_list(request):
+            nonlocal calls
+            calls += 1
+            return await build_tool_list(request)
+
+        handlers[types.ListToolsRequest] = counting_build_tool_list
+        cache_tool_list(app)
+
+        async with Client(app) as client:
+            first = await client.list_tools()
+            second = await client.list_tools()
+            app.add_tool(Tool.from_function(get_dag_renamed_param, name="get_dag_renamed_param"))
+            third = await client.list_tools()
+
+        assert [tool.name for tool in first] == [tool.name for tool in second] == ["get_dag"]
+        assert [tool.name for tool in third] == ["get_dag", "get_dag_renamed_param"]
+        assert calls == 2
@@ -0,0 +1,211 @@
+"""Tests for the tracing module."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+from airflow_client.client import Configuration
+from airflow_client.client.api.monitoring_api import MonitoringApi
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from src import tracing
+from src.tracing import (
+    KIND_CLIENT,
+    KIND_SERVER,
+    FileSpanExporter,
+    TracingMiddleware,
+    current_span,
+    parse_traceparent,
+    span,
+)
+
+CALLER_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+CALLER_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing, "exporter", FileSpanExporter(str(path)))
+    return path
+
+
+def _spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return {span["name"]: span for span in spans}
+
+
+def _app():
+    app = FastMCP("test", middleware=[TracingMiddleware()])
+
+    def fetch_page():
+        with span("GET /dags", KIND_CLIENT):
+            pass
+
+    @app.tool
+    async def get_dags() -> str:
+        with span("page", **{"page.offset": 0}):
+            await asyncio.to_thread(fetch_page)
+        return "dags"
+
+    @app.tool
+    def delete_dag() -> str:
+        raise RuntimeError("locked")
+
+    return app
+
+
+class TestParseTraceparent:
+    """Test cases for reading W3C trace context."""
+
+    def test_valid_header(self):
+        assert parse_traceparent(f"00-{CALLER_TRACE_ID}-{CALLER_SPAN_ID}-01") == (CALLER_TRACE_ID, CALLER_SPAN_ID, True)
+        assert parse_traceparent(f"00-{CALLER_TRACE_ID}-{CALLER_SPAN_ID}-00")[2] is False
+
+    @pytest.mark.parametrize(
+        "header",
+        [None, "", "garbage", f"00-{'0' * 32}-{CALLER_SPAN_ID}-01", f"00-{CALLER_TRACE_ID}-{'0' * 16}-01"],
+    )
+    def test_invalid_header(self, header):
+        assert parse_traceparent(header) is None
+
+
+class TestFileSpanExporter:
+    """Test cases for writing spans per trace."""
+
+    def test_spans_ended_after_their_trace_was_written_are_dropped(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        exporter = FileSpanExporter(str(path))
+        first, second = "1" * 32, "2" * 32
+        exporter.start(first)
+        exporter.export(tracing.Span("tools/call get_dags", first, None, KIND_SERVER))
+        exporter.flush(first)
+        exporter.start(second)
+        exporter.export(tracing.Span("straggler", first, None))
+        exporter.export(tracing.Span("tools/call get_pools", second, None, KIND_SERVER))
+        exporter.flush(second)
+        # A caller may make another tool call within its trace
+        exporter.start(first)
+        exporter.export(tracing.Span("tools/call get_dag", first, None, KIND_SERVER))
+        exporter.flush(first)
+
+        batches = [
+            [span["name"] for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+            for line in path.read_text().splitlines()
+        ]
+        assert batches == [["tools/call get_dags"], ["tools/call get_pools"], ["tools/call get_dag"]]
+
+
+class TestTracing:
+    """Test cases for tool call traces."""
+
+    def test_spans_are_only_recorded_within_a_trace(self):
+        with span("page") as recorded:
+            assert recorded is None
+
+    @pytest.mark.asyncio
+    async def test_tool_call_trace(self, trace_file):
+        async with Client(_app()) as client:
+            await client.call_tool("get_dags")
+
+        spans = _spans(trace_file)
+        root, page = spans["tools/call get_dags"], spans["page"]
+        assert root["kind"] == KIND_SERVER
+        assert root["parentSpanId"] == ""
+        assert {"key": "mcp.tool.name", "value": {"stringValue": "get_dags"}} in root["attributes"]
+        assert page["traceId"] == root["traceId"]
+        assert page["parentSpanId"] == root["spanId"]
+        assert {"key": "page.offset", "value": {"intValue": "0"}} in page["attributes"]
+        # Spans of worker threads belong to the same trace
+        assert spans["GET /dags"]["parentSpanId"] == page["spanId"]
+        assert int(root["startTimeUnixNano"]) <= int(page["startTimeUnixNano"]) <= int(root["endTimeUnixNano"])
+        assert current_span.get() is None
+
+    @pytest.mark.asyncio
+    async def test_failed_tool_call_has_error_status(self, trace_file):
+        async with Client(_app()) as client:
+            with pytest.raises(ToolError):
+                await client.call_tool("delete_dag")
+
+        status = _spans(trace_file)["tools/call delete_dag"]["status"]
+        assert status["code"] == tracing.STATUS_ERROR
+        assert "locked" in status["message"]
+
+    @pytest.mark.asyncio
+    async def test_incoming_trace_context_is_continued(self, trace_file):
+        with patch.object(
+            tracing, "get_http_headers", return_value={"traceparent": f"00-{CALLER_TRACE_ID}-{CALLER_SPAN_ID}-01"}
+        ):
+            async with Client(_app()) as client:
+                await client.call_tool("get_dags")
+
+        root = _spans(trace_file)["tools/call get_dags"]
+        assert (root["traceId"], root["parentSpanId"]) == (CALLER_TRACE_ID, CALLER_SPAN_ID)
+
+    @pytest.mark.asyncio
+    async def test_unsampled_incoming_trace_is_not_recorded(self, trace_file):
+        with patch.object(
+            tracing, "get_http_headers", return_value={"traceparent": f"00-{CALLER_TRACE_ID}-{CALLER_SPAN_ID}-00"}
+        ):
+            async with Client(_app()) as client:
+                await client.call_tool("get_dags")
+
+        assert not trace_file.exists()
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.traceparents.append(self.headers.get("traceparent"))
+        body = json.dumps({"metadatabase": {"status": "healthy"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestUpstreamSpans:
+    """Test cases for spans of requests to Airflow."""
+
+    @pytest.fixture
+    def server(self):
+        server = HTTPServer(("127.0.0.1", 0), _HealthHandler)
+        server.traceparents = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def test_upstream_request_is_a_child_span_and_propagates_the_trace(self, server, trace_file):
+        from src.airflow import airflow_client
+
+        client = airflow_client.AirflowApiClient(Configuration(host=f"http://127.0.0.1:{server.server_port}/api/v1"))
+        root = tracing.Span("tools/call get_health", CALLER_TRACE_ID, None, KIND_SERVER)
+        token = current_span.set(root)
+        try:
+            MonitoringApi(client).get_health(_check_return_type=False)
+        finally:
+            current_span.reset(token)
+        tracing.exporter.export(root)
+        tracing.exporter.flush(CALLER_TRACE_ID)
+
+        spans = _spans(trace_file)
+        request = spans["GET"]
+        assert request["kind"] == KIND_CLIENT
+        assert {"key": "url.path", "value": {"stringValue": "/api/v1/health"}} in request["attributes"]
+        assert request["parentSpanId"] == root.span_id
+        assert {"key": "http.response.status_code", "value": {"intValue": "200"}} in request["attributes"]
+        assert spans["deserialize"]["parentSpanId"] == root.span_id
+        assert server.traceparents == [f"00-{CALLER_TRACE_ID}-{request['spanId']}-01"]